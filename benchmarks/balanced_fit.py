@@ -0,0 +1,102 @@
+"""
+Benchmark class balancing for the SVR models.
+
+    python -m benchmarks.balanced_fit [--n_games 3000 --minority 0.35]
+
+Compares the previous approach, upsampling the minority class with sklearn.utils.resample before fitting, against
+per-sample weights on the original rows, for a single fit and for a small grid search over C.
+"""
+import time
+import argparse
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+from sklearn.pipeline import Pipeline
+from sklearn.svm import SVR
+from sklearn.utils import resample
+from sklearn.model_selection import GroupKFold, GridSearchCV
+
+from config import logger
+
+
+def balance_weights(labels: pd.Series) -> pd.Series:
+    # Same as Model.balance_weights, kept here so the benchmark doesn't need the analytics dependencies
+    counts = labels.value_counts()
+    return labels.map(counts.max() / counts).astype(float)
+
+
+def upsample(df: pd.DataFrame, column: str) -> pd.DataFrame:
+    """
+    Previous implementation (Model.make_resample): duplicate minority rows up to the size of the largest class
+    """
+    dfs_c = {c: df[df[column] == c] for c in df[column].unique()}
+    bigger = max(df_c.shape[0] for df_c in dfs_c.values())
+    dfs_r = [resample(df_c, replace=True, n_samples=bigger - df_c.shape[0], random_state=0)
+             for df_c in dfs_c.values() if df_c.shape[0] < bigger]
+    return pd.concat(dfs_r + [df])
+
+
+def simulate(n_games: int, minority: float) -> pd.DataFrame:
+    rng = np.random.default_rng(0)
+    features = ['f{}'.format(idx) for idx in range(8)]
+    df = pd.DataFrame(rng.normal(0, 1, (n_games, len(features))), columns=features)
+    df['response'] = df['f0'] - 0.5 * df['f1'] + rng.normal(0, 1, n_games)
+    df['line'] = df['response'].quantile(1 - minority)
+    df['balance'] = df['response'] > df['line']
+    df['group_col'] = rng.integers(2015, 2022, n_games)
+    return df
+
+
+def _measure(func):
+    tracemalloc.start()
+    start = time.perf_counter()
+    out = func()
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return out, elapsed, peak
+
+
+def _grid(X: pd.DataFrame, y: pd.Series, group: pd.Series, **fit_params) -> GridSearchCV:
+    grid = GridSearchCV(Pipeline([('model', SVR())]), cv=GroupKFold(n_splits=group.nunique()).split(X, y, group),
+                        param_grid={'model__C': [0.1, 1, 3]}, scoring='neg_mean_squared_error')
+    return grid.fit(X, y, **fit_params)
+
+
+def benchmark():
+    parser = argparse.ArgumentParser(prog='Benchmark balanced SVR training')
+    parser.add_argument('--n_games', type=int, default=3000)
+    parser.add_argument('--minority', type=float, default=0.35)
+    args = parser.parse_args()
+
+    df = simulate(args.n_games, args.minority)
+    features = [col for col in df.columns if col.startswith('f')]
+    df_up = upsample(df, 'balance')
+    weights = balance_weights(df['balance']).values
+    logger.info('{} games, {} rows upsampled, total weight {:.0f}'.format(df.shape[0], df_up.shape[0], weights.sum()))
+
+    def _fit_upsampled():
+        return Pipeline([('model', SVR())]).fit(df_up[features], df_up['response'])
+
+    def _fit_weighted():
+        return Pipeline([('model', SVR())]).fit(df[features], df['response'], model__sample_weight=weights)
+
+    model_up, up_time, up_peak = _measure(_fit_upsampled)
+    model_w, w_time, w_peak = _measure(_fit_weighted)
+    diff = np.abs(model_up.predict(df[features]) - model_w.predict(df[features])).max()
+    logger.info('Max prediction difference: {:.4f}'.format(diff))
+    logger.info('Fit, upsampled: {:.2f} s, peak {:.1f} MB'.format(up_time, up_peak / 1e6))
+    logger.info('Fit, weighted:  {:.2f} s, peak {:.1f} MB'.format(w_time, w_peak / 1e6))
+
+    grid_up, up_time, up_peak = _measure(lambda: _grid(df_up[features], df_up['response'], df_up['group_col']))
+    grid_w, w_time, w_peak = _measure(lambda: _grid(df[features], df['response'], df['group_col'],
+                                                    model__sample_weight=weights))
+    logger.info('Selected C, upsampled: {}, weighted: {}'.format(grid_up.best_params_['model__C'],
+                                                                  grid_w.best_params_['model__C']))
+    logger.info('Grid search, upsampled: {:.2f} s, peak {:.1f} MB'.format(up_time, up_peak / 1e6))
+    logger.info('Grid search, weighted:  {:.2f} s, peak {:.1f} MB'.format(w_time, w_peak / 1e6))
+
+
+if __name__ == '__main__':
+    benchmark()
@@ -0,0 +1,106 @@
+"""
+Benchmark merging poll rankings into college stats.
+
+    python -m benchmarks.college_rankings_merge [--raw_dir data/sports_bettors/raw/college_football]
+
+Uses the downloaded 2000-present games, stats and rankings when available, otherwise simulates a dataset of the same
+size. Compares the previous merge-per-poll-and-side approach against the wide two-merge join and checks both agree.
+"""
+import os
+import re
+import time
+import argparse
+
+import numpy as np
+import pandas as pd
+
+from sports_bettors.utils.college_football.curate import merge_rankings
+from config import Config, logger
+
+POLLS = ['AP Top 25', 'Coaches Poll', 'BCS Standings']
+
+
+def simulate(n_games: int, first_year: int = 2000, last_year: int = 2023):
+    rng = np.random.default_rng(0)
+    teams = np.array(['Team {}'.format(i) for i in range(130)])
+    df_stats = pd.DataFrame({
+        'game_id': np.arange(n_games),
+        'season': rng.integers(first_year, last_year + 1, n_games),
+        'week': rng.integers(1, 16, n_games),
+        'home_team': teams[rng.integers(0, 65, n_games)],
+        'away_team': teams[rng.integers(65, 130, n_games)],
+    })
+    for col in ['home_rushingYards', 'away_rushingYards', 'home_netPassingYards', 'away_netPassingYards']:
+        df_stats[col] = rng.integers(0, 400, n_games)
+    df_rankings = []
+    for year in range(first_year, last_year + 1):
+        for week in range(1, 16):
+            for poll in POLLS:
+                df_rankings.append(pd.DataFrame({
+                    'year': year, 'week': week, 'poll': poll, 'rank': np.arange(1, 26),
+                    'school': rng.choice(teams, 25, replace=False), 'conference': 'X'
+                }))
+    return df_stats, pd.concat(df_rankings).reset_index(drop=True)
+
+
+def merge_rankings_per_poll(df_stats: pd.DataFrame, df_rankings: pd.DataFrame) -> pd.DataFrame:
+    """
+    Previous implementation: a left merge for each poll and side, then per-row name cleaning
+    """
+    for poll, df_poll in df_rankings.groupby('poll'):
+        rank_col_name = re.sub(' ', '', poll) + 'Rank'
+        df_poll_sub = df_poll.rename(columns={'rank': rank_col_name, 'year': 'season'})
+        for home_away in ['home', 'away']:
+            df_poll_sub[home_away + '_team'] = df_poll_sub['school']
+            df_poll_sub[home_away + '_' + rank_col_name] = df_poll_sub[rank_col_name]
+            df_stats = df_stats.merge(
+                df_poll_sub[['season', 'week', home_away + '_team', home_away + '_' + rank_col_name]],
+                on=['season', 'week', home_away + '_team'],
+                how='left'
+            )
+    df_stats['home_team'] = df_stats['home_team'].apply(lambda team: re.sub(' ', '', team))
+    df_stats['away_team'] = df_stats['away_team'].apply(lambda team: re.sub(' ', '', team))
+    return df_stats
+
+
+def merge_rankings_wide(df_stats: pd.DataFrame, df_rankings: pd.DataFrame) -> pd.DataFrame:
+    df_stats = merge_rankings(df_stats, df_rankings)
+    for home_away in ['home', 'away']:
+        df_stats[home_away + '_team'] = df_stats[home_away + '_team'].str.replace(' ', '', regex=False)
+    return df_stats
+
+
+def _time(func, df_stats: pd.DataFrame, df_rankings: pd.DataFrame, repeat: int):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        out = func(df_stats.copy(), df_rankings)
+    return out, (time.perf_counter() - start) / repeat
+
+
+def benchmark():
+    parser = argparse.ArgumentParser(prog='Benchmark merging college rankings')
+    parser.add_argument('--raw_dir', default=os.path.join(Config.DATA_DIR, 'sports_bettors', 'raw', 'college_football'))
+    parser.add_argument('--n_games', type=int, default=20000)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    if all(os.path.exists(os.path.join(args.raw_dir, fn)) for fn in ['df_games.csv', 'df_stats.csv', 'df_rankings.csv']):
+        logger.info('Loading raw data from {}'.format(args.raw_dir))
+        df_stats = pd.read_csv(os.path.join(args.raw_dir, 'df_stats.csv')). \
+            merge(pd.read_csv(os.path.join(args.raw_dir, 'df_games.csv')), on='game_id', how='inner')
+        df_rankings = pd.read_csv(os.path.join(args.raw_dir, 'df_rankings.csv'))
+    else:
+        logger.info('No raw data, simulating {} games'.format(args.n_games))
+        df_stats, df_rankings = simulate(args.n_games)
+    logger.info('{} games, {} rankings'.format(df_stats.shape[0], df_rankings.shape[0]))
+
+    df_old, old_time = _time(merge_rankings_per_poll, df_stats, df_rankings, args.repeat)
+    df_new, new_time = _time(merge_rankings_wide, df_stats, df_rankings, args.repeat)
+    same = df_old.shape == df_new.shape and df_old.equals(df_new[df_old.columns])
+    logger.info('Same result: {}'.format(same))
+    logger.info('Merge per poll and side: {:.1f} ms'.format(old_time * 1000))
+    logger.info('Wide rankings, 2 merges: {:.1f} ms'.format(new_time * 1000))
+
+
+if __name__ == '__main__':
+    benchmark()
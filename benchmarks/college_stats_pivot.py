@@ -0,0 +1,103 @@
+"""
+Benchmark assembling df_stats.csv from raw college stats responses.
+
+    python -m benchmarks.college_stats_pivot [--checkpoint data/sports_bettors/raw/college_football/stats_checkpoint.jsonl]
+
+Without a checkpoint, responses are simulated. Compares the previous per-game pivot against the chunked bulk pivot,
+checks that both write byte-identical csv files and reports time and peak (traced) memory for each.
+"""
+import time
+import random
+import argparse
+import tracemalloc
+
+import pandas as pd
+
+from sports_bettors.utils.checkpoint import Checkpoint
+from sports_bettors.utils.college_football.download import DownloadCollegeFootballData
+from config import logger
+
+# Stats the API returns that aren't kept as features
+OTHER_CATEGORIES = ['tackles', 'sacks', 'qbHurries', 'passesDeflected', 'tacklesForLoss', 'defensiveTDs',
+                    'passesIntercepted', 'interceptionYards', 'interceptionTDs', 'puntReturns', 'puntReturnYards',
+                    'kickReturns', 'kickReturnYards', 'kickReturnTDs']
+
+
+def simulate(n_games: int) -> dict:
+    rng = random.Random(0)
+    records = {}
+    for game_id in range(n_games):
+        teams = []
+        for home_away in ['home', 'away']:
+            categories = DownloadCollegeFootballData.features + OTHER_CATEGORIES
+            # Older games are missing some stats
+            stats = [{'category': c, 'stat': '{}-{}'.format(rng.randint(0, 30), rng.randint(0, 30))}
+                     for c in categories if rng.random() > 0.05]
+            teams.append({'school': 'Team{}'.format(rng.randint(0, 120)), 'homeAway': home_away, 'stats': stats})
+        records[400000000 + game_id] = {'game_id': 400000000 + game_id, 'status': 'ok', 'teams': teams}
+    return records
+
+
+def assemble_per_game(downloader: DownloadCollegeFootballData, records: dict) -> pd.DataFrame:
+    """
+    Previous implementation: a DataFrame and pivot table per game
+    """
+    df_stats = []
+    for game_id, record in records.items():
+        df_game = []
+        for team in record['teams']:
+            df_game_long = pd.DataFrame.from_records(team['stats'])
+            df_game_long = df_game_long[df_game_long['category'].isin(downloader.features)]
+            df_game_long['category'] = team['homeAway'] + '_' + df_game_long['category']
+            df_game.append(df_game_long)
+        df_game = pd.concat(df_game, sort=True)
+        df_game = pd.pivot_table(df_game, columns='category', values='stat', aggfunc='first').reset_index(drop=True)
+        df_stats.append(df_game.assign(game_id=game_id))
+    return pd.concat(df_stats, sort=True).reset_index(drop=True)
+
+
+def assemble_bulk(downloader: DownloadCollegeFootballData, records: dict, chunk_size: int = 10000) -> pd.DataFrame:
+    game_ids = list(records.keys())
+    df_stats = []
+    for start in range(0, len(game_ids), chunk_size):
+        chunk = game_ids[start:start + chunk_size]
+        stats = [stat for game_id in chunk for stat in downloader._flatten_stats(game_id, records[game_id]['teams'])]
+        df_stats.append(downloader._pivot_stats(stats, chunk))
+    df_stats = pd.concat(df_stats, sort=True).reset_index(drop=True)
+    return df_stats[sorted(df_stats.columns)]
+
+
+def _profile(func, *args):
+    tracemalloc.start()
+    start = time.perf_counter()
+    out = func(*args)
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return out, elapsed, peak
+
+
+def benchmark():
+    parser = argparse.ArgumentParser(prog='Benchmark college stats assembly')
+    parser.add_argument('--checkpoint', default=None)
+    parser.add_argument('--n_games', type=int, default=2000)
+    args = parser.parse_args()
+
+    if args.checkpoint is not None:
+        records = {r['game_id']: r for r in Checkpoint(args.checkpoint)}
+        records = {game_id: r for game_id, r in records.items() if r['status'] == 'ok'}
+    else:
+        records = simulate(args.n_games)
+    logger.info('Assembling stats for {} games'.format(len(records)))
+
+    downloader = DownloadCollegeFootballData.__new__(DownloadCollegeFootballData)
+    df_old, old_time, old_peak = _profile(assemble_per_game, downloader, records)
+    df_new, new_time, new_peak = _profile(assemble_bulk, downloader, records)
+
+    logger.info('Byte-identical csv: {}'.format(df_old.to_csv(index=False) == df_new.to_csv(index=False)))
+    logger.info('Per-game pivot: {:.2f} s, peak {:.1f} MB'.format(old_time, old_peak / 1e6))
+    logger.info('Bulk pivot:     {:.2f} s, peak {:.1f} MB'.format(new_time, new_peak / 1e6))
+
+
+if __name__ == '__main__':
+    benchmark()
@@ -0,0 +1,125 @@
+"""
+Benchmark memory of the analytics stages with and without the compact schema.
+
+    python -m benchmarks.compact_dtypes [--n_seasons 10]
+
+Simulates nfl games over several seasons, as read from csv (object strings, float64) and compacted by
+sports_bettors.analytics.schema, and runs each stage (metrics, wrangle, fit_transform) in a fresh process on the
+previous stage's output, reporting the stage's peak RSS and the size of the frames it reads and writes.
+"""
+import os
+import pickle
+import shutil
+import argparse
+import resource
+import tempfile
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from sports_bettors.analytics import schema
+from config import logger
+
+stages = ['metrics', 'wrangle', 'fit_transform']
+
+
+def simulate(n_seasons: int) -> pd.DataFrame:
+    rng = np.random.default_rng(0)
+    teams = ['T{}'.format(idx) for idx in range(32)]
+    records = []
+    # 17 weeks of 16 games a season, the last one this week
+    for season in range(n_seasons):
+        for week in range(17):
+            gameday = pd.Timestamp('today').normalize() - pd.Timedelta(days=7 * (52 * season + week) + 1)
+            matchups = rng.permutation(teams)
+            for away_team, home_team in zip(matchups[::2], matchups[1::2]):
+                spread_line = float(np.round(rng.normal(0, 5) * 2) / 2)
+                records.append({
+                    'game_id': '{}_{}_{}'.format(gameday.date(), away_team, home_team),
+                    'gameday': gameday,
+                    'game_type': 'REG',
+                    'away_team': away_team,
+                    'home_team': home_team,
+                    'away_score': float(rng.integers(0, 45)),
+                    'home_score': float(rng.integers(0, 45)),
+                    'spread_line': spread_line,
+                    'total_line': float(np.round(rng.normal(44, 4) * 2) / 2),
+                    'away_moneyline': -150. if spread_line < 0 else 130.,
+                    'home_moneyline': 130. if spread_line < 0 else -150.,
+                })
+    return pd.DataFrame.from_records(records).sort_values('gameday').reset_index(drop=True).\
+        astype({'game_id': object, 'game_type': object, 'away_team': object, 'home_team': object})
+
+
+def _frame(output) -> pd.DataFrame:
+    return output[2] if isinstance(output, tuple) else output
+
+
+def run_stage(stage: str, input_path: str, output_path: str, work_dir: str) -> dict:
+    """
+    Run a stage in this (fresh) process, Data and Model save under the working directory
+    """
+    from sports_bettors.analytics.model.data import Data
+    from sports_bettors.analytics.model.model import Model
+
+    os.chdir(work_dir)
+    with open(input_path, 'rb') as fp:
+        df = pickle.load(fp)
+    rss_start = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    if stage == 'metrics':
+        output = Data._add_metrics(df)
+    elif stage == 'wrangle':
+        output = Data(league='nfl').wrangle(df)
+    elif stage == 'fit_transform':
+        output = Model(league='nfl', response='spread').fit_transform(df)
+    else:
+        raise NotImplementedError(stage)
+    rss_peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    with open(output_path, 'wb') as fp:
+        pickle.dump(_frame(output), fp)
+    # ru_maxrss is in kilobytes on linux
+    return {
+        'peak_rss_mb': rss_peak / 1e3,
+        'stage_rss_mb': (rss_peak - rss_start) / 1e3,
+        'input_mb': df.memory_usage(deep=True).sum() / 1e6,
+        'output_mb': _frame(output).memory_usage(deep=True).sum() / 1e6,
+    }
+
+
+def benchmark():
+    parser = argparse.ArgumentParser(prog='Benchmark compact dtypes')
+    parser.add_argument('--n_seasons', type=int, default=10)
+    args = parser.parse_args()
+
+    work_dir = tempfile.mkdtemp()
+    try:
+        df = simulate(args.n_seasons)
+        frames = {'object / float64': df, 'compact': schema.enforce(df)}
+        for col, usage in schema.memory_report(frames['compact']).items():
+            # Derived columns weren't there before
+            was = df[col].memory_usage(deep=True, index=False) / 1e3 if col in df.columns else 0.
+            logger.info('{}: {} {:.1f} KB (was {:.1f} KB)'.format(col, usage['dtype'], usage['bytes'] / 1e3, was))
+
+        report = []
+        for label, df_ in frames.items():
+            input_path = os.path.join(work_dir, '{}_games.pkl'.format(len(report)))
+            with open(input_path, 'wb') as fp:
+                pickle.dump(df_, fp)
+            for stage in stages:
+                output_path = os.path.join(work_dir, '{}_{}.pkl'.format(len(report), stage))
+                # Peak RSS only resets with the process
+                with ProcessPoolExecutor(max_workers=1, mp_context=multiprocessing.get_context('spawn')) as executor:
+                    result = executor.submit(run_stage, stage, input_path, output_path, work_dir).result()
+                report.append({'types': label, 'stage': stage, **result})
+                input_path = output_path
+
+        df_report = pd.DataFrame.from_records(report).set_index(['stage', 'types']).reindex(stages, level=0).round(1)
+        logger.info('{} games over {} seasons\n{}'.format(df.shape[0], args.n_seasons, df_report.to_string()))
+    finally:
+        shutil.rmtree(work_dir)
+
+
+if __name__ == '__main__':
+    benchmark()
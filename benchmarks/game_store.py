@@ -0,0 +1,75 @@
+"""
+Benchmark windowed loads from the season-partitioned game store.
+
+    python -m benchmarks.game_store [--n_seasons 25 --window 365]
+
+Stores synthetic seasons of nflverse's width and times reading the whole history from one csv, as training and
+prediction did, against the store loading only the last `window` days with the columns the models use.
+"""
+import os
+import time
+import shutil
+import argparse
+import tempfile
+
+import numpy as np
+import pandas as pd
+
+from sports_bettors.analytics.model.data import Data
+from sports_bettors.utils.store import GameStore
+from config import logger
+
+
+def simulate(n_seasons: int) -> pd.DataFrame:
+    rng = np.random.default_rng(0)
+    dfs = []
+    for season in range(2024 - n_seasons, 2024):
+        # 272 games from September into January
+        gameday = pd.Timestamp('{}-09-08'.format(season)) + pd.to_timedelta(np.arange(272) * 127 // 272, unit='D')
+        dfs.append(pd.DataFrame({'game_id': ['{}_{}'.format(season, idx) for idx in range(272)],
+                                 'season': season, 'game_type': 'REG', 'gameday': gameday}))
+    df = pd.concat(dfs, ignore_index=True)
+    for col in ['away_team', 'home_team', 'stadium', 'roof', 'surface', 'referee', 'away_coach', 'home_coach',
+                'away_qb_name', 'home_qb_name', 'location', 'div_game']:
+        df[col] = rng.choice(['A', 'B', 'C', 'D'], df.shape[0])
+    for col in ['away_score', 'home_score', 'spread_line', 'total_line', 'away_moneyline', 'home_moneyline', 'temp',
+                'wind', 'away_rest', 'home_rest', 'over_odds', 'under_odds', 'away_spread_odds', 'home_spread_odds']:
+        df[col] = rng.integers(0, 50, df.shape[0]).astype(float)
+    return df
+
+
+def benchmark():
+    parser = argparse.ArgumentParser(prog='Benchmark the game store')
+    parser.add_argument('--n_seasons', type=int, default=25)
+    parser.add_argument('--window', type=int, default=365)
+    parser.add_argument('--n_iter', type=int, default=20)
+    args = parser.parse_args()
+
+    root_dir = tempfile.mkdtemp()
+    try:
+        df = simulate(args.n_seasons)
+        csv_path = os.path.join(root_dir, 'df_training.csv')
+        df.to_csv(csv_path, index=False)
+        store = GameStore(root_dir)
+        store.write('nfl', df)
+        start_date = df['gameday'].max() - pd.Timedelta(days=args.window)
+
+        start = time.perf_counter()
+        for _ in range(args.n_iter):
+            df_full = pd.read_csv(csv_path, parse_dates=['gameday'])
+            df_full = df_full[df_full['gameday'] >= start_date]
+        logger.info('Full history csv: {:.4f} s per load'.format((time.perf_counter() - start) / args.n_iter))
+
+        start = time.perf_counter()
+        for _ in range(args.n_iter):
+            df_window = store.load('nfl', start=start_date, columns=Data.raw_columns)
+        logger.info('Store, last {} days of {} seasons ({} partitions): {:.4f} s per load'.format(
+            args.window, args.n_seasons, len(store.partitions('nfl', start=start_date)),
+            (time.perf_counter() - start) / args.n_iter))
+        assert df_window.shape[0] == df_full.shape[0]
+    finally:
+        shutil.rmtree(root_dir)
+
+
+if __name__ == '__main__':
+    benchmark()
@@ -0,0 +1,84 @@
+"""
+Benchmark import time of each console script's module.
+
+    python -m benchmarks.import_time [--n_iter 3 --save import_time.json --baseline import_time.json]
+
+Imports each entry point's module from setup.py in a fresh interpreter with `python -X importtime`, and reports the
+best cumulative time over n_iter runs along with the heavy optional dependencies it pulled in. With --baseline, entry
+points more than --tolerance slower than a saved run are logged as regressions and the benchmark exits non-zero.
+"""
+import os
+import re
+import sys
+import json
+import argparse
+import subprocess
+from typing import Dict
+
+from config import logger
+
+# Libraries that should only load on the code paths that use them
+heavy = ['shap', 'matplotlib', 'sklearn', 'sklearn.model_selection', 'scipy.stats', 'cfbd', 'pystan']
+root_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def entry_points() -> Dict[str, str]:
+    with open(os.path.join(root_dir, 'setup.py')) as fp:
+        return dict(re.findall(r"'(\w+) = ([\w.]+):\w+'", fp.read()))
+
+
+def import_time(module: str) -> Dict[str, float]:
+    """
+    Cumulative import time in ms of module and of each heavy library it imported
+    """
+    proc = subprocess.run([sys.executable, '-X', 'importtime', '-c', 'import {}'.format(module)], cwd=root_dir,
+                          capture_output=True, text=True)
+    if proc.returncode != 0:
+        raise RuntimeError('Importing {} failed:\n{}'.format(module, proc.stderr.splitlines()[-1]))
+    times = {}
+    for line in proc.stderr.splitlines():
+        match = re.match(r'import time:\s+\d+ \|\s+(\d+) \|\s+(\S+)$', line)
+        if match and (match.group(2) == module or match.group(2) in heavy):
+            times[match.group(2)] = int(match.group(1)) / 1e3
+    return times
+
+
+def benchmark():
+    parser = argparse.ArgumentParser(prog='Benchmark console script import times')
+    parser.add_argument('--n_iter', type=int, default=3)
+    parser.add_argument('--save', required=False, help='Save the results to this json')
+    parser.add_argument('--baseline', required=False, help='Compare to results saved with --save')
+    parser.add_argument('--tolerance', type=float, default=0.2)
+    args = parser.parse_args()
+
+    results = {}
+    for script, module in entry_points().items():
+        try:
+            runs = [import_time(module) for _ in range(args.n_iter)]
+        except RuntimeError as err:
+            logger.error('{}: {}'.format(script, err))
+            continue
+        best = min(runs, key=lambda times: times[module])
+        results[script] = {'module': module, 'ms': best[module],
+                           'heavy': {lib: ms for lib, ms in best.items() if lib != module}}
+        logger.info('{} ({}): {:.0f} ms, heavy imports: {}'.format(
+            script, module, best[module],
+            ', '.join('{} {:.0f} ms'.format(lib, ms) for lib, ms in results[script]['heavy'].items()) or 'none'))
+
+    if args.save:
+        with open(args.save, 'w') as fp:
+            json.dump(results, fp, indent=4)
+    if args.baseline:
+        with open(args.baseline) as fp:
+            baseline = json.load(fp)
+        regressions = [script for script, result in results.items() if script in baseline and
+                       result['ms'] > (1 + args.tolerance) * baseline[script]['ms']]
+        for script in regressions:
+            logger.error('{} regressed: {:.0f} ms, was {:.0f} ms'.format(
+                script, results[script]['ms'], baseline[script]['ms']))
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    benchmark()
@@ -0,0 +1,59 @@
+"""
+Benchmark the SVR hyper-parameter search.
+
+    python -m benchmarks.kernel_search [--n_games 1000 --n_seasons 7]
+
+Compares GridSearchCV, which computes the kernel inside every fit, against KernelGridSearch, which builds each fold's
+kernel once per kernel / gamma and fits every C / epsilon candidate to it, on the grid used by Model.get_hyper_params.
+"""
+import time
+import argparse
+
+import numpy as np
+from sklearn.pipeline import Pipeline
+from sklearn.svm import SVR
+from sklearn.model_selection import GroupKFold, GridSearchCV
+
+from sports_bettors.analytics.model.search import KernelGridSearch
+from config import logger
+
+parameters = {
+    'model__kernel': ['rbf', 'poly', 'sigmoid'],
+    'model__gamma': ['scale', 'auto'],
+    'model__epsilon': [0.05, 0.1, 0.2],
+    'model__C': [0.1, 0.5, 1, 2, 3]
+}
+
+
+def benchmark():
+    parser = argparse.ArgumentParser(prog='Benchmark SVR grid search')
+    parser.add_argument('--n_games', type=int, default=1000)
+    parser.add_argument('--n_seasons', type=int, default=7)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    X = rng.normal(0, 1, (args.n_games, 8))
+    y = X[:, 0] - 0.5 * X[:, 1] + rng.normal(0, 1, args.n_games)
+    group = rng.integers(0, args.n_seasons, args.n_games)
+    cv = list(GroupKFold(n_splits=args.n_seasons).split(X, y, group))
+
+    start = time.perf_counter()
+    grid = GridSearchCV(Pipeline([('model', SVR())]), cv=cv, param_grid=parameters,
+                        scoring='neg_mean_squared_error', return_train_score=True).fit(X, y)
+    grid_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    search = KernelGridSearch(parameters, cv=cv).fit(X, y)
+    search_time = time.perf_counter() - start
+
+    n_fits = len(search.cv_results_['params']) * len(cv)
+    diff = np.abs(grid.cv_results_['mean_test_score'] - search.cv_results_['mean_test_score']).max()
+    logger.info('Same parameters selected: {}, max score difference: {:.2e}'.format(
+        grid.best_params_ == search.best_params_, diff))
+    logger.info('GridSearchCV:     {:.2f} s, kernel computed in each of {} fits'.format(grid_time, n_fits))
+    logger.info('KernelGridSearch: {:.2f} s, {} kernel matrices for {} fits'.format(
+        search_time, search.n_kernels_, n_fits))
+
+
+if __name__ == '__main__':
+    benchmark()
@@ -0,0 +1,91 @@
+"""
+Benchmark loading the nflverse games through the local mirror.
+
+    python -m benchmarks.nfl_mirror [--n_games 7000 --n_changed 16]
+
+Serves a synthetic games.csv of nflverse's size from a local server and times a plain download and parse against the
+mirror when the file is unchanged (a 304) and when a week of games was scored and scheduled.
+"""
+import time
+import shutil
+import hashlib
+import argparse
+import tempfile
+import threading
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+import numpy as np
+import pandas as pd
+
+from sports_bettors.utils.mirror import Mirror
+from config import logger
+
+
+class Handler(BaseHTTPRequestHandler):
+    content = b''
+
+    def do_GET(self):
+        etag = '"{}"'.format(hashlib.sha1(self.content).hexdigest())
+        if self.headers.get('If-None-Match') == etag:
+            self.send_response(304)
+            self.end_headers()
+            return
+        self.send_response(200)
+        self.send_header('ETag', etag)
+        self.send_header('Content-Length', str(len(self.content)))
+        self.end_headers()
+        self.wfile.write(self.content)
+
+    def log_message(self, *args):
+        pass
+
+
+def simulate(n_games: int, n_changed: int, played: bool) -> bytes:
+    rng = np.random.default_rng(0)
+    df = pd.DataFrame({'game_id': ['game_{}'.format(idx) for idx in range(n_games)],
+                       'season': 1999 + np.arange(n_games) // 272,
+                       'gameday': pd.date_range('1999-09-12', periods=n_games, freq='D').strftime('%Y-%m-%d')})
+    for col in ['away_team', 'home_team', 'stadium', 'roof', 'surface', 'referee', 'away_coach', 'home_coach']:
+        df[col] = rng.choice(['A', 'B', 'C', 'D'], n_games)
+    for col in ['away_score', 'home_score', 'spread_line', 'total_line', 'away_moneyline', 'home_moneyline', 'temp',
+                'wind', 'away_rest', 'home_rest', 'over_odds', 'under_odds']:
+        df[col] = rng.integers(0, 50, n_games).astype(float)
+    # The last games haven't been played yet
+    df.loc[df.index[-n_changed:], ['away_score', 'home_score']] = np.nan
+    if played:
+        df.loc[df.index[-n_changed:], ['away_score', 'home_score']] = 21.
+        df = pd.concat([df, df.tail(n_changed).assign(game_id=lambda d: d['game_id'] + '_next')])
+    return df.to_csv(index=False).encode()
+
+
+def benchmark():
+    parser = argparse.ArgumentParser(prog='Benchmark the games mirror')
+    parser.add_argument('--n_games', type=int, default=7000)
+    parser.add_argument('--n_changed', type=int, default=16)
+    args = parser.parse_args()
+
+    server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    url = 'http://127.0.0.1:{}/games.csv'.format(server.server_address[1])
+    mirror_dir = tempfile.mkdtemp()
+    try:
+        Handler.content = simulate(args.n_games, args.n_changed, played=False)
+        start = time.perf_counter()
+        pd.read_csv(url, parse_dates=['gameday'])
+        logger.info('Download and parse: {:.3f} s'.format(time.perf_counter() - start))
+        Mirror(url, mirror_dir, parse_dates=['gameday']).load()
+
+        for label, played in [('unchanged', False), ('a week played', True)]:
+            Handler.content = simulate(args.n_games, args.n_changed, played=played)
+            mirror = Mirror(url, mirror_dir, parse_dates=['gameday'])
+            start = time.perf_counter()
+            mirror.load()
+            logger.info('Mirror, {}: {:.3f} s, parsed {} rows'.format(
+                label, time.perf_counter() - start, mirror.n_parsed))
+    finally:
+        server.shutdown()
+        shutil.rmtree(mirror_dir)
+
+
+if __name__ == '__main__':
+    benchmark()
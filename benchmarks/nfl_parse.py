@@ -0,0 +1,86 @@
+"""
+Benchmark box score parsing over a directory of saved html pages.
+
+    python -m benchmarks.nfl_parse --html_dir data/sports_bettors/cache/nfl/scraper/html
+
+Compares the streaming parser against the previous two-pass BeautifulSoup parse and checks both return the same result.
+"""
+import os
+import re
+import time
+import argparse
+
+from bs4 import BeautifulSoup
+
+from sports_bettors.utils.nfl.parse import parse_boxscore
+from config import Config, logger
+
+
+def parse_boxscore_soup(html: bytes) -> dict:
+    """
+    Previous implementation: parse the whole page, then re-parse the uncommented team stats div
+    """
+    soup = BeautifulSoup(html, features='lxml')
+    score_tables = soup.find_all('table')[0]
+    quarter_headers = [th.text for th in score_tables.find_all('thead')[0].find_all('th') if len(th.text) > 0]
+    tbody = score_tables.find_all('tbody')[0]
+    quarter_values = [[cell.text for cell in row.find_all('td')] for row in tbody.find_all('tr')]
+
+    all_team = soup.find(id='all_team_stats')
+    soup_box = BeautifulSoup(re.sub('<!--', '', re.sub('-->', '', str(all_team))), features='lxml')
+    box = soup_box.find_all('table')[0]
+    teams = [th.text for th in box.find_all('thead')[0].find_all('th') if len(th.text) > 0]
+    tbody = box.find_all('tbody')[0]
+    features = [header.text for header in tbody.find_all('th')]
+    values = [[cell.text for cell in row.find_all('td')] for row in tbody.find_all('tr')]
+    return {
+        'quarter_headers': quarter_headers,
+        'quarter_values': quarter_values,
+        'teams': teams,
+        'features': features,
+        'values': values
+    }
+
+
+def _time(parser, pages: list, repeat: int) -> float:
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for html in pages:
+            parser(html)
+    return (time.perf_counter() - start) / (repeat * len(pages))
+
+
+def benchmark():
+    parser = argparse.ArgumentParser(prog='Benchmark NFL box score parsing')
+    parser.add_argument('--html_dir', default=os.path.join(Config.DATA_DIR, 'sports_bettors', 'cache', 'nfl',
+                                                           'scraper', 'html'))
+    parser.add_argument('--max_pages', type=int, default=500)
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    pages = []
+    for fn in sorted(os.listdir(args.html_dir))[:args.max_pages]:
+        with open(os.path.join(args.html_dir, fn), 'rb') as fp:
+            pages.append(fp.read())
+    logger.info('Loaded {} pages from {}'.format(len(pages), args.html_dir))
+
+    # Same output from both parsers
+    mismatches = 0
+    for html in pages:
+        try:
+            expected = parse_boxscore_soup(html)
+        except Exception:
+            continue
+        if parse_boxscore(html) != expected:
+            mismatches += 1
+    logger.info('Mismatched pages: {}'.format(mismatches))
+
+    soup_time = _time(parse_boxscore_soup, pages, args.repeat)
+    stream_time = _time(parse_boxscore, pages, args.repeat)
+    logger.info('BeautifulSoup: {:.2f} ms / page'.format(soup_time * 1000))
+    logger.info('Streaming:     {:.2f} ms / page'.format(stream_time * 1000))
+    logger.info('Speed-up:      {:.1f}x'.format(soup_time / stream_time))
+
+
+if __name__ == '__main__':
+    benchmark()
@@ -0,0 +1,75 @@
+"""
+Benchmark reading NFL raw box scores into curated rows.
+
+    python -m benchmarks.nfl_raw_ingest [--n_games 20000]
+
+Writes one team's history both as a legacy indented {team}_raw.json and as newline-delimited json, then compares
+json.load + DataFrame.from_records against streaming into pre-sized columns, including peak traced memory.
+"""
+import os
+import json
+import time
+import shutil
+import argparse
+import tempfile
+import tracemalloc
+
+import pandas as pd
+
+from sports_bettors.utils.nfl.curate import curate_game, curate_raw_file
+from sports_bettors.utils.nfl.parse import parse_boxscore
+from sports_bettors.utils.nfl.raw import raw_path, write_games
+from config import logger
+
+FIXTURE = os.path.join(os.path.dirname(os.path.dirname(os.path.realpath(__file__))), 'tests', 'fixtures', 'nfl',
+                       '201009120chi.htm')
+
+
+def curate_legacy(path: str) -> pd.DataFrame:
+    """
+    Previous implementation: load the whole file, then a dict per game
+    """
+    with open(path) as fp:
+        team_data = json.load(fp)
+    return pd.DataFrame.from_records([curate_game(date, game_data) for date, game_data in team_data.items()])
+
+
+def _measure(func, path: str):
+    tracemalloc.start()
+    start = time.perf_counter()
+    df = func(path)
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return df, elapsed, peak
+
+
+def benchmark():
+    parser = argparse.ArgumentParser(prog='Benchmark NFL raw ingest')
+    parser.add_argument('--n_games', type=int, default=20000)
+    args = parser.parse_args()
+
+    with open(FIXTURE, 'rb') as fp:
+        game = parse_boxscore(fp.read())
+    games = {str(pd.Timestamp('1970-01-01') + pd.Timedelta(days=idx))[:10]: game for idx in range(args.n_games)}
+
+    tmp_dir = tempfile.mkdtemp()
+    try:
+        legacy_path = os.path.join(tmp_dir, 'chi_raw.json')
+        with open(legacy_path, 'w') as fp:
+            json.dump(games, fp, indent=4)
+        write_games(raw_path(tmp_dir, 'chi'), games)
+        del games
+
+        df_legacy, legacy_time, legacy_peak = _measure(curate_legacy, legacy_path)
+        df_stream, stream_time, stream_peak = _measure(curate_raw_file, raw_path(tmp_dir, 'chi'))
+    finally:
+        shutil.rmtree(tmp_dir)
+
+    logger.info('{} games, same result: {}'.format(args.n_games, df_legacy.equals(df_stream)))
+    logger.info('json.load + from_records: {:.2f} s, peak {:.1f} MB'.format(legacy_time, legacy_peak / 1e6))
+    logger.info('Streamed into columns:    {:.2f} s, peak {:.1f} MB'.format(stream_time, stream_peak / 1e6))
+
+
+if __name__ == '__main__':
+    benchmark()
@@ -14,8 +14,9 @@ setup(
         'sb_predict = sports_bettors.api:api_cli',
         'sb_generate_predictors = sports_bettors.api:create_predictor_sets',
         'sb_upload = sports_bettors.upload:upload',
-        'sb_refresh = sports_bettors.refresh:refresh',
-        'sb_predict_next_week = sports_bettors.predict:predict_cli'
+        'sb_refresh = sports_bettors.refresh:refresh_cli',
+        'sb_predict_next_week = sports_bettors.predict:predict_cli',
+        'sb_report = sports_bettors.report:report_cli'
     ]},
     install_requires=[
         'pandas',
@@ -29,6 +30,7 @@ setup(
         # 'cython',
         # 'pystan',
         'beautifulsoup4',
+        'lxml',
         'flask',
         'plotly',
         'dash',
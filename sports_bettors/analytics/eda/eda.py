@@ -1,6 +1,5 @@
 import os
 import re
-import cfbd
 import time
 import datetime
 from tqdm import tqdm
@@ -8,14 +7,19 @@ from tqdm import tqdm
 from typing import Optional, Dict
 import pandas as pd
 import numpy as np
-import matplotlib.pyplot as plt
-from matplotlib.backends.backend_pdf import PdfPages
 
+from sports_bettors.analytics import schema
+from sports_bettors.utils.mirror import nflverse_games, nflverse_games_url, nflverse_games_dtypes
+from sports_bettors.utils.store import GameStore
+from sports_bettors.utils import instrument
 from config import logger
 
 
 class Eda(object):
-    link_to_data = 'https://raw.githubusercontent.com/nflverse/nfldata/master/data/games.csv'
+    link_to_data = nflverse_games_url
+    # Columns of stored games to load, all of them for EDA
+    raw_columns = None
+    nfl_dtypes = nflverse_games_dtypes
     min_date = '2017-06-01'
     training_years = 5
     college_conferences = ['ACC', 'B12', 'B1G', 'SEC', 'Pac-10', 'PAC',
@@ -25,6 +29,7 @@ class Eda(object):
     def __init__(self, league: str = 'nfl', overwrite: bool = False):
         self.league = league
         self.overwrite = overwrite
+        self.store = GameStore(os.path.join(os.getcwd(), 'data', 'sports_bettors', 'store'))
         self.save_dir = os.path.join(os.getcwd(), 'docs', 'EDA', self.league)
         if not os.path.exists(self.save_dir):
             os.makedirs(self.save_dir)
@@ -46,6 +51,7 @@ class Eda(object):
 
     @staticmethod
     def _calc_metrics(df: pd.DataFrame) -> pd.DataFrame:
+        df = schema.widen(df)
         # Metrics
         df['spread_actual'] = df['home_score'] - df['away_score']
         df['spread_diff'] = df['away_score'] + df['spread_line'] - df['home_score']
@@ -79,6 +85,7 @@ class Eda(object):
         Pull data from https://github.com/CFBD/cfbd-python
         As of 10/2023 it is "free to use without restrictions"
         """
+        import cfbd
 
         configuration = cfbd.Configuration()
         configuration.api_key['Authorization'] = os.environ['API_KEY_COLLEGE_API']
@@ -100,7 +107,7 @@ class Eda(object):
                 except:
                     logger.error('API Miss')
                     if predict:
-                        return pd.read_csv(os.path.join(self.cache_dir, 'df_training.csv'), parse_dates=['gameday'])
+                        return self.store.load(self.league)
                     else:
                         df_raw = pd.read_csv(os.path.join(self.cache_dir, 'df_training_raw_archive_20231031.csv'), parse_dates=['gameday'])
                         api_response = []
@@ -181,26 +188,59 @@ class Eda(object):
         else:
             return -1 / payout * 100
 
+    def _download_nfl(self) -> pd.DataFrame:
+        """
+        nflverse games, from a local mirror that is only re-downloaded and re-parsed where it changed upstream
+        """
+        logger.info('Downloading Data from Github')
+        return nflverse_games(os.path.join(self.cache_dir, 'mirror'), url=self.link_to_data).load()
+
+    @instrument.timed
     def etl(self) -> pd.DataFrame:
-        if os.path.exists(os.path.join(self.cache_dir, 'df_training.csv')) and not self.overwrite:
-            return pd.read_csv(os.path.join(self.cache_dir, 'df_training.csv'), parse_dates=['gameday'])
+        return self.load_raw()
+
+    def history_start(self) -> Optional[str]:
+        """
+        First game day needed, all of them for EDA
+        """
+        return None
+
+    def ingest(self, predict: bool = False):
+        """
+        Download the league's games into the game store
+        """
+        if self.league == 'nfl':
+            df = self._download_nfl()
+        elif self.league == 'college_football':
+            df = self._download_college_football(predict=predict)
+        else:
+            raise NotImplementedError(self.league)
+        self.store.write(self.league, df)
+
+    def load_games(self, start: Optional[str] = None, end: Optional[str] = None) -> pd.DataFrame:
+        """
+        Stored games from start to end (inclusive), with the columns this stage uses in their compact types
+        """
+        df = self.store.load(self.league, start=start, end=end, columns=self.raw_columns,
+                             dtype=self.nfl_dtypes if self.league == 'nfl' else None)
+        return schema.enforce(df)
+
+    def load_raw(self) -> pd.DataFrame:
+        legacy_path = os.path.join(self.cache_dir, 'df_training.csv')
+        if not self.store.has(self.league) and os.path.exists(legacy_path) and not self.overwrite:
+            logger.info(f'Moving {legacy_path} to the game store')
+            self.store.write(self.league, pd.read_csv(legacy_path, parse_dates=['gameday']))
+        if self.overwrite or not self.store.has(self.league):
+            self.ingest()
+        df = self.load_games(start=self.history_start())
         if self.league == 'nfl':
-            # Model training
-            logger.info('Downloading Data from Github')
-            df = pd.read_csv(self.link_to_data, parse_dates=['gameday'])
             df = df[
                 # Regular season only
                 (df['game_type'] == 'REG')
                 &
                 # Not planned
                 (~df['away_score'].isna())
-            ]
-        elif self.league == 'college_football':
-            df = self._download_college_football()
-        else:
-            raise NotImplementedError(self.league)
-        # Save to cache
-        df.to_csv(os.path.join(self.cache_dir, 'df_training.csv'), index=False)
+            ].reset_index(drop=True)
         return df
 
     def spread_accuracy(self, df: Optional[pd.DataFrame] = None) -> pd.DataFrame:
@@ -236,8 +276,12 @@ class Eda(object):
         df['net_gain'].sum() / df['n'].sum()
         return df
 
-    def analyze(self):
-        df = self.etl()
+    def analyze(self, df: Optional[pd.DataFrame] = None):
+        import matplotlib.pyplot as plt
+        from matplotlib.backends.backend_pdf import PdfPages
+
+        if df is None:
+            df = self.etl()
         # Moneyline accuracy
         df_ml = self.moneyline_accuracy(df)
         # Validate
@@ -1,109 +1,111 @@
 import os
 import time
 import datetime
-from typing import Tuple
+from typing import List, Optional, Tuple
 import pandas as pd
 
-from sports_bettors.analytics.model.policy import Policy
+from sports_bettors.utils import instrument
 from config import Config
 
 
 class Model(object):
 
-    def __init__(self):
+    def __init__(self, leagues: Optional[List[str]] = None):
+        # Importing a submodule (e.g. report) runs this package, only load the modeling stack when predicting
+        from sports_bettors.analytics.model.policy import Policy
+
+        leagues = ['nfl', 'college_football'] if leagues is None else leagues
         self.models = {
-            'nfl': {
-                'spread': Policy(league='nfl', response='spread').load_results(),
-                'over': Policy(league='nfl', response='over').load_results()
-            },
-            'college_football': {
-                'spread': Policy(league='college_football', response='spread').load_results(),
-                'over': Policy(league='college_football', response='over').load_results(),
-            }
+            league: {
+                'spread': Policy(league=league, response='spread').load_results(),
+                'over': Policy(league=league, response='over').load_results()
+            } for league in leagues
         }
         self.save_dir = os.path.join(os.getcwd(), 'data', 'predictions')
 
+    @instrument.timed
     def predict_next_week(self):
-        for league, models in self.models.items():
-            df_out, policies = [], []
-            for response, model in models.items():
+        for league in self.models.keys():
+            self.predict_league(league)
+
+    @instrument.timed
+    def predict_league(self, league: str):
+        models = self.models[league]
+        df_out, policies = [], []
+        # Games are downloaded once for the league, each response only reads the last window
+        next(iter(models.values())).ingest(predict=True)
+        for response, model in models.items():
 
-                if league == 'nfl':
-                    df = pd.read_csv(model.link_to_data, parse_dates=['gameday'])
-                    df = df[df['gameday'] > (pd.Timestamp(model.TODAY) - datetime.timedelta(days=model.window))]
-                    df = model._add_metrics(df)
-                elif league == 'college_football':
-                    df = model._download_college_football(predict=True)
-                    df = model._add_metrics(df)
-                else:
-                    raise NotImplementedError(league)
+            df = model.load_games(
+                start=pd.Timestamp(model.TODAY) - datetime.timedelta(days=model.window) + datetime.timedelta(days=1))
+            df = model._add_metrics(df)
 
-                # Engineer features from raw
-                df = model.wrangle(df)
+            # Engineer features from raw
+            df = model.wrangle(df)
 
-                # Filter for predictions
-                test_games = ['2023_07_SF_MIN', 'COLLEGE_TEST_GAME']
-                df = df[
-                    # Next week of League
-                    df['gameday'].between(pd.Timestamp(model.TODAY), pd.Timestamp(model.TODAY) + datetime.timedelta(days=10))
-                    |
-                    # Keep this SF game as a test case
-                    df['game_id'].isin(test_games)
-                ].copy()
+            # Filter for predictions
+            test_games = ['2023_07_SF_MIN', 'COLLEGE_TEST_GAME']
+            df = df[
+                # Next week of League
+                df['gameday'].between(pd.Timestamp(model.TODAY), pd.Timestamp(model.TODAY) + datetime.timedelta(days=10))
+                |
+                # Keep this SF game as a test case
+                df['game_id'].isin(test_games)
+            ].copy()
 
-                # Filter for bad features
-                for feature in model.features:
-                    df = df[~df[feature].isna()]
-                # Get preds as expected "actual" spread / total from model
-                df['preds'] = model.predict(df)
-                # Get diff from odds-line
-                df['preds_against_line'] = df['preds'] - df[model.line_col]
-                # Label bets based on human-derived thresholds
-                for policy, p_params in model.policies.items():
-                    df[f'Bet_{policy}'] = df['preds_against_line'].apply(lambda p: model.apply_policy(p, policy))
-                    policies.append(policy)
-                df['Bet_type'] = response
-                df_out.append(df)
-            df_out = pd.concat(df_out)
-            policies = sorted(list(set(policies)))
-            # Col-names
-            col_names_spread = {f'Bet_{p}': f'Spread_Bet_{p}' for p in policies}
-            col_names_spread['preds'] = 'spread_adj'
-            col_names_spread['preds_against_line'] = 'model_vs_spread'
-            col_names_over = {f'Bet_{p}': f'Over_Bet_{p}' for p in policies}
-            col_names_over['preds'] = 'over_adj'
-            col_names_over['preds_against_line'] = 'model_vs_over'
-            # Pivot on bet-type
-            df_out = df_out[df_out['Bet_type'] == 'spread'].\
-                drop('Bet_type', axis=1).\
-                rename(columns=col_names_spread).\
-                merge(
-                    df_out[df_out['Bet_type'] == 'over'].\
-                      drop('Bet_type', axis=1).\
-                      rename(columns=col_names_over)[
-                            ['game_id', 'gameday', 'over_adj', 'model_vs_over'] + [f'Over_Bet_{p}' for p in policies]
-                      ], on=['game_id', 'gameday'], how='left'
-                )
-            print(df_out[[
-                'game_id',
-                'gameday',
-                'money_line',
-                'spread_line',
-                'spread_adj',
-                'model_vs_spread',
-               ] + [f'Spread_Bet_{p}' for p in policies] + [
-                'total_line',
-                'over_adj',
-                'model_vs_over',
-               ] + [f'Over_Bet_{p}' for p in policies]
-            ].sort_values(['gameday', 'game_id']).reset_index(drop=True))
-            # Save results
-            save_dir = os.path.join(os.getcwd(), 'data', 'predictions', league)
-            fn = f'df_{int(time.time())}.csv'
-            if not os.path.exists(save_dir):
-                os.makedirs(save_dir)
-            df_out.to_csv(os.path.join(save_dir, fn), index=False)
-            self.format_for_consumption(df_out, league)
+            # Filter for bad features
+            for feature in model.features:
+                df = df[~df[feature].isna()]
+            # Get preds as expected "actual" spread / total from model
+            df['preds'] = model.predict(df)
+            # Get diff from odds-line
+            df['preds_against_line'] = df['preds'] - df[model.line_col]
+            # Label bets based on human-derived thresholds
+            df_bets = model.apply_policy_many(df['preds_against_line'])
+            df = pd.concat([df, df_bets.add_prefix('Bet_')], axis=1)
+            policies.extend(df_bets.columns)
+            df['Bet_type'] = response
+            df_out.append(df)
+        df_out = pd.concat(df_out)
+        policies = sorted(list(set(policies)))
+        # Col-names
+        col_names_spread = {f'Bet_{p}': f'Spread_Bet_{p}' for p in policies}
+        col_names_spread['preds'] = 'spread_adj'
+        col_names_spread['preds_against_line'] = 'model_vs_spread'
+        col_names_over = {f'Bet_{p}': f'Over_Bet_{p}' for p in policies}
+        col_names_over['preds'] = 'over_adj'
+        col_names_over['preds_against_line'] = 'model_vs_over'
+        # Pivot on bet-type
+        df_out = df_out[df_out['Bet_type'] == 'spread'].\
+            drop('Bet_type', axis=1).\
+            rename(columns=col_names_spread).\
+            merge(
+                df_out[df_out['Bet_type'] == 'over'].\
+                  drop('Bet_type', axis=1).\
+                  rename(columns=col_names_over)[
+                        ['game_id', 'gameday', 'over_adj', 'model_vs_over'] + [f'Over_Bet_{p}' for p in policies]
+                  ], on=['game_id', 'gameday'], how='left'
+            )
+        print(df_out[[
+            'game_id',
+            'gameday',
+            'money_line',
+            'spread_line',
+            'spread_adj',
+            'model_vs_spread',
+           ] + [f'Spread_Bet_{p}' for p in policies] + [
+            'total_line',
+            'over_adj',
+            'model_vs_over',
+           ] + [f'Over_Bet_{p}' for p in policies]
+        ].sort_values(['gameday', 'game_id']).reset_index(drop=True))
+        # Save results
+        save_dir = os.path.join(os.getcwd(), 'data', 'predictions', league)
+        fn = f'df_{int(time.time())}.csv'
+        if not os.path.exists(save_dir):
+            os.makedirs(save_dir)
+        df_out.to_csv(os.path.join(save_dir, fn), index=False)
+        self.format_for_consumption(df_out, league)
 
     def format_for_consumption(self, df: pd.DataFrame, league: str):
         """
@@ -0,0 +1,112 @@
+import os
+import json
+import hashlib
+
+import pandas as pd
+
+from sports_bettors.utils.manifest import Manifest
+from config import logger
+
+
+def code_version() -> str:
+    """
+    Content hash of the modeling code, so changes to training or validation invalidate stored artifacts
+    """
+    sha1 = hashlib.sha1()
+    package_dir = os.path.dirname(os.path.abspath(__file__))
+    for fn in sorted(os.listdir(package_dir)):
+        if fn.endswith('.py'):
+            sha1.update(fn.encode())
+            sha1.update(Manifest.file_hash(os.path.join(package_dir, fn)).encode())
+    return sha1.hexdigest()[:16]
+
+
+def _config(model) -> dict:
+    return {
+        'league': model.league,
+        'response': model.response,
+        'features': model.features,
+        'response_col': model.response_col,
+        'line_col': model.line_col,
+        'param_grid': model.param_grid,
+        'balance_data': model.balance_data[model.league],
+        'code_version': code_version(),
+    }
+
+
+def _hash(config: dict, df: pd.DataFrame) -> str:
+    sha1 = hashlib.sha1(json.dumps(config, sort_keys=True, default=str).encode())
+    sha1.update(pd.util.hash_pandas_object(df, index=False).values.tobytes())
+    return sha1.hexdigest()[:16]
+
+
+def training_key(model, df_: pd.DataFrame) -> str:
+    """
+    Content hash of what the fitted model depends on: the training split's features, response, weights and seasons
+    (the CV groups), its configuration, the hyper-parameter grid and the code version. Unlike the validation key it
+    doesn't change from day to day, only when games move into the training split.
+    """
+    columns = model.features + [model.response_col, 'gameday'] + \
+        (['sample_weight'] if 'sample_weight' in df_.columns else [])
+    return _hash(_config(model), df_[columns])
+
+
+def artifact_key(model, df: pd.DataFrame) -> str:
+    """
+    Content hash of everything the validation and policy results depend on: the wrangled games they are computed on,
+    the model's configuration, the validation window, the day the run is validated as of and the code version
+    """
+    config = {**_config(model), 'columns': list(df.columns), 'val_window': model.val_window, 'today': model.TODAY}
+    return _hash(config, df)
+
+
+class Artifacts(object):
+    """
+    Tracks which inputs produced the stored model (model_dir/model.pkl) and validation results (save_dir), so a run
+    with the same training split can reuse the fitted model, and a rerun on the same day the validation results too
+    """
+    model_entry = 'model'
+    entry = 'artifacts'
+
+    def __init__(self, model):
+        self.model = model
+        self.manifest = Manifest(os.path.join(model.model_dir, 'manifest.json'))
+
+    def exist(self) -> bool:
+        return os.path.exists(os.path.join(self.model.model_dir, 'model.pkl')) and \
+            os.path.exists(os.path.join(self.model.save_dir, 'results.json'))
+
+    def _log(self, what: str, hit: bool, key: str):
+        logger.info('{} cache {} for {} on {} ({})'.format(
+            what, 'hit' if hit else 'miss', self.model.league, self.model.response, key))
+
+    def hit(self, key: str) -> bool:
+        """
+        Whether the stored model and its validation results are current for the artifact key
+        """
+        hit = self.exist() and not self.manifest.changed(self.entry, key)
+        self._log('Artifact', hit, key)
+        return hit
+
+    def model_hit(self, key: str) -> bool:
+        """
+        Whether the stored model was fit on the same training split, see training_key
+        """
+        hit = os.path.exists(os.path.join(self.model.model_dir, 'model.pkl')) and \
+            not self.manifest.changed(self.model_entry, key)
+        self._log('Model', hit, key)
+        return hit
+
+    def restore(self):
+        """
+        Reuse the fitted estimator and hyper-parameters of the stored model, fit_transform refits the same scaler
+        """
+        stored = self.model.load_results()
+        self.model.model = stored.model
+        self.model.hyper_params = stored.hyper_params
+        self.model.opt_metric = stored.opt_metric
+
+    def record(self, key: str, model_key: str):
+        self.manifest.update(self.model_entry, model_key)
+        self.manifest.update(self.entry, key, today=self.model.TODAY)
+        self.manifest.save()
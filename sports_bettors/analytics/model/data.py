@@ -6,9 +6,10 @@ import pandas as pd
 from tqdm import tqdm
 import datetime
 import time
-import cfbd
 
 from sports_bettors.analytics.eda.eda import Eda
+from sports_bettors.analytics import schema
+from sports_bettors.utils import instrument
 from config import logger
 
 
@@ -17,6 +18,9 @@ class Data(Eda):
     # https://github.com/nflverse/nfldata
     link_to_data = 'https://raw.githubusercontent.com/nflverse/nfldata/master/data/games.csv'
     window = 365
+    # Columns of stored games used for training and prediction
+    raw_columns = ['game_id', 'gameday', 'game_type', 'away_team', 'home_team', 'away_score', 'home_score',
+                   'spread_line', 'total_line', 'away_moneyline', 'home_moneyline']
 
     college_conferences = ['ACC', 'B12', 'B1G', 'SEC', 'Pac-10', 'PAC',
                            # 'Ind'
@@ -57,6 +61,8 @@ class Data(Eda):
         Pull data from https://github.com/CFBD/cfbd-python
         As of 10/2023 it is "free to use without restrictions"
         """
+        import cfbd
+
         current_year = datetime.datetime.today().year
         if not predict:
             years = list(np.linspace(current_year - self.training_years - 1, current_year, self.training_years + 2))
@@ -79,7 +85,7 @@ class Data(Eda):
                 except:
                     logger.error('API Miss')
                     if predict:
-                        return pd.read_csv(os.path.join(self.cache_dir, 'df_training.csv'), parse_dates=['gameday'])
+                        return self.store.load(self.league)
                     else:
                         df_raw = pd.read_csv(os.path.join(self.cache_dir, 'df_training_raw.csv'), parse_dates=['gameday'])
                         api_response = []
@@ -153,46 +159,23 @@ class Data(Eda):
 
         return df
 
+    @instrument.timed
     def etl(self) -> pd.DataFrame:
-        if os.path.exists(os.path.join(self.cache_dir, 'df_training.csv')) and not self.overwrite:
-            df = pd.read_csv(os.path.join(self.cache_dir, 'df_training.csv'), parse_dates=['gameday'])
-            df = self._add_metrics(df)
-            return df
-        if self.league == 'nfl':
-            # Model training
-            logger.info('Downloading Data from Github')
-            df = pd.read_csv(self.link_to_data, parse_dates=['gameday'])
-            df = df[
-                # Regular season only
-                (df['game_type'] == 'REG')
-                &
-                # Not planned
-                (~df['away_score'].isna())
-            ]
-        elif self.league == 'college_football':
-            df = self._download_college_football()
-        else:
-            raise NotImplementedError(self.league)
+        return self._add_metrics(self.load_raw())
 
-        # Save to cache
-        df.to_csv(os.path.join(self.cache_dir, 'df_training.csv'), index=False)
-
-        # Add metrics off raw data for each game
-        df = self._add_metrics(df)
-        return df
+    def history_start(self) -> str:
+        """
+        Wrangling looks back `window` days from games as early as `window` days before the training start
+        """
+        return datetime.datetime.strftime(pd.Timestamp(self.training_start) - pd.Timedelta(days=2 * self.window),
+                                          '%Y-%m-%d')
 
     @staticmethod
+    @instrument.timed
     def _add_metrics(df: pd.DataFrame) -> pd.DataFrame:
+        # Derived at full precision, they're model inputs
+        df = schema.widen(df)
         # Metrics
-        def _define_spread_favorite(r) -> Optional[float]:
-            # away was favorite
-            if r['spread_line'] <= 0:
-                return r['away_score'] - r['home_score']
-            # home was favorite
-            elif r['spread_line'] > 0:
-                return r['home_score'] - r['away_score']
-            else:
-                return None
         # Actual spread from perspective of away team
         df['spread_actual'] = df['home_score'] - df['away_score']
         # Difference between actual and odds-spread from perspective of away team
@@ -200,7 +183,9 @@ class Data(Eda):
         # odds-spread from perspective of the favorite
         df['spread_favorite'] = df['spread_line'].abs()
         # Actual spread from persepctive of favorite
-        df['spread_favorite_actual'] = df.apply(_define_spread_favorite, axis=1)
+        # away was favorite, home was favorite, or no line
+        df['spread_favorite_actual'] = (df['away_score'] - df['home_score']).\
+            where(df['spread_line'] <= 0, (df['home_score'] - df['away_score']).where(df['spread_line'] > 0))
         # Difference between actual and odds-spread from perspective of favorite team
         df['spread_favorite_diff'] = df['spread_favorite_actual'] - df['spread_favorite']
         # Actual total points
@@ -211,17 +196,15 @@ class Data(Eda):
 
     @staticmethod
     def label_teams(df: pd.DataFrame) -> pd.DataFrame:
-        records = []
-        for row in df.to_dict(orient='records'):
-            # Away team is favorite
-            if row['spread_line'] <= 0:
-                record = {re.sub('home', 'underdog', re.sub('away', 'favorite', str(k))): v for k, v in row.items()}
-                records.append(record)
-            else:
-                record = {re.sub('home', 'favorite', re.sub('away', 'underdog', str(k))): v for k, v in row.items()}
-                records.append(record)
-        return pd.DataFrame.from_records(records)
-
+        # Away team is favorite, otherwise home team is (or no line)
+        away_favorite = df['spread_line'] <= 0
+        df_away = df.rename(columns=lambda k: re.sub('home', 'underdog', re.sub('away', 'favorite', str(k))))
+        df_home = df.rename(columns=lambda k: re.sub('home', 'favorite', re.sub('away', 'underdog', str(k))))
+        columns = list(df_away.columns) + [col for col in df_home.columns if col not in df_away.columns]
+        return df_away.reindex(columns=columns).\
+            where(away_favorite, df_home.reindex(columns=columns), axis=0).reset_index(drop=True)
+
+    @instrument.timed
     def wrangle(self, df: Optional[pd.DataFrame] = None) -> pd.DataFrame:
         if df is None:
             df = self.etl()
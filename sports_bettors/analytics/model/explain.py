@@ -0,0 +1,76 @@
+import os
+import pickle
+import hashlib
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+from joblib import Parallel, delayed
+
+from config import logger
+
+
+def model_version(model) -> str:
+    """
+    Content hash of a fitted model's estimator, scaler and features
+    """
+    return hashlib.sha1(pickle.dumps((model.model, model.scaler, model.features))).hexdigest()[:16]
+
+
+def _kernel_shap_values(explainer, X: np.ndarray, nsamples: int) -> np.ndarray:
+    shap_values = explainer.shap_values(X, nsamples=nsamples, silent=True)
+    return np.asarray(shap_values[1] if isinstance(shap_values, list) else shap_values)
+
+
+class Explainer(object):
+    """
+    SHAP values for a fitted Model on transformed (scaled) features.
+
+    A KernelExplainer on a k-means summary of the background rather than every background row, which is what makes
+    kernel SHAP tractable here. The built explainer is cached per model version and background, and rows are split
+    into one chunk per job so each process receives the explainer once. Kernel SHAP is still the slowest part of
+    validation, so it is opt-in.
+    """
+    # Background is summarized to this many weighted centroids
+    n_background = 20
+    nsamples = 100
+
+    def __init__(self, model, background: pd.DataFrame, cache_dir: Optional[str] = None, n_jobs: Optional[int] = None):
+        self.model = model
+        self.features = list(background.columns)
+        self.version = model_version(model)
+        self.n_jobs = min(model.n_jobs, os.cpu_count() or 1) if n_jobs is None else n_jobs
+        self.cache_dir = os.path.join(model.model_dir, 'shap') if cache_dir is None else cache_dir
+        self.explainer = self._kernel_explainer(background)
+        self.expected_value = self.explainer.expected_value
+
+    def _kernel_explainer(self, background: pd.DataFrame):
+        # The summary and its predictions only change with the model or its background, reuse them across runs
+        key = hashlib.sha1(background.values.tobytes()).hexdigest()[:16]
+        cache_path = os.path.join(self.cache_dir, 'explainer_{}_{}.pkl'.format(self.version, key))
+        if os.path.exists(cache_path):
+            logger.info('Loading SHAP explainer for model {}'.format(self.version))
+            with open(cache_path, 'rb') as fp:
+                return pickle.load(fp)
+        import shap
+        summary = shap.kmeans(background, min(self.n_background, background.shape[0]))
+        explainer = shap.KernelExplainer(self.model.model.predict, summary, link='identity')
+        if not os.path.exists(self.cache_dir):
+            os.makedirs(self.cache_dir)
+        with open(cache_path + '.tmp', 'wb') as fp:
+            pickle.dump(explainer, fp)
+        os.replace(cache_path + '.tmp', cache_path)
+        return explainer
+
+    def shap_values(self, X: pd.DataFrame) -> np.ndarray:
+        """
+        SHAP values with one row per row of X and one column per feature
+        """
+        X = X[self.features].values
+        # One chunk per job, the explainer is pickled to each process once rather than once per small chunk
+        chunks = [chunk for chunk in np.array_split(X, max(1, min(self.n_jobs, X.shape[0]))) if chunk.shape[0] > 0]
+        logger.info('Explaining {} rows in {} chunks with {} jobs'.format(X.shape[0], len(chunks), self.n_jobs))
+        shap_values = Parallel(n_jobs=self.n_jobs)(
+            delayed(_kernel_shap_values)(self.explainer, chunk, self.nsamples) for chunk in chunks
+        )
+        return np.concatenate(shap_values, axis=0)
@@ -9,13 +9,12 @@ import pandas as pd
 
 from sklearn.pipeline import Pipeline
 from sklearn.preprocessing import StandardScaler
-from sklearn.utils import resample
 from sklearn.svm import SVR
-from sklearn.model_selection import GroupKFold, GridSearchCV
 
-import shap
 
 from sports_bettors.analytics.model.data import Data
+from sports_bettors.analytics.model.explain import Explainer
+from sports_bettors.utils import instrument
 from config import logger, Config
 
 
@@ -25,6 +24,12 @@ class Model(Data):
     TODAY = datetime.datetime.strftime(datetime.datetime.today(), '%Y-%m-%d')
 
     n_jobs = 100
+    param_grid = {
+        'model__kernel': ['rbf', 'poly', 'sigmoid'],
+        'model__gamma': ['scale', 'auto'],
+        'model__epsilon': [0.05, 0.1, 0.2],
+        'model__C': [0.1, 0.5, 1, 2, 3]
+    }
 
     model_data_config = {
         'nfl': {
@@ -155,26 +160,16 @@ class Model(Data):
             os.makedirs(self.model_dir)
 
     @staticmethod
-    def make_resample(_df, column):
+    def balance_weights(labels: pd.Series) -> pd.Series:
         """
-        From stack-overflow
-        https://stackoverflow.com/questions/53218341/up-sampling-imbalanced-datasets-minor-classes
+        Per-row weights that give every class the total weight of the largest class.
+
+        Equivalent to upsampling each class to the size of the largest one, without duplicating rows.
         """
-        dfs_r, dfs_c, bigger, ignore = {}, {}, 0, ''
-        for c in _df[column].unique():
-            dfs_c[c] = _df[_df[column] == c]
-            if dfs_c[c].shape[0] > bigger:
-                bigger = dfs_c[c].shape[0]
-                ignore = c
-        for c in dfs_c:
-            if c == ignore:
-                continue
-            if bigger == dfs_c[c].shape[0]:
-                dfs_r[c] = dfs_c[c]
-            else:
-                dfs_r[c] = resample(dfs_c[c], replace=True, n_samples=bigger - dfs_c[c].shape[0], random_state=0)
-        return pd.concat([dfs_r[c] for c in dfs_r] + [_df])
+        counts = labels.value_counts()
+        return labels.map(counts.max() / counts).astype(float)
 
+    @instrument.timed
     def fit_transform(self, df: Optional[pd.DataFrame] = None, val: bool = False
                       ) -> Tuple[pd.DataFrame, pd.DataFrame, pd.DataFrame]:
         if df is None:
@@ -189,17 +184,13 @@ class Model(Data):
         df_ = df[df['gameday'] < (pd.Timestamp(self.TODAY) - pd.Timedelta(days=self.val_window))].copy()
         df_val = df[df['gameday'] > (pd.Timestamp(self.TODAY) - pd.Timedelta(days=self.val_window))].copy()
 
-        # Balance Data
+        # Balance Data, as training weights for whether the favorite covered / the over hit
         if self.balance_data[self.league] and not val:
-            df_['balance'] = df_[self.response_col] > df_[self.line_col]
-            df_val['balance'] = df_val[self.response_col] > df_val[self.line_col]
-            df_ = self.make_resample(df_, 'balance')
-            df_val = self.make_resample(df_val, 'balance')
-            df = pd.concat([df_, df_val]).reset_index(drop=True).drop('balance', axis=1)
+            df_['sample_weight'] = self.balance_weights(df_[self.response_col] > df_[self.line_col])
 
         # Scale features
         self.scaler = StandardScaler()
-        self.scaler.fit(df_[self.features])
+        self.scaler.fit(df_[self.features], sample_weight=df_['sample_weight'] if 'sample_weight' in df_ else None)
 
         if self.response == 'spread':
             # Clip training data so it doesn't over-penalize bad spreads
@@ -210,7 +201,9 @@ class Model(Data):
 
         return df_, df_val, df
 
-    def get_hyper_params(self, X: pd.DataFrame, y: pd.DataFrame, group: pd.Series) -> Dict[str, float]:
+    @instrument.timed
+    def get_hyper_params(self, X: pd.DataFrame, y: pd.DataFrame, group: pd.Series,
+                         sample_weight: Optional[np.ndarray] = None) -> Dict[str, float]:
         # if self.response == 'spread' and self.league == 'nfl':
         #     self.opt_metric = -9999
         #     return {
@@ -220,34 +213,23 @@ class Model(Data):
         #         'model__C': 1
         #     }
 
-        # Define model
-        model = Pipeline([('model', SVR())])
-        parameters = {
-            'model__kernel': ['rbf', 'poly', 'sigmoid'],
-            'model__gamma': ['scale', 'auto'],
-            'model__epsilon': [0.05, 0.1, 0.2],
-            'model__C': [0.1, 0.5, 1, 2, 3]
-        }
+        from sklearn.model_selection import GroupKFold
+        from sports_bettors.analytics.model.search import KernelGridSearch
+
         gkf = GroupKFold(n_splits=group.nunique())
-        grid = GridSearchCV(
-            model,
-            cv=gkf.split(X, y, group),
-            param_grid=parameters,
-            # scoring='r2',
-            scoring='neg_mean_squared_error',
-            return_train_score=True,
-            verbose=1,
-            n_jobs=None
-        )
+        # Same search as GridSearchCV, reusing each fold's kernel matrix across C / epsilon
+        grid = KernelGridSearch(param_grid=self.param_grid, cv=gkf.split(X, y, group))
         logger.info(f'Running Grid Search for {self.league} on {self.response}')
-        grid.fit(X, y)
+        grid.fit(X, y, sample_weight=sample_weight)
         df = pd.DataFrame().from_dict(grid.cv_results_)
         self.opt_metric = df['mean_test_score'].max()
         df = df[df['mean_test_score'] == self.opt_metric]
         return df['params'].iloc[0]
 
+    @instrument.timed
     def train(self, df: Optional[pd.DataFrame] = None, df_val: Optional[pd.DataFrame] = None):
-        if df is None or df_val is None:
+        # The training split from fit_transform, which also fits the scaler
+        if df is None:
             df, df_val, _ = self.fit_transform()
 
         # Train / test split
@@ -255,7 +237,8 @@ class Model(Data):
 
         # Get hyper-params
         df['group_col'] = df['gameday'].dt.year
-        self.hyper_params = self.get_hyper_params(X, y, df['group_col'])
+        sample_weight = df['sample_weight'].values if 'sample_weight' in df.columns else None
+        self.hyper_params = self.get_hyper_params(X, y, df['group_col'], sample_weight)
         logger.info(f'Training a Model for {self.league} on {self.response}')
         self.model = Pipeline([
             ('model', SVR(
@@ -265,7 +248,7 @@ class Model(Data):
                 epsilon=self.hyper_params['model__epsilon'],
             ))
         ])
-        self.model.fit(X, y)
+        self.model.fit(X, y, model__sample_weight=sample_weight)
 
     def transform(self, df: pd.DataFrame) -> pd.DataFrame:
         return pd.DataFrame(self.scaler.transform(df[self.features]), columns=self.features)
@@ -292,10 +275,12 @@ class Model(Data):
         return obj
 
     def shap_explain(self, df: pd.DataFrame):
+        import shap
+
         # Example plot for jupyter analysis
         _, df_, _ = self.fit_transform()
         logger.info('Deriving Explainer')
-        explainer = shap.KernelExplainer(self.model.predict, self.transform(df_), nsamples=100, link='identity')
+        explainer = Explainer(self, self.transform(df_))
         logger.info('Deriving Shap-Values')
-        shap_values = explainer.shap_values(df[self.features].head(2))
+        shap_values = explainer.shap_values(self.transform(df.head(2)))
         shap.force_plot(explainer.expected_value, shap_values[0, :], df.iloc[0, :], link='logit')
@@ -1,16 +1,14 @@
 import os
 import datetime
-from typing import Optional
+from typing import List, Optional
 import numpy as np
 import pandas as pd
 from tqdm import tqdm
-from scipy.stats import binomtest
-
-import matplotlib.pyplot as plt
-from matplotlib.backends.backend_pdf import PdfPages
 
 from sports_bettors.analytics.model.validate import Validate
-from config import logger, Config
+from sports_bettors.analytics.model.results import Results
+from sports_bettors.utils import instrument
+from config import logger
 
 
 class Policy(Validate):
@@ -146,7 +144,10 @@ class Policy(Validate):
             }
         }[response]
 
-    def discover_policy(self, df: pd.DataFrame, pdf: PdfPages):
+    @instrument.timed
+    def discover_policy(self, df: pd.DataFrame):
+        from scipy.stats import binomtest
+
         logger.info('Discovering best policy')
         df = df[['game_id', 'preds_c', self.classifier_response]]
         thresholds = np.linspace(-10, 10, 41)
@@ -253,8 +254,11 @@ class Policy(Validate):
                 self.policies[t_name]['left']['threshold'] = df_t['left_threshold'].iloc[0]
                 self.policies[t_name]['right']['threshold'] = df_t['right_threshold'].iloc[0]
 
-        # Make graph with thresholds
-        df_plot = []
+    def policy_thresholds(self) -> pd.DataFrame:
+        """
+        Thresholds of each policy by direction
+        """
+        records = []
         for policy, p_params in self.policies.items():
             for direction, d_params in p_params.items():
                 record = {
@@ -263,17 +267,8 @@ class Policy(Validate):
                     'value': d_params['threshold'],
                     'direction': direction
                 }
-                df_plot.append(record)
-        df_plot = pd.DataFrame.from_records(df_plot)
-        plt.figure()
-        for direction, df_plot_ in df_plot.groupby('direction'):
-            plt.bar(df_plot_['policy'], df_plot_['value'], label=direction, alpha=0.5)
-        plt.legend()
-        plt.grid(True)
-        plt.xlabel('Direction')
-        plt.ylabel('Threshold Amount')
-        pdf.savefig()
-        plt.close()
+                records.append(record)
+        return pd.DataFrame.from_records(records)
 
     def apply_policy(self, p: float, policy: str) -> str:
         l_threshold = self.policies[policy]['left']['threshold']
@@ -286,6 +281,42 @@ class Policy(Validate):
                 return self.policies[policy]['right']['name']
         return 'No Bet'
 
+    def apply_policy_many(self, preds: pd.Series, policies: Optional[List[str]] = None) -> pd.DataFrame:
+        """
+        Label bets for every game and policy at once, as a (games x policies) frame of side names or 'No Bet'.
+
+        Same decision as apply_policy: the left side when below its threshold, otherwise the right side when above its
+        threshold; a missing threshold never bets.
+        """
+        policies = list(self.policies.keys()) if policies is None else policies
+        # Missing thresholds are nan so neither comparison holds
+        left = np.array([np.nan if self.policies[p]['left']['threshold'] is None
+                         else self.policies[p]['left']['threshold'] for p in policies], dtype=float)
+        right = np.array([np.nan if self.policies[p]['right']['threshold'] is None
+                          else self.policies[p]['right']['threshold'] for p in policies], dtype=float)
+        left_names = np.array([self.policies[p]['left']['name'] for p in policies], dtype=object)
+        right_names = np.array([self.policies[p]['right']['name'] for p in policies], dtype=object)
+
+        p = np.asarray(preds, dtype=float)[:, None]
+        bets = np.select([p < left, p > right], [left_names, right_names], default=np.array('No Bet', dtype=object))
+        return pd.DataFrame(bets, index=getattr(preds, 'index', None), columns=policies)
+
+    def assess_policy_many(self, bets: pd.DataFrame, result: pd.Series) -> pd.DataFrame:
+        """
+        Score a (games x policies) frame of bets against the classifier response: 1 if right, 0 if wrong, nan if no bet
+        """
+        left_names = np.array([self.policies[p]['left']['name'] for p in bets.columns], dtype=object)
+        right_names = np.array([self.policies[p]['right']['name'] for p in bets.columns], dtype=object)
+        bet = bets.values
+        r = np.asarray(result, dtype=float)[:, None]
+        scores = np.select(
+            [((r == 1) & (bet == right_names)) | ((r == 0) & (bet == left_names)),
+             ((r == 0) & (bet == right_names)) | ((r == 1) & (bet == left_names))],
+            [1., 0.],
+            default=np.nan
+        )
+        return pd.DataFrame(scores, index=bets.index, columns=bets.columns)
+
     def assess_policy(self, df: pd.DataFrame, policy: str) -> pd.Series:
         left_name = self.policies[policy]['left']['name']
         right_name = self.policies[policy]['right']['name']
@@ -306,111 +337,97 @@ class Policy(Validate):
 
         return df.apply(lambda r: _bet_result(r['Bet'], r[self.classifier_response]), axis=1)
 
+    # Time-frames policies are summarized over, as (name, days back from today), None is the whole validation set
+    policy_windows = [('past_year', None), ('season', 180), ('past_week', 8)]
+
+    def summarize_windows(self, df_results: pd.DataFrame, gameday: pd.Series) -> pd.DataFrame:
+        """
+        Record, win-rate and p-value of every policy over every time-frame, one row per (policy, window).
+
+        Time-frames all end today so they are nested: each game is bucketed by the narrowest time-frame it falls in,
+        bets are counted per bucket in one grouped aggregation and accumulated from the narrowest bucket outwards.
+        """
+        # Widest first, None is every game
+        windows = sorted(self.policy_windows, key=lambda w: np.inf if w[1] is None else w[1], reverse=True)
+        in_window = [np.ones(gameday.shape[0], dtype=bool) if days is None else
+                     (gameday > pd.Timestamp(self.TODAY) - datetime.timedelta(days=days)).values
+                     for _, days in windows]
+        bucket = np.sum(in_window, axis=0) - 1
+
+        # Note: No Bet is a null so it is neither a win nor a loss
+        buckets = range(len(windows))
+        grouped = {
+            'num_wins': (df_results == 1).groupby(bucket).sum(),
+            'num_losses': (df_results == 0).groupby(bucket).sum(),
+            'num_bets': df_results.notna().groupby(bucket).sum(),
+        }
+        # Totals over each window from the innermost bucket out, then one row per (policy, window) in defined order
+        order = [window for window, _ in self.policy_windows]
+        names = [window for window, _ in windows]
+        num_games = pd.Series(bucket).value_counts().reindex(buckets, fill_value=0).iloc[::-1].cumsum().iloc[::-1]
+        df = pd.DataFrame({
+            stat: df_.reindex(buckets, fill_value=0).iloc[::-1].cumsum().iloc[::-1].set_axis(names).
+            reindex(order).T.stack()
+            for stat, df_ in grouped.items()
+        }).rename_axis(['policy', 'window']).reset_index()
+        df.insert(2, 'num_games', df['window'].map(num_games.set_axis(names)))
+        with np.errstate(divide='ignore', invalid='ignore'):
+            df['win_rate'] = (df['num_wins'] / df['num_bets']).round(3)
+        # One-sided binomial test against a coin-flip, P(X >= num_wins)
+        from scipy.stats import binom
+        df['p_value'] = binom.sf(df['num_wins'] - 1, df['num_bets'], 0.5)
+        df.loc[(df['num_wins'] == 0) | (df['num_bets'] == 0), 'p_value'] = np.nan
+
+        return df
+
+    @staticmethod
+    def summarize_weeks(df_results: pd.DataFrame, gameday: pd.Series) -> pd.DataFrame:
+        """
+        Weekly win-rate and number of bets of every policy, weeks without bets are left out
+        """
+        week = (gameday.dt.year * 52 + gameday.dt.isocalendar().week).values
+        df = df_results.set_axis(week).rename_axis('week').reset_index(). \
+            melt(id_vars='week', var_name='policy', value_name='Bet_result'). \
+            dropna(subset=['Bet_result'])
+        df['policy'] = pd.Categorical(df['policy'], categories=df_results.columns)
+        df = df.groupby(['policy', 'week'], observed=True). \
+            agg(win_rate=('Bet_result', 'mean'), num_bets=('Bet_result', 'size')). \
+            reset_index()
+        df['policy'] = df['policy'].astype(str)
+        return df[['policy', 'week', 'win_rate', 'num_bets']]
+
+    def validate_policy(self, df_val: pd.DataFrame, results: Results) -> Results:
+        """
+        Discover policies on the validated games (from validate_model) and add their thresholds and results
+        """
+        self.discover_policy(df_val)
+        results.add_table('policy_thresholds', self.policy_thresholds())
+        # Bets and results of every policy for every game
+        df_bets = self.apply_policy_many(df_val['preds_c'])
+        df_results = self.assess_policy_many(df_bets, df_val[self.classifier_response])
+        results.add_table('policy_weekly', self.summarize_weeks(df_results, df_val['gameday']))
+        results.add_table('policy_windows', self.summarize_windows(df_results, df_val['gameday']))
+        return results
+
     def validate(self,
                  df_: Optional[pd.DataFrame] = None,
                  df_val: Optional[pd.DataFrame] = None,
                  df: Optional[pd.DataFrame] = None,
-                 run_shap: bool = False):
+                 run_shap: bool = False,
+                 render: bool = True,
+                 n_workers: int = 1) -> Results:
+        """
+        Validate the model and discover policies, results are saved to save_dir and optionally rendered to a report
+        """
         if any([df_ is None, df_val is None, df is None]):
             df_, df_val, df = self.fit_transform(val=True)
 
-        with PdfPages(os.path.join(self.save_dir, 'validate.pdf')) as pdf:
-            # Validate model before moving on to policies
-            df_val = self.validate_model(pdf, df_=df_, df_val=df_val, df=df, run_shap=run_shap)
-
-            self.discover_policy(df_val, pdf)
-            for policy, policy_params in self.policies.items():
-                df_policy = df_val[['game_id', 'gameday', 'preds_c', self.classifier_response]].copy()
-                df_policy['Bet'] = df_policy['preds_c'].apply(lambda p: self.apply_policy(p, policy))
-                df_policy['Bet_result'] = self.assess_policy(df_policy, policy)
-
-                # Get win-rate and records for a few time-frames
-                # Whole year
-                # Note: No Bet is a null so it won't be summed
-                df_plot = df_policy.copy()
-                num_wins = df_plot['Bet_result'].sum()
-                num_losses = (1 - df_plot['Bet_result']).sum()
-                num_bets = df_plot[~df_plot['Bet_result'].isna()].shape[0]
-                win_rate = round(num_wins / num_bets, 3) if num_bets > 0 else None
-                if any([num_wins == 0, num_bets == 0]):
-                    p_value = np.nan
-                else:
-                    p_value = binomtest(int(num_wins), int(num_bets), p=0.5, alternative='greater').pvalue
-
-                df_policy['week'] = df_policy['gameday'].dt.year * 52 + df_policy['gameday'].dt.isocalendar().week
-                df_policy['yes_bet'] = (~df_policy['Bet_result'].isna()).astype(int)
-                df_plot = df_policy[df_policy['yes_bet'] == 1].copy()
-                if df_plot.shape[0] > 0:
-                    # Weekly win-loss trends
-                    df_plot = df_plot.\
-                        groupby('week').\
-                        agg(win_rate=('Bet_result', 'mean'), num_bets=('yes_bet', 'sum')).\
-                        reset_index()
-                    plt.figure()
-                    plt.bar(df_plot['week'], df_plot['win_rate'])
-                    plt.hlines(0.5, df_plot['week'].min(), df_plot['week'].max())
-                    plt.grid(True)
-                    plt.xlabel('Week No')
-                    plt.ylabel('Win Rate')
-                    plt.title(f'{self.league}, {self.response}: {policy}')
-                    pdf.savefig()
-                    plt.close()
-
-                    # Number of bets by week
-                    plt.figure()
-                    plt.bar(df_plot['week'], df_plot['num_bets'])
-                    plt.grid(True)
-                    plt.xlabel('Week No')
-                    plt.ylabel('Number of Bets')
-                    plt.title(f'{self.league}, {self.response}: {policy}')
-                    pdf.savefig()
-                    plt.close()
-
-                plt.figure()
-                plt.text(0.04, 0.95, f'League: {self.league}, response: {self.response}, policy: {policy}')
-                plt.text(0.04, 0.90, 'Time-Frame: {}'.format('past_year'))
-                plt.text(0.04, 0.85, f'Record: {int(num_wins)}-{int(num_losses)} '
-                                     f'(Bet Percentage: {round(100 * int(num_bets) / df_policy.shape[0], 1)}%)')
-                plt.text(0.04, 0.80, f'Win Percentage: {win_rate} (p={round(p_value, 3)}) ')
-
-                # Season so far
-                # This season so far (Note: maximum this can be is 126 days, so we'll just do the last 180 days
-                df_policy = df_policy[df_policy['gameday'] > pd.Timestamp(self.TODAY) - datetime.timedelta(days=180)].copy()
-                df_policy['Bet_result'] = self.assess_policy(df_policy, policy)
-                # Note: No Bet is a null so it won't be summed
-                df_plot = df_policy.copy()
-                num_wins = df_plot['Bet_result'].sum()
-                num_losses = (1 - df_plot['Bet_result']).sum()
-                num_bets = df_plot[~df_plot['Bet_result'].isna()].shape[0]
-                win_rate = round(num_wins / num_bets, 3) if num_bets > 0 else None
-                if any([num_wins == 0, num_bets == 0]):
-                    p_value = np.nan
-                else:
-                    p_value = binomtest(int(num_wins), int(num_bets), p=0.5, alternative='greater').pvalue
-                plt.text(0.04, 0.70, f'League: {self.league}, response: {self.response}, policy: {policy}')
-                plt.text(0.04, 0.65, 'Time-Frame: {}'.format('This Season so Far'))
-                plt.text(0.04, 0.60, f'Record: {int(num_wins)}-{int(num_losses)} '
-                                     f'(Bet Percentage: {round(100 * int(num_bets) / df_policy.shape[0], 1)}%)')
-                plt.text(0.04, 0.55, f'Win Percentage: {win_rate} (p={round(p_value, 3)})')
-
-                # Past Week
-                df_policy = df_policy[df_policy['gameday'] > pd.Timestamp(self.TODAY) - datetime.timedelta(days=8)].copy()
-                df_policy['Bet_result'] = self.assess_policy(df_policy, policy)
-                # Note: No Bet is a null so it won't be summed
-                df_plot = df_policy.copy()
-                num_wins = df_plot['Bet_result'].sum()
-                num_losses = (1 - df_plot['Bet_result']).sum()
-                num_bets = df_plot[~df_plot['Bet_result'].isna()].shape[0]
-                win_rate = round(num_wins / num_bets, 3) if num_bets > 0 else None
-                if any([num_wins == 0, num_bets == 0]):
-                    p_value = np.nan
-                else:
-                    p_value = binomtest(int(num_wins), int(num_bets), p=0.5, alternative='greater').pvalue
-                plt.text(0.04, 0.45, f'League: {self.league}, response: {self.response}, policy: {policy}')
-                plt.text(0.04, 0.40, 'Time-Frame: {}'.format('Past 7 Days'))
-                plt.text(0.04, 0.35, f'Record: {int(num_wins)}-{int(num_losses)} '
-                                     f'(Bet Percentage: {round(100 * int(num_bets) / df_policy.shape[0], 1)}%)')
-                plt.text(0.04, 0.30, f'Win Percentage: {win_rate} (p={round(p_value, 3)})')
-                plt.tick_params(axis='both', which='both', labelbottom=False, labelleft=False, bottom=False, left=False)
-                pdf.savefig()
-                plt.close()
+        # Validate model before moving on to policies
+        df_val, results = self.validate_model(df_=df_, df_val=df_val, df=df, run_shap=run_shap)
+        results = self.validate_policy(df_val, results)
+
+        results.save(self.save_dir)
+        if render:
+            from sports_bettors.analytics.model.report import render_report
+            render_report(self.save_dir, os.path.join(self.save_dir, 'validate.pdf'), n_workers=n_workers)
+        return results
@@ -0,0 +1,334 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Optional
+
+import numpy as np
+
+import matplotlib.pyplot as plt
+from matplotlib.backends.backend_pdf import PdfPages
+
+from sports_bettors.analytics.model.results import Results
+from config import logger
+
+# Names of the policy time-frames on the report
+window_labels = {'past_year': 'past_year', 'season': 'This Season so Far', 'past_week': 'Past 7 Days'}
+
+
+def _line_label(response: str) -> str:
+    if response == 'spread':
+        return 'Predicted Spread on the Vegas-Spread'
+    elif response == 'over':
+        return 'Predicted Spread on the Over'
+    raise NotImplementedError(response)
+
+
+def _mean_std(stats: dict) -> str:
+    return f'{round(stats["mean"], 2)} +/- {round(stats["std"], 2)}'
+
+
+def render_overview(results: Results, pdf: PdfPages):
+    """
+    Model summary, predictions and residuals
+    """
+    summary = results.summary
+    df_val = results.table('val_predictions')
+
+    plt.figure()
+    plt.text(0.04, 0.95, f'League: {summary["league"]}, response: {summary["response"]}')
+    plt.text(0.04, 0.90, f'Train N: {summary["train_n"]}')
+    plt.text(0.04, 0.85, f'Val N: {summary["val_n"]}')
+    plt.text(0.04, 0.80, f'Optimization Metric: {round(summary["opt_metric"], 3)}')
+    for hdx, (k, v) in enumerate(summary['hyper_params'].items()):
+        plt.text(0.04, 0.75 - 0.05 * hdx, f'Hyper Params: {k} = {v}')
+    plt.tick_params(axis='both', which='both', labelbottom=False, labelleft=False, bottom=False, left=False)
+    pdf.savefig()
+    plt.close()
+
+    plt.figure()
+    plt.scatter(df_val['response'], df_val['preds'], label=f'Opt: {round(summary["opt_metric"], 3)}')
+    plt.xlabel('Response')
+    plt.ylabel('Preds')
+    plt.title('Preds vs. Response')
+    plt.grid(True)
+    plt.legend()
+    pdf.savefig()
+    plt.close()
+
+    if summary['response'] == 'spread':
+        bins = np.linspace(-50, 50, 21)
+    elif summary['response'] == 'over':
+        bins = np.linspace(10, 90, 17)
+    else:
+        raise NotImplementedError(summary['response'])
+
+    plt.figure()
+    plt.hist(df_val['preds'], alpha=0.5, label='preds', bins=bins)
+    plt.hist(df_val['response'], alpha=0.5, label='Actuals', bins=bins)
+    plt.text(bins[4], 10, f'Preds: {_mean_std(summary["preds"])}')
+    plt.text(bins[4], 20, f'Actuals: {_mean_std(summary["actuals"])}')
+    plt.xlabel(summary['response'])
+    plt.title('Preds Distribution')
+    plt.grid(True)
+    plt.legend()
+    pdf.savefig()
+    plt.close()
+
+    bins = np.linspace(-50, 50, 21)
+    plt.figure()
+    plt.hist(df_val['res'], alpha=0.5, label='Test', density=True, bins=bins)
+    plt.hist(results.table('train_residuals')['res'], alpha=0.5, label='Train', density=True, bins=bins)
+    plt.text(-40, 0.01, f'Test: {_mean_std(summary["residuals"])}')
+    plt.text(-40, 0.02, f'Train: {_mean_std(summary["train_residuals"])}')
+    plt.title('Residuals Distribution')
+    plt.grid(True)
+    plt.legend()
+    pdf.savefig()
+    plt.close()
+
+    # Heteroskedasticity
+    plt.figure()
+    plt.scatter(df_val['preds'], df_val['res'], label='residuals')
+    plt.grid(True)
+    plt.xlabel('Predictions')
+    plt.ylabel('Residuals')
+    plt.title('Heteroskedasticity')
+    plt.legend()
+    pdf.savefig()
+    plt.close()
+
+    # Compared to spread
+    plt.figure()
+    plt.hist(df_val['res'], alpha=0.5, label='residuals', bins=bins)
+    plt.hist(df_val['line_diff'], alpha=0.5, label='spread-diff', bins=bins)
+    plt.text(-40, 10, f'Residuals: {_mean_std(summary["residuals"])}')
+    plt.text(-40, 20, f'Line-Diff: {_mean_std(summary["line_diff"])}')
+    plt.grid(True)
+    plt.legend()
+    plt.title('Model vs. Line')
+    plt.xlabel('Error')
+    pdf.savefig()
+    plt.close()
+
+
+def render_shap(results: Results, pdf: PdfPages):
+    import shap
+
+    df_shap, df_features = results.table('shap_values'), results.table('shap_features')
+    features = list(df_shap.columns)
+    plt.figure()
+    shap.summary_plot(df_shap.values, features=features, plot_type='bar', show=False)
+    plt.tight_layout()
+    pdf.savefig()
+    plt.close()
+    # Shap by features
+    for feature in features:
+        plt.figure()
+        shap.dependence_plot(ind=feature, shap_values=df_shap.values, features=df_features[features])
+        plt.tight_layout()
+        plt.title(feature)
+        pdf.savefig()
+        plt.close()
+
+
+def render_classifier(results: Results, pdf: PdfPages):
+    """
+    Predictions against the line as a classifier of the favorite covering / the over hitting
+    """
+    summary = results.summary
+    df_roc, df_pr = results.table('roc'), results.table('precision_recall')
+
+    # ROC
+    for label in ['train', 'test']:
+        df_plot = df_roc[df_roc['sample'] == label]
+        plt.figure()
+        plt.plot(df_plot['fpr'], df_plot['tpr'])
+        plt.text(0.2, 0.9, f'AUC: {summary["auc"][label]:.3f}\nn={summary["n"][label]}')
+        plt.plot([0, 1], [0, 1], 'k--')
+        plt.title(label)
+        plt.grid(True)
+        pdf.savefig()
+        plt.close()
+
+    # Precision recall by test / train
+    for label in ['train', 'test']:
+        df_plot = df_pr[df_pr['sample'] == label]
+        thresholds, rate = df_plot['threshold'], summary['classifier_rate'][label]
+        plt.figure()
+        plt.plot(thresholds, df_plot['precision'], label='precision')
+        plt.plot(thresholds, df_plot['recall'], label='recall')
+        plt.hlines(1 - rate, min(thresholds), max(thresholds), color='black')
+        plt.hlines(rate, min(thresholds), max(thresholds), color='gray')
+        plt.legend()
+        plt.grid(True)
+        plt.title(label)
+        pdf.savefig()
+        plt.close()
+
+    # Win-Rate by month
+    df_plot = results.table('win_rate_by_month')
+    plt.figure()
+    plt.bar(df_plot['month'], df_plot['win_rate'])
+    plt.title('Bias check')
+    plt.xlabel('Month')
+    plt.ylabel('Win Rate')
+    pdf.savefig()
+    plt.close()
+
+
+def render_betting_guide(results: Results, pdf: PdfPages):
+    summary = results.summary
+    df_plot = results.table('betting_guide')
+    thresholds, rate = df_plot['threshold'], summary['classifier_rate']['test']
+    xlabel = _line_label(summary['response'])
+
+    # Cumulative
+    plt.figure()
+    for team, df_ in df_plot.groupby('team'):
+        df_ = df_[df_['n_games'] > 2]
+        plt.plot(df_['threshold'], df_['win_rate'], label=team)
+    plt.xlabel(xlabel)
+    plt.legend()
+    plt.ylabel('Win Rate - Cumulative')
+    plt.hlines(1 - rate, min(thresholds), max(thresholds), color='black')
+    plt.hlines(rate, min(thresholds), max(thresholds), color='gray')
+    plt.title('Betting Guide (Cumulative)')
+    plt.grid(True)
+    pdf.savefig()
+    plt.close()
+
+    plt.figure()
+    for team, df_ in df_plot.groupby('team'):
+        plt.plot(df_['threshold'], df_['n_games'], label=team)
+    plt.xlabel(xlabel)
+    plt.legend()
+    plt.ylabel('Cumulative Fraction of Games with Good Odds (>52.5%)')
+    plt.title('Betting Guide: Number of Games (Cumulative)')
+    plt.grid(True)
+    pdf.savefig()
+    plt.close()
+
+    plt.figure()
+    for team, df_ in df_plot.groupby('team'):
+        df_ = df_[df_['n_games_interval'] > 2]
+        plt.plot(df_['threshold'], df_['win_rate_interval'], label=team)
+    plt.xlabel(xlabel)
+    plt.legend()
+    plt.ylabel('Win Rate')
+    plt.hlines(1 - rate, min(thresholds), max(thresholds), color='black')
+    plt.hlines(rate, min(thresholds), max(thresholds), color='gray')
+    plt.title('Betting Guide')
+    plt.grid(True)
+    pdf.savefig()
+    plt.close()
+
+    plt.figure()
+    for team, df_ in df_plot.groupby('team'):
+        plt.plot(df_['threshold'], df_['n_games_interval'], label=team)
+    plt.xlabel(xlabel)
+    plt.legend()
+    plt.ylabel('Number of Games')
+    plt.title('Betting Guide: Number of Games ')
+    plt.grid(True)
+    pdf.savefig()
+    plt.close()
+
+
+def render_policy(results: Results, pdf: PdfPages):
+    """
+    Policy thresholds, then weekly trends and records over each time-frame by policy
+    """
+    league, response = results.summary['league'], results.summary['response']
+    df_thresholds = results.table('policy_thresholds')
+    df_weekly, df_windows = results.table('policy_weekly'), results.table('policy_windows')
+
+    plt.figure()
+    for direction, df_plot_ in df_thresholds.groupby('direction'):
+        plt.bar(df_plot_['policy'], df_plot_['value'], label=direction, alpha=0.5)
+    plt.legend()
+    plt.grid(True)
+    plt.xlabel('Direction')
+    plt.ylabel('Threshold Amount')
+    pdf.savefig()
+    plt.close()
+
+    for policy in df_thresholds['policy'].unique():
+        df_plot = df_weekly[df_weekly['policy'] == policy]
+        if df_plot.shape[0] > 0:
+            plt.figure()
+            plt.bar(df_plot['week'], df_plot['win_rate'])
+            plt.hlines(0.5, df_plot['week'].min(), df_plot['week'].max())
+            plt.grid(True)
+            plt.xlabel('Week No')
+            plt.ylabel('Win Rate')
+            plt.title(f'{league}, {response}: {policy}')
+            pdf.savefig()
+            plt.close()
+
+            # Number of bets by week
+            plt.figure()
+            plt.bar(df_plot['week'], df_plot['num_bets'])
+            plt.grid(True)
+            plt.xlabel('Week No')
+            plt.ylabel('Number of Bets')
+            plt.title(f'{league}, {response}: {policy}')
+            pdf.savefig()
+            plt.close()
+
+        plt.figure()
+        for wdx, row in enumerate(df_windows[df_windows['policy'] == policy].to_dict(orient='records')):
+            bet_percentage = round(100 * int(row['num_bets']) / row['num_games'], 1) if row['num_games'] > 0 else 0.
+            win_rate = None if np.isnan(row['win_rate']) else row['win_rate']
+            top = 0.95 - 0.25 * wdx
+            plt.text(0.04, top, f'League: {league}, response: {response}, policy: {policy}')
+            plt.text(0.04, top - 0.05, 'Time-Frame: {}'.format(window_labels.get(row['window'], row['window'])))
+            plt.text(0.04, top - 0.10, f'Record: {int(row["num_wins"])}-{int(row["num_losses"])} '
+                                       f'(Bet Percentage: {bet_percentage}%)')
+            plt.text(0.04, top - 0.15, f'Win Percentage: {win_rate} (p={round(row["p_value"], 3)})')
+        plt.tick_params(axis='both', which='both', labelbottom=False, labelleft=False, bottom=False, left=False)
+        pdf.savefig()
+        plt.close()
+
+
+# Figure groups in report order, with the table each one needs
+renderers = {
+    'overview': ('val_predictions', render_overview),
+    'shap': ('shap_values', render_shap),
+    'classifier': ('roc', render_classifier),
+    'betting_guide': ('betting_guide', render_betting_guide),
+    'policy': ('policy_windows', render_policy),
+}
+
+
+def _render_group(results_dir: str, group: str, pdf_path: str) -> str:
+    # Worker entry point, each process loads only the tables its group needs
+    with PdfPages(pdf_path) as pdf:
+        renderers[group][1](Results.load(results_dir), pdf)
+    return pdf_path
+
+
+def render_report(results_dir: str, pdf_path: str, n_workers: int = 1, groups: Optional[List[str]] = None
+                  ) -> List[str]:
+    """
+    Render saved validation results.
+
+    With one worker every figure group goes, in order, into a single pdf at `pdf_path`. With more, each group is
+    rendered by its own process into {pdf_path without extension}/{group}.pdf. Returns the pdfs written.
+    """
+    results = Results.load(results_dir)
+    groups = [group for group, (table, _) in renderers.items()
+              if results.has_table(table) and (groups is None or group in groups)]
+    logger.info('Rendering {} from {}'.format(', '.join(groups), results_dir))
+
+    if n_workers <= 1:
+        with PdfPages(pdf_path) as pdf:
+            for group in groups:
+                renderers[group][1](results, pdf)
+        return [pdf_path]
+
+    report_dir = os.path.splitext(pdf_path)[0]
+    if not os.path.exists(report_dir):
+        os.makedirs(report_dir)
+    with ProcessPoolExecutor(max_workers=n_workers) as pool:
+        futures = [pool.submit(_render_group, results_dir, group, os.path.join(report_dir, '{}.pdf'.format(group)))
+                   for group in groups]
+        return [future.result() for future in futures]
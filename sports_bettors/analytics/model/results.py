@@ -0,0 +1,65 @@
+import os
+import json
+from typing import Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+
+def _to_json(obj):
+    # numpy scalars from pandas / sklearn
+    if isinstance(obj, np.generic):
+        return obj.item()
+    raise TypeError('{} is not json serializable'.format(type(obj)))
+
+
+class Results(object):
+    """
+    Metrics and tables from a validation run.
+
+    Scalars live in `summary`, tables are data frames saved as {name}.csv next to a results.json, so reports and
+    downstream tooling can use them without re-running validation. Tables of a loaded run are read on first use.
+    """
+    summary_file = 'results.json'
+
+    def __init__(self, summary: Optional[Dict] = None, results_dir: Optional[str] = None):
+        self.summary = {} if summary is None else summary
+        self.results_dir = results_dir
+        self._tables = {}
+        self._table_names = []
+
+    def add_table(self, name: str, df: pd.DataFrame):
+        if name not in self._table_names:
+            self._table_names.append(name)
+        self._tables[name] = df.reset_index(drop=True)
+
+    def has_table(self, name: str) -> bool:
+        return name in self._table_names
+
+    @property
+    def table_names(self) -> List[str]:
+        return list(self._table_names)
+
+    def table(self, name: str) -> pd.DataFrame:
+        if name not in self._tables:
+            if name not in self._table_names or self.results_dir is None:
+                raise KeyError(name)
+            self._tables[name] = pd.read_csv(os.path.join(self.results_dir, '{}.csv'.format(name)))
+        return self._tables[name]
+
+    def save(self, results_dir: str):
+        if not os.path.exists(results_dir):
+            os.makedirs(results_dir)
+        for name in self._table_names:
+            self.table(name).to_csv(os.path.join(results_dir, '{}.csv'.format(name)), index=False)
+        with open(os.path.join(results_dir, self.summary_file), 'w') as fp:
+            json.dump({'summary': self.summary, 'tables': self._table_names}, fp, indent=4, default=_to_json)
+        self.results_dir = results_dir
+
+    @classmethod
+    def load(cls, results_dir: str) -> 'Results':
+        with open(os.path.join(results_dir, cls.summary_file)) as fp:
+            saved = json.load(fp)
+        results = cls(summary=saved['summary'], results_dir=results_dir)
+        results._table_names = saved['tables']
+        return results
@@ -0,0 +1,148 @@
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+from sklearn.svm import SVR
+from sklearn.model_selection import ParameterGrid
+
+from config import logger
+
+
+class KernelCache(object):
+    """
+    Least-recently-used cache of kernel matrices, bounded by the bytes held
+    """
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self.n_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+
+    def get(self, key, compute):
+        if key in self._entries:
+            self.hits += 1
+            self._entries.move_to_end(key)
+            return self._entries[key]
+        self.misses += 1
+        value = compute()
+        self._entries[key] = value
+        self.n_bytes += sum(m.nbytes for m in value)
+        while self.n_bytes > self.max_bytes and len(self._entries) > 1:
+            _, evicted = self._entries.popitem(last=False)
+            self.n_bytes -= sum(m.nbytes for m in evicted)
+        return value
+
+
+class KernelGridSearch(object):
+    """
+    Cross-validated grid search over SVR hyper-parameters on precomputed kernels.
+
+    GridSearchCV recomputes the kernel for every candidate on every fold, although it only depends on the kernel,
+    gamma, degree and coef0. Here the inner products and squared distances of all rows are computed once, each fold's
+    kernel is derived from them once per kernel parameters, and every C / epsilon candidate is fit to it with
+    SVR(kernel='precomputed') and scored on the cross-kernel to the held-out rows. Scores, candidate order and
+    `cv_results_` keys follow GridSearchCV with `neg_mean_squared_error`, so the same parameters are selected. With
+    sample weights, folds are fit and scored weighted, as GridSearchCV does when the weights are routed to the scorer.
+    """
+    kernel_params = ('kernel', 'gamma', 'degree', 'coef0')
+
+    def __init__(self, param_grid: Dict[str, list], cv: List[Tuple[np.ndarray, np.ndarray]],
+                 prefix: str = 'model__', max_cache_bytes: int = 1 << 30):
+        self.param_grid = param_grid
+        self.cv = list(cv)
+        self.prefix = prefix
+        self.cache = KernelCache(max_cache_bytes)
+        self.cv_results_ = {}
+        self.best_params_ = None
+        self.best_score_ = None
+        self.n_kernels_ = 0
+
+    def _strip(self, params: dict) -> dict:
+        return {k[len(self.prefix):] if k.startswith(self.prefix) else k: v for k, v in params.items()}
+
+    @staticmethod
+    def _gamma(gamma, X: np.ndarray) -> float:
+        # Same as SVR.fit on the fold's training rows, which ignores sample weights here, so the searched gamma is the
+        # one the final weighted fit uses
+        if gamma == 'scale':
+            X_var = X.var()
+            return 1.0 / (X.shape[1] * X_var) if X_var != 0 else 1.0
+        if gamma == 'auto':
+            return 1.0 / X.shape[1]
+        return gamma
+
+    @staticmethod
+    def _kernel(kernel: str, gamma: float, degree: int, coef0: float, dot: np.ndarray, sq_dist: np.ndarray
+                ) -> np.ndarray:
+        # Same kernels as libsvm, from the rows' inner products / squared distances
+        if kernel == 'linear':
+            return dot.copy()
+        if kernel == 'rbf':
+            return np.exp(-gamma * sq_dist)
+        if kernel == 'poly':
+            return (gamma * dot + coef0) ** degree
+        if kernel == 'sigmoid':
+            return np.tanh(gamma * dot + coef0)
+        raise ValueError('Unsupported kernel: {}'.format(kernel))
+
+    def fit(self, X, y, sample_weight: Optional[np.ndarray] = None) -> 'KernelGridSearch':
+        X = np.asarray(X, dtype=float)
+        y = np.asarray(y, dtype=float)
+        candidates = list(ParameterGrid(self.param_grid))
+        defaults = SVR().get_params()
+
+        # Everything a kernel needs, computed once for all rows
+        dot = X @ X.T
+        sq_norms = np.einsum('ij,ij->i', X, X)
+        sq_dist = np.maximum(sq_norms[:, None] + sq_norms[None, :] - 2 * dot, 0)
+
+        # Fit candidates grouped by kernel parameters so each fold's kernel is built once and reused
+        groups = OrderedDict()
+        for cdx, params in enumerate(candidates):
+            params = {**defaults, **self._strip(params)}
+            groups.setdefault(tuple(params[k] for k in self.kernel_params), []).append((cdx, params))
+
+        test_scores = np.zeros((len(candidates), len(self.cv)))
+        train_scores = np.zeros((len(candidates), len(self.cv)))
+        for (kernel, gamma, degree, coef0), group in groups.items():
+            for fdx, (train, test) in enumerate(self.cv):
+                gamma_ = self._gamma(gamma, X[train])
+
+                def _compute():
+                    self.n_kernels_ += 1
+                    return (
+                        self._kernel(kernel, gamma_, degree, coef0, dot[np.ix_(train, train)],
+                                     sq_dist[np.ix_(train, train)]),
+                        self._kernel(kernel, gamma_, degree, coef0, dot[np.ix_(test, train)],
+                                     sq_dist[np.ix_(test, train)])
+                    )
+                K_train, K_test = self.cache.get((fdx, kernel, gamma_, degree, coef0), _compute)
+
+                for cdx, params in group:
+                    estimator = SVR(**{k: v for k, v in params.items() if k not in self.kernel_params},
+                                    kernel='precomputed')
+                    estimator.fit(K_train, y[train], sample_weight=None if sample_weight is None
+                                  else sample_weight[train])
+                    test_scores[cdx, fdx] = -np.average((y[test] - estimator.predict(K_test)) ** 2,
+                                                        weights=None if sample_weight is None else sample_weight[test])
+                    train_scores[cdx, fdx] = -np.average((y[train] - estimator.predict(K_train)) ** 2,
+                                                         weights=None if sample_weight is None
+                                                         else sample_weight[train])
+
+        self.cv_results_ = {
+            'params': candidates,
+            **{'split{}_test_score'.format(fdx): test_scores[:, fdx] for fdx in range(len(self.cv))},
+            'mean_test_score': test_scores.mean(axis=1),
+            'std_test_score': test_scores.std(axis=1),
+            **{'split{}_train_score'.format(fdx): train_scores[:, fdx] for fdx in range(len(self.cv))},
+            'mean_train_score': train_scores.mean(axis=1),
+            'std_train_score': train_scores.std(axis=1),
+        }
+        best = int(np.argmax(self.cv_results_['mean_test_score']))
+        self.best_params_ = candidates[best]
+        self.best_score_ = self.cv_results_['mean_test_score'][best]
+        logger.info('Fit {} candidates on {} folds with {} kernel matrices ({} cache hits)'.format(
+            len(candidates), len(self.cv), self.n_kernels_, self.cache.hits))
+        return self
@@ -1,7 +1,7 @@
-from typing import Optional
 from sports_bettors.analytics.bets.bets import Bets
 from sports_bettors.analytics.eda.eda import Eda
 from sports_bettors.analytics.model.policy import Policy
+from sports_bettors.analytics.model.artifacts import Artifacts, artifact_key, training_key
 from sports_bettors.analytics.model import Model
 
 
@@ -11,12 +11,24 @@ def analysis():
     Bets().analyze()
 
 
-def run(league: str = 'nfl', response: str = 'spread', run_shap: bool = False, overwrite: bool = False):
+def run(league: str = 'nfl', response: str = 'spread', run_shap: bool = False, overwrite: bool = False,
+        render: bool = True, force: bool = False):
     api = Policy(league=league, response=response, overwrite=overwrite)
     df, df_val, df_all = api.fit_transform()
-    api.train(df)
-    api.validate(run_shap=run_shap)
+    # Reuse the stored model and validation if nothing they depend on changed
+    artifacts = Artifacts(api)
+    key = artifact_key(api, df_all)
+    if artifacts.hit(key) and not force:
+        return
+    # Reuse the stored model if it was fit on the same training split, validation is recomputed
+    model_key = training_key(api, df)
+    if artifacts.model_hit(model_key) and not force:
+        artifacts.restore()
+    else:
+        api.train(df)
+    api.validate(run_shap=run_shap, render=render)
     api.save_results()
+    artifacts.record(key, model_key)
 
 
 def predict():
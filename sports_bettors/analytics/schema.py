@@ -0,0 +1,80 @@
+"""
+Compact column types for the games frames the analytics pipeline passes around.
+
+Team, conference and game type names repeat on every row, so they're categoricals. game_id is unique per game and
+stays a string, its season / week prefix (2023_07 of 2023_07_BUF_NE, the season of college ids) is derived as a
+categorical game_id_prefix for grouping games by week without parsing ids. Season and week fit int16. Scores,
+lines and moneylines are whole or half points, exact in float32, but are only downcast when every value round-trips,
+averaged moneylines (college) stay float64. The float32 columns are for holding games in memory, metrics and features
+are derived from float64 copies (widen) so model inputs are unchanged.
+"""
+from typing import Dict
+
+import numpy as np
+import pandas as pd
+
+from config import logger
+
+categorical = ['game_type', 'away_team', 'home_team', 'away_conference', 'home_conference']
+int16 = ['season', 'week']
+# Derived from game_id
+prefix = 'game_id_prefix'
+float32 = ['away_score', 'home_score', 'spread_line', 'total_line', 'away_moneyline', 'home_moneyline']
+
+
+def _lossless(s: pd.Series, dtype: str) -> bool:
+    if not pd.api.types.is_numeric_dtype(s) or s.dtype == dtype:
+        return False
+    if np.issubdtype(np.dtype(dtype), np.integer):
+        info = np.iinfo(dtype)
+        return not s.isna().any() and (s.empty or (s.min() >= info.min and s.max() <= info.max)) and \
+            bool((s == s.round()).all())
+    cast = s.astype(dtype).astype(s.dtype)
+    return bool(((cast == s) | s.isna()).all())
+
+
+def game_id_prefix(game_id: pd.Series) -> pd.Series:
+    """
+    Season and week part of game ids as a categorical, missing where an id has neither
+    """
+    return game_id.astype('string').str.extract(r'^(\d{4}(?:_\d{2})?)_', expand=False).astype('category')
+
+
+def enforce(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Cast the columns of df the schema covers, columns whose values don't fit keep their type. Adds game_id_prefix
+    when there is a game_id
+    """
+    n_bytes = df.memory_usage(deep=True).sum()
+    if 'game_id' in df.columns and prefix not in df.columns:
+        df = df.assign(**{prefix: game_id_prefix(df['game_id'])})
+    dtypes = {}
+    for col in df.columns:
+        if col in categorical and not isinstance(df[col].dtype, pd.CategoricalDtype):
+            dtypes[col] = 'category'
+        elif col in int16 and _lossless(df[col], 'int16'):
+            dtypes[col] = 'int16'
+        elif col in float32 and _lossless(df[col], 'float32'):
+            dtypes[col] = 'float32'
+    if not dtypes:
+        return df
+    df = df.astype(dtypes)
+    logger.info('Compacted {} columns, {:.1f} MB to {:.1f} MB'.format(
+        len(dtypes), n_bytes / 1e6, df.memory_usage(deep=True).sum() / 1e6))
+    return df
+
+
+def widen(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Cast the schema's float32 columns back to float64 before deriving from them
+    """
+    dtypes = {col: 'float64' for col in float32 if col in df.columns and df[col].dtype == 'float32'}
+    return df.astype(dtypes) if dtypes else df
+
+
+def memory_report(df: pd.DataFrame) -> Dict[str, dict]:
+    """
+    Type and bytes (including string contents) of each column
+    """
+    usage = df.memory_usage(deep=True, index=False)
+    return {col: {'dtype': str(df[col].dtype), 'bytes': int(usage[col])} for col in df.columns}
@@ -7,6 +7,7 @@ from typing import Tuple
 from sports_bettors.utils.nfl.models import NFLBettingAid
 from sports_bettors.utils.college_football.models import CollegeFootballBettingAid
 from sports_bettors.base import BetPredictor, BaseBettingAid
+from sports_bettors.utils import instrument
 
 from config import Config, logger
 
@@ -135,6 +136,7 @@ def api_cli():
     parser.add_argument('--feature_set', type=str, required=True)
     parser.add_argument('--random_effect', type=str, required=True)
     parser.add_argument('--display_output', action='store_true')
+    instrument.add_arguments(parser)
     args = parser.parse_args()
 
     # Get aid
@@ -149,15 +151,21 @@ def api_cli():
     for feature in aid.feature_sets[args.feature_set].features:
         inputs[feature] = float(input('Input Value for {}: '.format(feature)))
 
-    # Get predictions
-    api(args.league, args.random_effect, args.feature_set, inputs, args.display_output)
+    # Get predictions, the report leaves out the time spent at the prompts
+    with instrument.run_report('api', profile=args.profile, trace_memory=args.trace_memory):
+        with instrument.stage('api', league=args.league, random_effect=args.random_effect,
+                              feature_set=args.feature_set):
+            api(args.league, args.random_effect, args.feature_set, inputs, args.display_output)
 
 
 def create_predictor_sets():
     parser = argparse.ArgumentParser(prog='Generator Predictor Sets')
     parser.add_argument('--league', required=True)
+    instrument.add_arguments(parser)
     args = parser.parse_args()
 
     # Generator predictor set
-    predictor = SportsPredictor(league=args.league)
-    predictor.generate_predictor_set()
+    with instrument.run_report('generate_predictors', profile=args.profile, trace_memory=args.trace_memory):
+        with instrument.stage('generate_predictor_set', league=args.league):
+            predictor = SportsPredictor(league=args.league)
+            predictor.generate_predictor_set()
@@ -1,17 +1,17 @@
 import os
 import pickle
 
-from typing import Tuple
+from typing import Tuple, TYPE_CHECKING
 from collections import namedtuple
 
 import pandas as pd
 import numpy as np
 
-import pystan
-
-
 from config import Config, logger
 
+if TYPE_CHECKING:
+    import pystan
+
 
 Features = namedtuple('Features', ['label', 'features'])
 
@@ -311,10 +311,12 @@ class BaseBettingAid(object):
 
         return model_code
 
-    def fit(self, df: pd.DataFrame = None) -> pystan.stan:
+    def fit(self, df: pd.DataFrame = None) -> 'pystan.stan':
         """
         Fit a pystan model
         """
+        import pystan
+
         logger.info('Fitting a pystan Model')
         if df is None:
             df = self.etl()
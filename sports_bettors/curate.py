@@ -2,6 +2,7 @@ import argparse
 
 from sports_bettors.utils.college_football.curate import curate_college
 from sports_bettors.utils.nfl.curate import curate_nfl
+from sports_bettors.utils import instrument
 
 
 def curate_data():
@@ -10,11 +11,16 @@ def curate_data():
     """
     parser = argparse.ArgumentParser(prog='Football Curated')
     parser.add_argument('--league', required=True)
+    parser.add_argument('--overwrite', action='store_true')
+    instrument.add_arguments(parser)
     args = parser.parse_args()
 
-    if args.league == 'college_football':
-        curate_college()
-    elif args.league == 'nfl':
-        curate_nfl()
-    else:
-        raise NotImplementedError('No {}'.format(args.league))
+    with instrument.run_report('curate', profile=args.profile, trace_memory=args.trace_memory):
+        if args.league == 'college_football':
+            with instrument.stage('curate_college'):
+                curate_college(overwrite=args.overwrite)
+        elif args.league == 'nfl':
+            with instrument.stage('curate_nfl'):
+                curate_nfl(overwrite=args.overwrite)
+        else:
+            raise NotImplementedError('No {}'.format(args.league))
@@ -4,6 +4,7 @@ from tqdm import tqdm
 
 from sports_bettors.utils.college_football.models import CollegeFootballBettingAid
 from sports_bettors.utils.nfl.models import NFLBettingAid
+from sports_bettors.utils import instrument
 
 from config import Config, logger
 
@@ -35,10 +36,12 @@ def execute_experiments(league: str, overwrite: bool = False, debug: bool = Fals
                         continue
                 # Fit, Diagnose, and save model
                 logger.info('{} ~ {} | {}'.format(feature_set, response, random_effect))
-                aid = betting_aid(random_effect=random_effect, features=feature_set, response=response)
-                aid.fit()
-                aid.diagnose()
-                aid.save()
+                with instrument.stage('experiment', league=league, random_effect=random_effect,
+                                      feature_set=feature_set, response=response):
+                    aid = betting_aid(random_effect=random_effect, features=feature_set, response=response)
+                    aid.fit()
+                    aid.diagnose()
+                    aid.save()
 
 
 def run_experiments():
@@ -49,7 +52,9 @@ def run_experiments():
     parser.add_argument('--league', required=True)
     parser.add_argument('--overwrite', action='store_true')
     parser.add_argument('--debug', action='store_true')
+    instrument.add_arguments(parser)
     args = parser.parse_args()
     assert args.league in betting_aids.keys()
     logger.info('Running Experiments for {}; Overwrite {}'.format(args.league, args.overwrite))
-    execute_experiments(args.league, args.overwrite, args.debug)
+    with instrument.run_report('run_experiments', profile=args.profile, trace_memory=args.trace_memory):
+        execute_experiments(args.league, args.overwrite, args.debug)
@@ -1,4 +1,7 @@
+import argparse
+
 from sports_bettors.analytics.model import Model
+from sports_bettors.utils import instrument
 
 
 def predict():
@@ -6,4 +9,8 @@ def predict():
 
 
 def predict_cli():
-    predict()
+    parser = argparse.ArgumentParser(prog='Predict Next Week')
+    instrument.add_arguments(parser)
+    args = parser.parse_args()
+    with instrument.run_report('predict', profile=args.profile, trace_memory=args.trace_memory):
+        predict()
@@ -1,5 +1,22 @@
-from sports_bettors.analytics.run import run, analysis
-from config import logger
+import os
+import argparse
+import datetime
+from typing import Optional
+
+import pandas as pd
+
+from sports_bettors.analytics.bets.bets import Bets
+from sports_bettors.analytics.eda.eda import Eda
+from sports_bettors.analytics.model import Model
+from sports_bettors.analytics.model.data import Data
+from sports_bettors.analytics.model.policy import Policy
+from sports_bettors.analytics.model.artifacts import Artifacts, artifact_key, training_key
+from sports_bettors.analytics.model.report import render_report
+from sports_bettors.utils.dag import Graph
+from sports_bettors.utils import instrument
+
+leagues = ['nfl', 'college_football']
+responses = ['spread', 'over']
 
 
 def refresh_college_data():
@@ -55,13 +72,122 @@ def refresh_college_data():
     return df
 
 
-def refresh():
-    analysis()
-    for league in ['nfl', 'college_football']:
-        for model in ['spread', 'over']:
-            logger.info(f'Creating Model for {league}, {model}')
-            run(league, model, overwrite=True)
+def ingest(league: str):
+    # Into the game store, later stages read the seasons and columns they need from it
+    Data(league=league, overwrite=True).ingest()
+
+
+def eda(*_, league: str):
+    Eda(league=league).analyze()
+
+
+def bets():
+    Bets().analyze()
+
+
+def wrangle(*_, league: str) -> pd.DataFrame:
+    data = Data(league=league)
+    return data.wrangle(data.etl())
+
+
+def train(df: pd.DataFrame, league: str, response: str, force: bool = False) -> dict:
+    api = Policy(league=league, response=response)
+    df_, _, df_all = api.fit_transform(df)
+    artifacts = Artifacts(api)
+    # Skip the model if it was already trained, validated and saved for the same inputs today
+    key = artifact_key(api, df_all)
+    if artifacts.hit(key) and not force:
+        return {'key': key, 'api': None}
+    # Reuse the stored model if it was fit on the same training split, validation and policies are recomputed
+    model_key = training_key(api, df_)
+    if artifacts.model_hit(model_key) and not force:
+        artifacts.restore()
+    else:
+        api.train(df_)
+    return {'key': key, 'model_key': model_key, 'api': api}
+
+
+def validate(df: pd.DataFrame, trained: dict, run_shap: bool = False, n_jobs: Optional[int] = None) -> dict:
+    api = trained['api']
+    if api is None:
+        return trained
+    df_, df_val, df_all = api.fit_transform(df, val=True)
+    df_val, results = api.validate_model(df_=df_, df_val=df_val, df=df_all, run_shap=run_shap, n_jobs=n_jobs)
+    return {**trained, 'df_val': df_val, 'results': results}
+
+
+def policy(validated: dict):
+    api = validated['api']
+    if api is None:
+        return
+    results = api.validate_policy(validated['df_val'], validated['results'])
+    results.save(api.save_dir)
+    api.save_results()
+    Artifacts(api).record(validated['key'], validated['model_key'])
+
+
+def predict(*_, league: str):
+    Model(leagues=[league]).predict_league(league)
+
+
+def report(*_, league: str):
+    for response in responses:
+        # Same location Model saves to
+        save_dir = os.path.join(os.getcwd(), 'docs', 'model', league, response)
+        render_report(save_dir, os.path.join(save_dir, 'validate.pdf'))
+
+
+def refresh_graph(force: bool = False, run_shap: bool = False, n_jobs: Optional[int] = None) -> Graph:
+    """
+    Refresh as a task graph, per league: ingest -> wrangle -> train -> validate -> policy -> predict -> report, with
+    EDA off the ingested games and the bets analysis on its own. Each league is wrangled once, its features are handed
+    to the train and validate stages of every response as the wrangle stage's output. Validation explains models with
+    n_jobs processes.
+    """
+    graph = Graph(os.path.join(os.getcwd(), 'data', 'sports_bettors', 'refresh'),
+                  run_id=datetime.date.today().isoformat())
+    graph.add('bets', bets)
+    for league in leagues:
+        graph.add(f'ingest_{league}', ingest, league=league)
+        graph.add(f'eda_{league}', eda, deps=[f'ingest_{league}'], league=league)
+        graph.add(f'wrangle_{league}', wrangle, deps=[f'ingest_{league}'], league=league)
+        for response in responses:
+            name = f'{league}_{response}'
+            graph.add(f'train_{name}', train, deps=[f'wrangle_{league}'], league=league, response=response,
+                      force=force)
+            graph.add(f'validate_{name}', validate, deps=[f'wrangle_{league}', f'train_{name}'], run_shap=run_shap,
+                      n_jobs=n_jobs)
+            graph.add(f'policy_{name}', policy, deps=[f'validate_{name}'])
+        graph.add(f'predict_{league}', predict, deps=[f'policy_{league}_{response}' for response in responses],
+                  league=league)
+        graph.add(f'report_{league}', report, deps=[f'predict_{league}'], league=league)
+    return graph
+
+
+def refresh(force: bool = False, n_workers: int = 1, restart: bool = False, run_shap: bool = False):
+    """
+    Refresh data, models and predictions. Leagues and responses run concurrently with more than one worker, a failed
+    refresh resumes where it failed when rerun the same day
+    """
+    # Each worker's share of the cores for its own processes (SHAP), rather than every worker using all of them
+    n_jobs = max(1, (os.cpu_count() or 1) // n_workers)
+    refresh_graph(force=force, run_shap=run_shap, n_jobs=n_jobs).run(n_workers=n_workers, restart=restart)
+
+
+def refresh_cli():
+    """
+    Refresh data and models, models are only retrained when their data, config or code changed
+    """
+    parser = argparse.ArgumentParser(prog='Refresh Models')
+    parser.add_argument('--force', action='store_true', help='Retrain and revalidate even if nothing changed')
+    parser.add_argument('--workers', type=int, default=min(4, os.cpu_count() or 1))
+    parser.add_argument('--restart', action='store_true', help='Start over instead of resuming a failed refresh')
+    parser.add_argument('--shap', action='store_true', help='Explain validated models with SHAP values (slower)')
+    instrument.add_arguments(parser)
+    args = parser.parse_args()
+    with instrument.run_report('refresh', profile=args.profile, trace_memory=args.trace_memory):
+        refresh(force=args.force, n_workers=args.workers, restart=args.restart, run_shap=args.shap)
 
 
 if __name__ == '__main__':
-    refresh()
+    refresh_cli()
@@ -0,0 +1,27 @@
+import os
+import argparse
+
+from sports_bettors.analytics.model.report import render_report
+from sports_bettors.utils import instrument
+
+
+def report_cli():
+    """
+    Render validation reports from saved results, without re-running validation
+    """
+    parser = argparse.ArgumentParser(prog='Render Validation Reports')
+    parser.add_argument('--league', required=False)
+    parser.add_argument('--response', required=False)
+    parser.add_argument('--workers', type=int, default=1)
+    instrument.add_arguments(parser)
+    args = parser.parse_args()
+
+    leagues = ['nfl', 'college_football'] if args.league is None else [args.league]
+    responses = ['spread', 'over'] if args.response is None else [args.response]
+    with instrument.run_report('report', profile=args.profile, trace_memory=args.trace_memory):
+        for league in leagues:
+            for response in responses:
+                # Same location Model saves to
+                save_dir = os.path.join(os.getcwd(), 'docs', 'model', league, response)
+                with instrument.stage('render_report', league=league, response=response):
+                    render_report(save_dir, os.path.join(save_dir, 'validate.pdf'), n_workers=args.workers)
@@ -0,0 +1,63 @@
+import os
+import json
+from typing import Iterator, Optional, Tuple
+
+
+class Checkpoint(object):
+    """
+    Append-only store of json records, one per line, so progress survives a crash and can be resumed. Reading never
+    modifies the file, only appending does
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._repaired = False
+
+    def _repair(self):
+        # A crash mid-write leaves a partial last line, terminate it so the next record starts on its own line
+        if not os.path.exists(os.path.dirname(os.path.abspath(self.path))):
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)))
+        if os.path.exists(self.path) and os.path.getsize(self.path) > 0:
+            with open(self.path, 'rb+') as fp:
+                fp.seek(-1, os.SEEK_END)
+                if fp.read(1) != b'\n':
+                    fp.write(b'\n')
+        self._repaired = True
+
+    def append(self, record: dict):
+        if not self._repaired:
+            self._repair()
+        with open(self.path, 'a') as fp:
+            fp.write(json.dumps(record) + '\n')
+
+    def __iter__(self) -> Iterator[dict]:
+        if not os.path.exists(self.path):
+            return
+        with open(self.path) as fp:
+            for line in fp:
+                try:
+                    yield json.loads(line)
+                except ValueError:
+                    # Partial record from an interrupted write
+                    continue
+
+    def read(self, start: int = 0, end: Optional[int] = None) -> Iterator[Tuple[int, dict]]:
+        """
+        Records whose lines lie between byte offsets start and end (end of file), each with the offset just past it so
+        a reader can pick up from there once more records are appended
+        """
+        if not os.path.exists(self.path):
+            return
+        with open(self.path, 'rb') as fp:
+            fp.seek(start)
+            offset = start
+            for line in fp:
+                # Stop at a record still being written
+                if (end is not None and offset + len(line) > end) or not line.endswith(b'\n'):
+                    return
+                offset += len(line)
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    continue
+                yield offset, record
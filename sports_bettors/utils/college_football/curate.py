@@ -1,21 +1,49 @@
 import os
-import re
 
-from tqdm import tqdm
 import pandas as pd
 
+from sports_bettors.utils.manifest import Manifest
+from sports_bettors.utils.reshape import team_perspective
 from config import Config, logger
 
 
-def curate_college():
+def merge_rankings(df_stats: pd.DataFrame, df_rankings: pd.DataFrame) -> pd.DataFrame:
     """
-    Curate sports_bettors football data
+    Add each poll's rank for the home and away teams to the stats with one merge per side
+    """
+    # Wide table of (season, week, team) -> rank in each poll, e.g. APTop25Rank
+    df_ranks = df_rankings.assign(poll=df_rankings['poll'].str.replace(' ', '', regex=False) + 'Rank'). \
+        pivot_table(index=['year', 'week', 'school'], columns='poll', values='rank', aggfunc='first'). \
+        reset_index(). \
+        rename(columns={'year': 'season'})
+    df_ranks.columns.name = None
+    rank_cols = [col for col in df_ranks.columns if col not in ['season', 'week', 'school']]
+
+    for home_away in ['home', 'away']:
+        df_side = df_ranks.rename(columns={'school': home_away + '_team',
+                                           **{col: home_away + '_' + col for col in rank_cols}})
+        df_stats = df_stats.merge(df_side, on=['season', 'week', home_away + '_team'], how='left')
+    return df_stats
+
+
+def curate_college(overwrite: bool = False):
+    """
+    Curate sports_bettors football data, skipped when the raw files are unchanged since the last curation
     """
     RAW_DIR = os.path.join(Config.DATA_DIR, 'sports_bettors', 'raw', 'college_football')
     CURATION_DIR = os.path.join(Config.DATA_DIR, 'sports_bettors', 'curated', 'college_football')
     if not os.path.exists(CURATION_DIR):
         os.makedirs(CURATION_DIR)
 
+    # Games, stats and rankings are joined into every row, so any change re-curates the whole set
+    manifest = Manifest(os.path.join(CURATION_DIR, 'manifest.json'))
+    digests = {fn: Manifest.file_hash(os.path.join(RAW_DIR, fn))
+               for fn in ['df_games.csv', 'df_stats.csv', 'df_rankings.csv']}
+    changed = [fn for fn, digest in digests.items() if manifest.changed(fn, digest)]
+    if not overwrite and len(changed) == 0 and os.path.exists(os.path.join(CURATION_DIR, 'df_curated.csv')):
+        logger.info('Curated college football data is up to date.')
+        return
+
     logger.info('Load Raw Data.')
     df_games = pd.read_csv(os.path.join(RAW_DIR, 'df_games.csv'))
     df_stats = pd.read_csv(os.path.join(RAW_DIR, 'df_stats.csv'))
@@ -69,51 +97,17 @@ def curate_college():
     df_stats = df_stats.merge(df_games, on='game_id', how='inner')
 
     logger.info('Merge Rankings and Stats')
-    for poll, df_poll in df_rankings.groupby('poll'):
-        rank_col_name = re.sub(' ', '', poll) + 'Rank'
-        df_poll_sub = df_poll. \
-            rename(columns={'rank': rank_col_name, 'year': 'season'})
-
-        # Merge with stats
-        for home_away in ['home', 'away']:
-            df_poll_sub[home_away + '_team'] = df_poll_sub['school']
-            df_poll_sub[home_away + '_' + rank_col_name] = df_poll_sub[rank_col_name]
-            df_stats = df_stats.merge(df_poll_sub[
-                                          ['season', 'week', home_away + '_team', home_away + '_' + rank_col_name]
-                                      ],
-                                      on=['season', 'week', home_away + '_team'],
-                                      how='left')
+    df_stats = merge_rankings(df_stats, df_rankings)
+
     # Clean up team names
-    df_stats['home_team'] = df_stats['home_team'].apply(lambda team: re.sub(' ', '', team))
-    df_stats['away_team'] = df_stats['away_team'].apply(lambda team: re.sub(' ', '', team))
+    for home_away in ['home', 'away']:
+        df_stats[home_away + '_team'] = df_stats[home_away + '_team'].str.replace(' ', '', regex=False)
 
     logger.info('Define Modeling Dataset.')
-    df_modeling = []
-    all_teams = set(list(df_stats['home_team']) + list(df_stats['away_team']))
-    for team in tqdm(all_teams):
-        # Games where team is home
-        df_home = df_stats[df_stats['home_team'] == team].copy()
-        df_home['team'] = team
-        df_home['is_home'] = 1
-        df_home['opponent'] = df_home['away_team']
-        df_home = df_home.drop(['home_team', 'away_team'], axis=1)
-        df_home.columns = [re.sub('away_', 'opp_', re.sub('home_', '', col)) for col in df_home.columns]
-        df_modeling.append(df_home)
-
-        # Games where team is away
-        df_away = df_stats[df_stats['away_team'] == team].copy()
-        df_away['team'] = team
-        df_away['is_home'] = 0
-        df_away['opponent'] = df_away['home_team']
-        df_away = df_away.drop(['home_team', 'away_team'], axis=1)
-        df_away.columns = [re.sub('home_', 'opp_', re.sub('away_', '', col)) for col in df_away.columns]
-        df_modeling.append(df_away)
-    df_modeling = pd.concat(df_modeling, sort=True).reset_index(drop=True)
-
-    # Matchup
-    def _define_matchup(main_team, opponent):
-        return '_vs_'.join(sorted([main_team, opponent]))
-    df_modeling['matchup'] = df_modeling.apply(lambda row: _define_matchup(row['team'], row['opponent']), axis=1)
+    df_modeling = team_perspective(df_stats)
 
     logger.info('Save Curated data for {} games.'.format(df_modeling.shape))
     df_modeling.to_csv(os.path.join(CURATION_DIR, 'df_curated.csv'), index=False)
+    for fn, digest in digests.items():
+        manifest.update(fn, digest)
+    manifest.save()
@@ -1,11 +1,15 @@
 import os
-import requests
 from datetime import datetime
-from typing import Tuple
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Iterable, Optional, Tuple
 
+import requests
+from requests.adapters import HTTPAdapter
 import pandas as pd
 from tqdm import tqdm
 
+from sports_bettors.utils.checkpoint import Checkpoint
+from sports_bettors.utils.scraper import RateLimiter
 from config import Config, logger
 
 
@@ -40,11 +44,22 @@ class DownloadCollegeFootballData(object):
         'kickingPoints'
     ]
 
-    def __init__(self, save_dir: str = None):
+    def __init__(self, save_dir: str = None, max_workers: int = 8, min_interval: float = 0.1):
         self.save_dir = os.path.join(Config.DATA_DIR, 'sports_bettors', 'raw', 'college_football') \
             if save_dir is None else save_dir
         if not os.path.exists(self.save_dir):
             os.makedirs(self.save_dir)
+        self.max_workers = max_workers
+        self.rate_limiter = RateLimiter(min_interval)
+
+        # Pooled session shared by all requests and workers
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=max_workers, pool_maxsize=max_workers)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+
+        # Raw responses for each game's stats, appended as they arrive
+        self.checkpoint = Checkpoint(os.path.join(self.save_dir, 'stats_checkpoint.jsonl'))
 
     def download_games(self) -> pd.DataFrame:
         """
@@ -54,7 +69,7 @@ class DownloadCollegeFootballData(object):
         df = []
         for year in tqdm(self.years):
             # Return data
-            r = requests.get(self.base_url + 'games/', params={'year': year})
+            r = self.session.get(self.base_url + 'games/', params={'year': year})
 
             # Convert to dataframe
             df_year = pd.DataFrame.from_records(r.json())
@@ -85,7 +100,7 @@ class DownloadCollegeFootballData(object):
             # Try a download, catch connection failures
             try:
                 params = {'year': year}
-                r = requests.get(self.base_url + 'rankings', params=params)
+                r = self.session.get(self.base_url + 'rankings', params=params)
             except Exception as err:
                 logger.info('{}, {}'.format(year, err))
                 df_fail = pd.DataFrame({'year': year, 'error': err}, index=[0])
@@ -125,59 +140,88 @@ class DownloadCollegeFootballData(object):
 
         return df, df_fails
 
-    def download_stats(self, df_games: pd.DataFrame = None) -> Tuple[pd.DataFrame, pd.DataFrame]:
+    def _get_stats(self, game_id: int) -> dict:
         """
-        Download stats for each game
+        Request stats for one game, returns a checkpoint record
         """
-        if df_games is None:
-            df_games = self.download_games()
-        assert 'game_id' in df_games.columns
-
-        logger.info('Downloading Stats.')
-        df_stats, df_fails = [], []
-        for game_id in tqdm(set(df_games['game_id'])):
-            params = {'gameId': game_id}
-
-            # Try a download, catch connection failures
-            try:
-                r = requests.get(self.base_url + 'games/teams', params=params)
-            except Exception as err:
-                logger.info('{}, {}'.format(game_id, err))
-                df_fail = pd.DataFrame({'game_id': game_id, 'error': err}, index=[0])
-                df_fails.append(df_fail)
-                continue
-
-            if r.status_code != 200:
-                logger.info('{}, {}'.format(game_id, r.status_code))
-                df_fail = pd.DataFrame({'game_id': game_id, 'error': r.status_code}, index=[0])
-                df_fails.append(df_fail)
-                continue
+        self.rate_limiter.wait(self.base_url)
+        # Try a download, catch connection failures
+        try:
+            r = self.session.get(self.base_url + 'games/teams', params={'gameId': game_id})
+        except Exception as err:
+            return {'game_id': game_id, 'status': 'failed', 'error': str(err)}
 
-            if len(r.json()) == 0:
-                df_fail = pd.DataFrame({'game_id': game_id, 'error': 'No Data'}, index=[0])
-                df_fails.append(df_fail)
-                continue
+        if r.status_code != 200:
+            return {'game_id': game_id, 'status': 'failed', 'error': r.status_code}
 
-            # Get list of stats where each entry is a team
-            stats_by_team = r.json()[0]['teams']
-            df_game = []
-            for team in stats_by_team:
-                df_game_long = pd.DataFrame.from_records(team['stats'])
+        if len(r.json()) == 0:
+            return {'game_id': game_id, 'status': 'failed', 'error': 'No Data'}
 
-                # Subset for useful stats
-                df_game_long = df_game_long[df_game_long['category'].isin(self.features)]
+        return {'game_id': game_id, 'status': 'ok', 'teams': r.json()[0]['teams']}
 
-                # Append home/away to category
-                df_game_long['category'] = team['homeAway'] + '_' + df_game_long['category']
-                df_game.append(df_game_long)
-            df_game = pd.concat(df_game, sort=True)
+    def _latest_records(self) -> dict:
+        """
+        Most recent checkpoint record for each game
+        """
+        return {record['game_id']: record for record in self.checkpoint}
 
-            # Pivot
-            df_game = pd.pivot_table(df_game, columns='category', values='stat', aggfunc='first').reset_index(drop=True)
-            df_stats.append(df_game.assign(game_id=game_id))
+    def _download(self, game_ids: Iterable[int]):
+        """
+        Download stats for each game concurrently, checkpointing each response as it completes
+        """
+        game_ids = sorted(set(int(game_id) for game_id in game_ids))
+        logger.info('Downloading Stats for {} games.'.format(len(game_ids)))
+        if len(game_ids) == 0:
+            return
+        with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+            futures = [pool.submit(self._get_stats, game_id) for game_id in game_ids]
+            for future in tqdm(as_completed(futures), total=len(futures)):
+                record = future.result()
+                if record['status'] != 'ok':
+                    logger.info('{}, {}'.format(record['game_id'], record['error']))
+                self.checkpoint.append(record)
+
+    def _flatten_stats(self, game_id: int, stats_by_team: list) -> list:
+        """
+        Long (game_id, category, stat) records of useful stats for a game, where each entry of stats_by_team is a team
+        """
+        return [
+            (game_id, team['homeAway'] + '_' + stat['category'], stat['stat'])
+            for team in stats_by_team for stat in team['stats']
+            # Subset for useful stats
+            if stat['category'] in self.features and stat.get('stat') is not None
+        ]
+
+    @staticmethod
+    def _pivot_stats(records: list, game_ids: list) -> pd.DataFrame:
+        """
+        Pivot long stat records to one row per game, in the order of game_ids
+        """
+        df = pd.DataFrame.from_records(records, columns=['game_id', 'category', 'stat']). \
+            drop_duplicates(subset=['game_id', 'category'], keep='first')
+        df = df.pivot(index='game_id', columns='category', values='stat')
+        df = df.reindex([game_id for game_id in game_ids if game_id in df.index]).reset_index()
+        df.columns.name = None
+        return df
 
-        df_stats = pd.concat(df_stats, sort=True).reset_index(drop=True)
-        df_fails = pd.concat(df_fails, sort=True).reset_index(drop=True) if len(df_fails) > 0 else pd.DataFrame()
+    def assemble_stats(self, chunk_size: int = 10000) -> Tuple[pd.DataFrame, pd.DataFrame]:
+        """
+        Build and save the stats and failures tables from the checkpoint, pivoting chunks of games at once
+        """
+        records = self._latest_records()
+        game_ids = [game_id for game_id, record in records.items() if record['status'] == 'ok']
+        df_stats = []
+        for start in range(0, len(game_ids), chunk_size):
+            chunk = game_ids[start:start + chunk_size]
+            stats = [stat for game_id in chunk for stat in self._flatten_stats(game_id, records[game_id]['teams'])]
+            df_stats.append(self._pivot_stats(stats, chunk))
+        df_stats = pd.concat(df_stats, sort=True).reset_index(drop=True) if len(df_stats) > 0 else pd.DataFrame()
+        # Stats columns in alphabetical order with game_id among them, as when games were concatenated one at a time
+        df_stats = df_stats[sorted(df_stats.columns)]
+        df_fails = pd.DataFrame.from_records([
+            {'game_id': game_id, 'error': record['error']} for game_id, record in records.items()
+            if record['status'] != 'ok'
+        ])
 
         logger.info('Downloaded Stats for {} games.'.format(df_stats.shape[0]))
         logger.info('Failed downloads for {} games.'.format(df_fails.shape[0]))
@@ -189,26 +233,28 @@ class DownloadCollegeFootballData(object):
 
         return df_stats, df_fails
 
-    def retry_stats(self):
+    def download_stats(self, df_games: pd.DataFrame = None) -> Tuple[pd.DataFrame, pd.DataFrame]:
         """
-        Some games fail due to connection issues with the API; retry these games here
+        Download stats for each game, resuming from the checkpoint
         """
-        failed_ids = os.path.join(self.save_dir, 'df_failed_stats.csv')
-        if not os.path.exists(failed_ids):
-            logger.info('Download stats before retrying.')
-            return
-        df = pd.read_csv(failed_ids)
+        if df_games is None:
+            df_games = self.download_games()
+        assert 'game_id' in df_games.columns
 
-        # Get games with previously downloaded stats
-        original_stats = os.path.join(self.save_dir, 'df_stats.csv')
-        df_original = pd.read_csv(original_stats)
+        # Skip games already in the checkpoint, failures are left to retry_stats
+        records = self._latest_records()
+        self._download([game_id for game_id in set(df_games['game_id']) if game_id not in records])
 
-        # Retry failed games
-        df_stats, df_fails = self.download_stats(df)
+        return self.assemble_stats()
 
-        # Append
-        df_retried = df_original.append(df_stats).drop_duplicates().reset_index(drop=True)
+    def retry_stats(self) -> Optional[Tuple[pd.DataFrame, pd.DataFrame]]:
+        """
+        Some games fail due to connection issues with the API; retry these games here
+        """
+        if not os.path.exists(self.checkpoint.path):
+            logger.info('Download stats before retrying.')
+            return None
+        records = self._latest_records()
+        self._download([game_id for game_id, record in records.items() if record['status'] != 'ok'])
 
-        # Save
-        df_retried.to_csv(original_stats, index=False)
-        df_fails.to_csv(failed_ids, index=False)
+        return self.assemble_stats()
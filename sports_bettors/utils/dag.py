@@ -0,0 +1,160 @@
+import os
+import json
+import pickle
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+from typing import Callable, Dict, List, Optional, Sequence
+
+from sports_bettors.utils import instrument
+from config import logger
+
+
+def _run_node(name: str, func: Callable, kwargs: dict, input_paths: List[str], output_path: str,
+              report_options: Optional[dict] = None) -> Optional[dict]:
+    """
+    Run a node on its dependencies' outputs, runs in a worker process when the graph runs in parallel.
+
+    The node is recorded as a stage of the run report. A worker records into its own report when the parent is
+    recording (`report_options`) and returns it for the parent to merge.
+    """
+    report = None
+    if report_options is not None and instrument.active() is None:
+        report = instrument.RunReport(name, **report_options).start()
+    try:
+        inputs = []
+        for path in input_paths:
+            with open(path, 'rb') as fp:
+                inputs.append(pickle.load(fp))
+        with instrument.stage(name):
+            output = func(*inputs, **kwargs)
+        # Write-then-rename so a failed node never leaves an output behind
+        with open(output_path + '.tmp', 'wb') as fp:
+            pickle.dump(output, fp)
+        os.replace(output_path + '.tmp', output_path)
+    finally:
+        if report is not None:
+            report.stop()
+    return report.export() if report is not None else None
+
+
+class Node(object):
+    def __init__(self, name: str, func: Callable, deps: Sequence[str], kwargs: dict):
+        self.name = name
+        self.func = func
+        self.deps = list(deps)
+        self.kwargs = kwargs
+
+
+class Graph(object):
+    """
+    Tasks with explicit dependencies, run in dependency order, independent tasks concurrently in a process pool.
+
+    A node's function is called with its dependencies' outputs, in the order they were listed, and its keyword
+    arguments. Outputs are pickled to state_dir and completed nodes are recorded there for the run, so running the
+    same run again after a failure resumes from the failed nodes. State is cleared once every node has completed.
+    """
+    state_file = 'state.json'
+
+    def __init__(self, state_dir: str, run_id: str):
+        self.state_dir = state_dir
+        self.run_id = run_id
+        self.nodes = {}
+
+    def add(self, name: str, func: Callable, deps: Sequence[str] = (), **kwargs):
+        for dep in deps:
+            if dep not in self.nodes:
+                raise ValueError('{} depends on unknown node {}'.format(name, dep))
+        self.nodes[name] = Node(name, func, deps, kwargs)
+
+    def output_path(self, name: str) -> str:
+        return os.path.join(self.state_dir, '{}.pkl'.format(name))
+
+    def _load_state(self) -> List[str]:
+        path = os.path.join(self.state_dir, self.state_file)
+        if not os.path.exists(path):
+            return []
+        with open(path) as fp:
+            state = json.load(fp)
+        if state['run_id'] != self.run_id:
+            logger.info('Ignoring saved state of run {}'.format(state['run_id']))
+            return []
+        return [name for name in state['done'] if name in self.nodes and os.path.exists(self.output_path(name))]
+
+    def _save_state(self, done: List[str]):
+        tmp_path = os.path.join(self.state_dir, self.state_file + '.tmp')
+        with open(tmp_path, 'w') as fp:
+            json.dump({'run_id': self.run_id, 'done': done}, fp, indent=4)
+        os.replace(tmp_path, os.path.join(self.state_dir, self.state_file))
+
+    def _clear_state(self):
+        for fn in os.listdir(self.state_dir):
+            if fn == self.state_file or fn.endswith('.pkl'):
+                os.remove(os.path.join(self.state_dir, fn))
+
+    def run(self, n_workers: int = 1, restart: bool = False) -> Dict[str, str]:
+        """
+        Run every node that hasn't completed, returns the nodes that ran and those that were resumed by status
+        """
+        if not os.path.exists(self.state_dir):
+            os.makedirs(self.state_dir)
+        if restart:
+            self._clear_state()
+        done = self._load_state()
+        status = {name: 'resumed' for name in done}
+        if done:
+            logger.info('Resuming run {}, {} of {} nodes already complete'.format(
+                self.run_id, len(done), len(self.nodes)))
+
+        def _ready() -> List[str]:
+            return [name for name, node in self.nodes.items()
+                    if name not in status and all(status.get(dep) in ['resumed', 'done'] for dep in node.deps)]
+
+        report = instrument.active()
+
+        def _args(name: str) -> tuple:
+            node = self.nodes[name]
+            return name, node.func, node.kwargs, [self.output_path(dep) for dep in node.deps], \
+                self.output_path(name), report.options() if report is not None else None
+
+        def _finish(name: str, error: BaseException = None):
+            if error is None:
+                status[name] = 'done'
+                done.append(name)
+                self._save_state(done)
+                logger.info('Completed {}'.format(name))
+            else:
+                status[name] = 'failed'
+                logger.error('{} failed: {!r}'.format(name, error))
+
+        if n_workers == 1:
+            while _ready():
+                name = _ready()[0]
+                logger.info('Running {}'.format(name))
+                try:
+                    _run_node(*_args(name))
+                    _finish(name)
+                except Exception as error:
+                    _finish(name, error)
+        else:
+            with ProcessPoolExecutor(max_workers=n_workers) as executor:
+                running = {}
+                while True:
+                    for name in _ready():
+                        if name not in running.values():
+                            logger.info('Running {}'.format(name))
+                            running[executor.submit(_run_node, *_args(name))] = name
+                    if not running:
+                        break
+                    finished, _ = wait(running, return_when=FIRST_COMPLETED)
+                    for future in finished:
+                        if future.exception() is None and future.result() is not None:
+                            report.merge(future.result())
+                        _finish(running.pop(future), future.exception())
+
+        failed = [name for name, s in status.items() if s == 'failed']
+        if failed:
+            # Nodes downstream of a failure never ran
+            skipped = [name for name in self.nodes if name not in status]
+            raise RuntimeError('Failed: {}, not run: {}. Rerun to resume'.format(
+                ', '.join(failed), ', '.join(skipped) or 'none'))
+        self._clear_state()
+        return status
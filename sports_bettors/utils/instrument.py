@@ -0,0 +1,253 @@
+import io
+import os
+import json
+import time
+import pstats
+import marshal
+import argparse
+import cProfile
+import datetime
+import functools
+import tracemalloc
+try:
+    import resource
+except ImportError:
+    # Not on windows
+    resource = None
+from contextlib import contextmanager
+from typing import Callable, Optional
+
+import pandas as pd
+
+from config import logger
+
+# Report being recorded by this process, see RunReport.start
+_report = None
+
+
+def _max_rss_mb() -> Optional[float]:
+    # High-water mark of the process, kilobytes on linux
+    return round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1e3, 3) if resource is not None else None
+
+
+def _rows(obj) -> Optional[int]:
+    # Rows of a frame, or of the first frame a stage returns with others (e.g. fit_transform)
+    if isinstance(obj, pd.DataFrame):
+        return obj.shape[0]
+    if isinstance(obj, tuple):
+        return next((item.shape[0] for item in obj if isinstance(item, pd.DataFrame)), None)
+    return None
+
+
+class RunReport(object):
+    """
+    Wall time, CPU time, memory and rows in / out of each stage run while the report is recording.
+
+    Every stage records the process's peak RSS so far, which is free to read. With `trace_memory`, it also records
+    the most traced (tracemalloc) memory it held above what was allocated when it started, including its nested
+    stages; tracing slows allocation-heavy Python code down several times. With `profile`, each outermost stage runs
+    under cProfile and the stats of the slowest one are kept.
+    """
+
+    def __init__(self, command: str, profile: bool = False, trace_memory: bool = False):
+        self.command = command
+        self.profile = profile
+        self.trace_memory = trace_memory
+        self.records = []
+        self.pid = None
+        self.summary = {}
+        # (wall time, stage, stats) of the slowest profiled stage
+        self.profiled = None
+        self._stack = []
+
+    def start(self) -> 'RunReport':
+        global _report
+        self._tracing = self.trace_memory and not tracemalloc.is_tracing()
+        if self._tracing:
+            tracemalloc.start()
+        self.pid = os.getpid()
+        self.summary = {'command': self.command, 'pid': self.pid, 'started': datetime.datetime.now().isoformat()}
+        self._start = time.perf_counter(), time.process_time()
+        self._epoch = time.time()
+        self._stack = [{'name': None, 'start': tracemalloc.get_traced_memory()[0], 'peak': 0}]
+        _report = self
+        return self
+
+    def stop(self, error: Optional[BaseException] = None):
+        global _report
+        root = self._stack[0]
+        self.summary.update(
+            status='failed' if error is not None else 'completed',
+            error=repr(error) if error is not None else None,
+            wall_s=round(time.perf_counter() - self._start[0], 3),
+            cpu_s=round(time.process_time() - self._start[1], 3),
+            max_rss_mb=_max_rss_mb(),
+            peak_mb=round((max(root['peak'], tracemalloc.get_traced_memory()[1]) - root['start']) / 1e6, 3)
+            if self.trace_memory else None,
+        )
+        if self._tracing:
+            tracemalloc.stop()
+        _report = None
+
+    def _enter(self, name: str) -> dict:
+        if not self.trace_memory:
+            frame = {'name': name}
+            self._stack.append(frame)
+            return frame
+        # tracemalloc has one peak, fold it into the enclosing stage's before resetting it for this one
+        current, peak = tracemalloc.get_traced_memory()
+        self._stack[-1]['peak'] = max(self._stack[-1]['peak'], peak)
+        tracemalloc.reset_peak()
+        frame = {'name': name, 'start': current, 'peak': current}
+        self._stack.append(frame)
+        return frame
+
+    def _exit(self) -> Optional[int]:
+        frame = self._stack.pop()
+        if not self.trace_memory:
+            return None
+        peak = max(frame['peak'], tracemalloc.get_traced_memory()[1])
+        self._stack[-1]['peak'] = max(self._stack[-1]['peak'], peak)
+        tracemalloc.reset_peak()
+        return peak - frame['start']
+
+    def _keep_profile(self, stage: str, wall_s: float, profiler: cProfile.Profile):
+        if self.profiled is None or wall_s > self.profiled[0]:
+            profiler.create_stats()
+            self.profiled = (wall_s, stage, profiler.stats)
+
+    @contextmanager
+    def stage(self, name: str, **labels):
+        """
+        Record the block as a stage, yields the record so the caller can add rows or labels
+        """
+        path = '/'.join([frame['name'] for frame in self._stack[1:]] + [name])
+        # Wall clock start, comparable across processes, made relative to the run's start when saved
+        record = {'stage': path, 'start_s': time.time(), **labels}
+        profiler = cProfile.Profile() if self.profile and len(self._stack) == 1 else None
+        self._enter(name)
+        start = time.perf_counter(), time.process_time()
+        if profiler is not None:
+            profiler.enable()
+        try:
+            yield record
+        finally:
+            if profiler is not None:
+                profiler.disable()
+            record.update(wall_s=round(time.perf_counter() - start[0], 3),
+                          cpu_s=round(time.process_time() - start[1], 3),
+                          max_rss_mb=_max_rss_mb())
+            peak = self._exit()
+            record['peak_mb'] = round(peak / 1e6, 3) if peak is not None else None
+            self.records.append(record)
+            if profiler is not None:
+                self._keep_profile(path, record['wall_s'], profiler)
+
+    def options(self) -> dict:
+        return {'profile': self.profile, 'trace_memory': self.trace_memory}
+
+    def export(self) -> dict:
+        # Stages recorded in a worker process, for the parent's report
+        return {'records': self.records, 'profiled': self.profiled}
+
+    def merge(self, exported: dict):
+        self.records.extend(exported['records'])
+        profiled = exported['profiled']
+        if profiled is not None and (self.profiled is None or profiled[0] > self.profiled[0]):
+            self.profiled = profiled
+
+    def save(self, report_dir: str) -> str:
+        if not os.path.exists(report_dir):
+            os.makedirs(report_dir)
+        name = '{}_{}'.format(self.command, datetime.datetime.now().strftime('%Y%m%d-%H%M%S'))
+        records = [{**record, 'start_s': round(record['start_s'] - self._epoch, 3)}
+                   for record in sorted(self.records, key=lambda record: record['start_s'])]
+        report = {**self.summary, 'stages': records, 'profile': None}
+
+        if self.profiled is not None:
+            wall_s, stage, stats = self.profiled
+            # Same format as cProfile.Profile.dump_stats, load with pstats.Stats(path)
+            report['profile'] = {'stage': stage, 'wall_s': wall_s, 'path': os.path.join(report_dir, name + '.prof')}
+            with open(report['profile']['path'], 'wb') as fp:
+                marshal.dump(stats, fp)
+            stream = io.StringIO()
+            pstats.Stats(report['profile']['path'], stream=stream).sort_stats('cumulative').print_stats(20)
+            logger.info('Profile of the slowest stage, {} ({} s):\n{}'.format(stage, wall_s, stream.getvalue()))
+
+        path = os.path.join(report_dir, name + '.json')
+        with open(path + '.tmp', 'w') as fp:
+            json.dump(report, fp, indent=4)
+        os.replace(path + '.tmp', path)
+
+        slowest = sorted([record for record in records if '/' not in record['stage']],
+                         key=lambda record: -record['wall_s'])[:10]
+        logger.info('Run report at {}, {} s, max RSS {} MB\n{}'.format(
+            path, self.summary['wall_s'], self.summary['max_rss_mb'], '\n'.join(
+                '{}: {} s wall, {} s cpu, {} MB max RSS{}'.format(
+                    record['stage'], record['wall_s'], record['cpu_s'], record['max_rss_mb'],
+                    '' if record['peak_mb'] is None else ', {} MB traced peak'.format(record['peak_mb']))
+                for record in slowest)))
+        return path
+
+
+def active() -> Optional[RunReport]:
+    """
+    The report this process is recording, a forked worker doesn't record into its parent's copy
+    """
+    return _report if _report is not None and _report.pid == os.getpid() else None
+
+
+@contextmanager
+def stage(name: str, **labels):
+    report = active()
+    if report is None:
+        yield {}
+        return
+    with report.stage(name, **labels) as record:
+        yield record
+
+
+def timed(func: Callable) -> Callable:
+    """
+    Record calls to func as stages named after it, with the rows of the first frame passed and the frame returned.
+    Calls outside a recording run go straight through.
+    """
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        report = active()
+        if report is None:
+            return func(*args, **kwargs)
+        # Methods of league / response models are labelled with them
+        labels = {attr: getattr(args[0], attr) for attr in ['league', 'response']
+                  if args and isinstance(getattr(args[0], attr, None), str)}
+        rows_in = next((arg.shape[0] for arg in list(args) + list(kwargs.values()) if isinstance(arg, pd.DataFrame)),
+                       None)
+        with report.stage(func.__name__, **labels) as record:
+            output = func(*args, **kwargs)
+            record.update(rows_in=rows_in, rows_out=_rows(output))
+        return output
+    return wrapper
+
+
+def add_arguments(parser: argparse.ArgumentParser):
+    """
+    The --profile and --trace_memory flags of a CLI, see run_report
+    """
+    parser.add_argument('--profile', action='store_true', help='Save cProfile stats of the slowest stage')
+    parser.add_argument('--trace_memory', action='store_true', help='Trace peak memory of each stage (slower)')
+
+
+@contextmanager
+def run_report(command: str, profile: bool = False, trace_memory: bool = False, report_dir: Optional[str] = None):
+    """
+    Record a CLI run and save its report to report_dir (data/sports_bettors/runs), also when the run fails
+    """
+    report = RunReport(command, profile=profile, trace_memory=trace_memory).start()
+    try:
+        yield report
+    except BaseException as error:
+        report.stop(error)
+        report.save(report_dir or os.path.join(os.getcwd(), 'data', 'sports_bettors', 'runs'))
+        raise
+    report.stop()
+    report.save(report_dir or os.path.join(os.getcwd(), 'data', 'sports_bettors', 'runs'))
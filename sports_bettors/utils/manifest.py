@@ -0,0 +1,57 @@
+import os
+import json
+import hashlib
+from typing import List, Optional
+
+
+class Manifest(object):
+    """
+    Record of the raw inputs behind a curated dataset, keyed by file name, so unchanged inputs can be skipped on rerun
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.entries = {}
+        if os.path.exists(path):
+            with open(path) as fp:
+                self.entries = json.load(fp)
+
+    @staticmethod
+    def file_hash(path: str, size: Optional[int] = None, chunk_size: int = 1 << 20) -> str:
+        """
+        Hash of the file, or of its first `size` bytes to check that an append-only file only grew
+        """
+        sha1 = hashlib.sha1()
+        remaining = os.path.getsize(path) if size is None else size
+        with open(path, 'rb') as fp:
+            while remaining > 0:
+                chunk = fp.read(min(chunk_size, remaining))
+                if not chunk:
+                    break
+                sha1.update(chunk)
+                remaining -= len(chunk)
+        return sha1.hexdigest()
+
+    def get(self, key: str) -> Optional[dict]:
+        return self.entries.get(key)
+
+    def changed(self, key: str, digest: str) -> bool:
+        return self.entries.get(key, {}).get('sha1') != digest
+
+    def update(self, key: str, digest: str, **info):
+        self.entries[key] = dict(sha1=digest, **info)
+
+    def remove(self, key: str):
+        self.entries.pop(key, None)
+
+    def keys(self) -> List[str]:
+        return sorted(self.entries.keys())
+
+    def save(self):
+        # Write-then-rename so an interrupted run never leaves a truncated manifest
+        if not os.path.exists(os.path.dirname(os.path.abspath(self.path))):
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)))
+        tmp_path = self.path + '.tmp'
+        with open(tmp_path, 'w') as fp:
+            json.dump(self.entries, fp, indent=4, sort_keys=True)
+        os.replace(tmp_path, self.path)
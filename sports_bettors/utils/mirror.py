@@ -0,0 +1,162 @@
+import io
+import os
+import json
+import pickle
+import hashlib
+from urllib.parse import urlparse
+from typing import List, Optional
+
+import pandas as pd
+import requests
+
+from config import logger
+
+# nflverse schedule, scores and lines of every NFL game (https://github.com/nflverse/nfldata)
+nflverse_games_url = 'https://raw.githubusercontent.com/nflverse/nfldata/master/data/games.csv'
+# Scores and lines are missing for games that haven't been played / posted yet
+nflverse_games_dtypes = {
+    'season': 'int64',
+    'week': 'int64',
+    'away_score': 'float64',
+    'home_score': 'float64',
+    'spread_line': 'float64',
+    'total_line': 'float64',
+    'away_moneyline': 'float64',
+    'home_moneyline': 'float64',
+}
+
+
+class Mirror(object):
+    """
+    Local mirror of a remote csv, parsed into a data frame.
+
+    The file is revalidated with ETag / If-Modified-Since, so an unchanged upstream costs one empty 304 response and
+    loads the frame parsed last time. When the file did change, only the lines that are new or changed since the last
+    download are parsed; unchanged lines reuse their already-parsed rows. Falls back to the mirror when the upstream
+    can't be reached.
+    """
+
+    def __init__(self, url: str, mirror_dir: str, timeout: float = 60., **read_csv_kwargs):
+        self.url = url
+        self.mirror_dir = mirror_dir
+        self.timeout = timeout
+        self.read_csv_kwargs = read_csv_kwargs
+        name = os.path.splitext(os.path.basename(urlparse(url).path))[0]
+        self.csv_path = os.path.join(mirror_dir, '{}.csv'.format(name))
+        self.frame_path = os.path.join(mirror_dir, '{}.pkl'.format(name))
+        self.meta_path = os.path.join(mirror_dir, '{}.json'.format(name))
+        # How the last load went, and how many rows it had to parse
+        self.status = None
+        self.n_parsed = 0
+
+    def _meta(self) -> dict:
+        if not os.path.exists(self.meta_path):
+            return {}
+        with open(self.meta_path) as fp:
+            return json.load(fp)
+
+    @staticmethod
+    def _write(path: str, data: bytes):
+        # Write-then-rename so an interrupted run keeps the previous mirror
+        with open(path + '.tmp', 'wb') as fp:
+            fp.write(data)
+        os.replace(path + '.tmp', path)
+
+    @staticmethod
+    def _lines(content: bytes) -> List[str]:
+        return [line for line in content.decode('utf-8').splitlines() if line.strip()]
+
+    def _parse(self, header: str, lines: List[str]) -> pd.DataFrame:
+        return pd.read_csv(io.StringIO('\n'.join([header] + lines)), **self.read_csv_kwargs)
+
+    def _load_frame(self) -> Optional[pd.DataFrame]:
+        if not os.path.exists(self.frame_path):
+            return None
+        with open(self.frame_path, 'rb') as fp:
+            return pickle.load(fp)
+
+    def _update(self, content: bytes) -> pd.DataFrame:
+        """
+        Parse a new version of the file, reusing rows of the mirrored version for lines that haven't changed
+        """
+        lines = self._lines(content)
+        header, rows = lines[0], lines[1:]
+        df_old = self._load_frame()
+        old_lines = []
+        if os.path.exists(self.csv_path):
+            with open(self.csv_path, 'rb') as fp:
+                old_lines = self._lines(fp.read())
+        # Rows line up with lines unless values span lines, then every line has to be parsed
+        if df_old is None or not old_lines or old_lines[0] != header or df_old.shape[0] != len(old_lines) - 1:
+            self.n_parsed = len(rows)
+            return self._parse(header, rows)
+
+        old_rows = {}
+        for idx, line in enumerate(old_lines[1:]):
+            old_rows.setdefault(line, idx)
+        new_lines = [line for line in rows if line not in old_rows]
+        self.n_parsed = len(new_lines)
+        if not new_lines:
+            return df_old.iloc[[old_rows[line] for line in rows]].reset_index(drop=True)
+        df_new = self._parse(header, new_lines)
+        if df_new.shape[0] != len(new_lines):
+            self.n_parsed = len(rows)
+            return self._parse(header, rows)
+        # Keep the mirrored types, a handful of rows can infer narrower ones (ints for scores that are floats)
+        for col in df_new.columns:
+            if col in df_old.columns and df_new[col].dtype != df_old[col].dtype:
+                try:
+                    df_new[col] = df_new[col].astype(df_old[col].dtype)
+                except (ValueError, TypeError):
+                    pass
+
+        new_rows = {line: df_old.shape[0] + idx for idx, line in enumerate(new_lines)}
+        df = pd.concat([df_old, df_new], ignore_index=True)
+        return df.iloc[[old_rows[line] if line in old_rows else new_rows[line] for line in rows]].\
+            reset_index(drop=True)
+
+    def load(self) -> pd.DataFrame:
+        if not os.path.exists(self.mirror_dir):
+            os.makedirs(self.mirror_dir)
+        meta = self._meta()
+        headers = {}
+        if os.path.exists(self.frame_path):
+            if meta.get('etag'):
+                headers['If-None-Match'] = meta['etag']
+            if meta.get('last_modified'):
+                headers['If-Modified-Since'] = meta['last_modified']
+
+        try:
+            r = requests.get(self.url, headers=headers, timeout=self.timeout)
+            r.raise_for_status()
+        except Exception as err:
+            df = self._load_frame()
+            if df is None:
+                raise
+            logger.error('Could not revalidate {} ({}), using the mirror'.format(self.url, err))
+            self.status, self.n_parsed = 'offline', 0
+            return df
+
+        digest = hashlib.sha1(r.content).hexdigest() if r.status_code == 200 else meta.get('sha1')
+        df = self._load_frame() if digest == meta.get('sha1') else None
+        if df is not None:
+            logger.info('{} is unchanged'.format(self.url))
+            self.status, self.n_parsed = 'unchanged', 0
+        else:
+            df = self._update(r.content)
+            logger.info('Updated mirror of {}, parsed {} of {} rows'.format(self.url, self.n_parsed, df.shape[0]))
+            self.status = 'updated'
+            self._write(self.frame_path, pickle.dumps(df))
+            self._write(self.csv_path, r.content)
+        meta.update(url=self.url, sha1=digest, etag=r.headers.get('ETag', meta.get('etag')),
+                    last_modified=r.headers.get('Last-Modified', meta.get('last_modified')))
+        self._write(self.meta_path, json.dumps(meta, indent=4).encode())
+        return df
+
+
+def nflverse_games(mirror_dir: str, url: str = nflverse_games_url) -> Mirror:
+    """
+    Mirror of the nflverse games, parsed the same way by every reader (EDA / modeling and the box score downloader) so
+    they share one mirror
+    """
+    return Mirror(url, mirror_dir, parse_dates=['gameday'], dtype=nflverse_games_dtypes)
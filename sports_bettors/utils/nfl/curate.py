@@ -1,183 +1,314 @@
 import os
 import re
-import json
+from functools import lru_cache
 
 import pandas as pd
 import numpy as np
 from tqdm import tqdm
 
+from sports_bettors.utils.manifest import Manifest
+from sports_bettors.utils.nfl.raw import iter_games, count_games, game_ranges, convert_raw_dir
+from sports_bettors.utils.reshape import team_perspective
 from config import Config, logger
 
 
-def curate_nfl():
-    save_dir = os.path.join(Config.DATA_DIR, 'sports_bettors', 'curated', 'nfl')
-    if not os.path.exists(save_dir):
-        os.makedirs(save_dir)
-
-    # Remove spaces, dashes from feature labels
-    def _clean_label(l):
-        return re.sub('\.', '', re.sub(' ', '', re.sub('-', '', l)))
-
-    curation = []
-    logger.info('Importing NFL Data to Pandas')
-    for team in tqdm([fn for fn in os.listdir(os.path.join(Config.DATA_DIR, 'sports_bettors', 'raw', 'nfl'))
-                      if '_raw' in fn]):
-        with open(os.path.join(Config.DATA_DIR, 'sports_bettors', 'raw', 'nfl', team)) as fp:
-            team_data = json.load(fp)
-
-        # Iterate through dates for team
-        for date, game_data in team_data.items():
-            # Save date information of game
-            curated = {'year': pd.Timestamp(date).year, 'month': pd.Timestamp(date).month,
-                       'day': pd.Timestamp(date).day, 'away_team': game_data['teams'][0],
-                       'home_team': game_data['teams'][1]}
-
-            # Wrangle features for home team
-            home_features = ['home_' + _clean_label(feature) for feature in game_data['features']]
-            home_vals = [val[0] for val in game_data['values']]
-            curated.update({label: val for label, val in zip(home_features, home_vals)})
-
-            # Wrangle features for away team
-            away_features = ['away_' + _clean_label(feature) for feature in game_data['features']]
-            away_vals = [val[1] for val in game_data['values']]
-            curated.update({label: val for label, val in zip(away_features, away_vals)})
-
-            # Wrangle home points
-            score_labels = ['pts_Q1', 'pts_Q2', 'pts_Q3', 'pts_Q4', 'points']
-            home_score_labels = ['home_' + label for label in score_labels]
-            home_scores = [val for val in game_data['quarter_values'][0][2:6] + [game_data['quarter_values'][0][-1]]]
-            curated.update({label: val for label, val in zip(home_score_labels, home_scores)})
-
-            # Wrangle away points
-            away_score_labels = ['away_' + label for label in score_labels]
-            away_scores = [val for val in game_data['quarter_values'][1][2:6] + [game_data['quarter_values'][1][-1]]]
-            curated.update({label: val for label, val in zip(away_score_labels, away_scores)})
-
-            # Gather
-            curation.append(curated)
-    df_curation = pd.DataFrame.from_records(curation).drop_duplicates()
-    logger.info('Saving Curation with shape: {}'.format(df_curation.shape))
-    df_curation.to_csv(os.path.join(save_dir, 'df_stats.csv'), index=False)
-
-    # Clean up fields
-    def _dash_curate(stat: str, idx: int):
-        stat = re.sub('--', '-', stat)
-        try:
-            return int(float(stat.split('-')[idx])) if len(stat) > 2 else np.nan
-        except Exception as err:
-            logger.info('{}: {}'.format(stat, err))
-            return np.nan
+# Dash-separated composite stats and the fields they are split into, e.g. Cmp-Att-Yd-TD-INT
+composite_stats = {
+    'CmpAttYdTDINT': ['passCompletions', 'passAttempts', 'passYards', 'passTDs', 'interceptions'],
+    'RushYdsTDs': ['rushAttempts', 'rushYards', 'rushTDs'],
+    'FourthDownConv': ['fourthDownConversions', 'fourthDownAttempts'],
+    'FumblesLost': ['fumbles', 'fumblesLost'],
+    'PenaltiesYards': ['penalties', 'penaltyYards'],
+    'SackedYards': ['sacks', 'sackedYards'],
+    'ThirdDownConv': ['thirdDownConversions', 'thirdDownAttempts'],
+}
+# Missing values to fill before splitting
+composite_fills = {'FourthDownConv': '0-0', 'ThirdDownConv': '0-0'}
+# Identify a team's game, a game is in the curated data once per team
+game_keys = ['year', 'month', 'day', 'team', 'opponent']
+# Identify a game in the raw stats (df_stats.csv), once per game
+stats_keys = ['year', 'month', 'day', 'away_team', 'home_team']
+# Raw games to curate at once, bounds memory while a week of new games is parsed in one go
+batch_games = 5000
+# Fields that weren't recorded before a given year
+year_masks = {
+    'possessionTime': 1983,
+    'fourthDownConversions': 1991,
+    'fourthDownAttempts': 1991,
+    'thirdDownConversions': 1991,
+    'thirdDownAttempts': 1991,
+}
 
+
+def split_dash_stat(stat: pd.Series, n: int) -> pd.DataFrame:
+    """
+    Split a dash-separated stat into n integer columns in one pass, nan where a part is missing or not a number
+    """
+    # Negative values show up as a double dash (e.g. 3-10--5-0-0)
+    stat = stat.str.replace('--', '-', regex=False)
+    parts = stat.str.split('-', expand=True).reindex(columns=range(n))
+    parts = np.trunc(parts.apply(pd.to_numeric, errors='coerce'))
+    parts[~(stat.str.len() > 2)] = np.nan
+    # Integer columns unless something failed to parse
+    return parts.apply(lambda col: col if col.isna().any() else col.astype(int))
+
+
+def parse_composite_stats(df: pd.DataFrame, home_away: str) -> pd.DataFrame:
+    """
+    Replace the composite stat columns for one side of the game with their component fields
+    """
+    def _stat(col: str) -> pd.Series:
+        # A batch of old games may not have a stat at all, or only missing values
+        return df[col].astype(object) if col in df.columns else pd.Series(np.nan, index=df.index, dtype=object)
+
+    for composite, fields in composite_stats.items():
+        col = home_away + '_' + composite
+        stat = _stat(col).fillna(composite_fills[composite]) if composite in composite_fills else _stat(col)
+        parts = split_dash_stat(stat, len(fields))
+        for idx, field in enumerate(fields):
+            df[home_away + '_' + field] = parts[idx]
+        df = df.drop(col, axis=1, errors='ignore')
+
+    # Possession Time as minutes
+    col = home_away + '_TimeofPossession'
+    stat = _stat(col).fillna('00:00')
+    parts = stat.str.split(':', expand=True).reindex(columns=range(2)).apply(pd.to_numeric, errors='coerce')
+    df[home_away + '_possessionTime'] = (parts[0] + parts[1] / 60).where(stat.str.len() > 4)
+    df = df.drop(col, axis=1, errors='ignore')
+
+    # Convert back to NA
+    for field, year in year_masks.items():
+        df[home_away + '_' + field] = df[home_away + '_' + field].where(df['year'] > year)
+    return df
+
+
+# Remove spaces, dashes from feature labels, the same few labels repeat in every game
+@lru_cache(maxsize=None)
+def _clean_label(l):
+    return re.sub('\.', '', re.sub(' ', '', re.sub('-', '', l)))
+
+
+def curate_game(date: str, game_data: dict) -> dict:
+    """
+    Flatten a single raw box score into one row of home / away features
+    """
+    # Save date information of game
+    game_date = pd.Timestamp(date)
+    curated = {'year': game_date.year, 'month': game_date.month, 'day': game_date.day,
+               'away_team': game_data['teams'][0], 'home_team': game_data['teams'][1]}
+
+    # Wrangle features for home team
+    home_features = ['home_' + _clean_label(feature) for feature in game_data['features']]
+    home_vals = [val[0] for val in game_data['values']]
+    curated.update({label: val for label, val in zip(home_features, home_vals)})
+
+    # Wrangle features for away team
+    away_features = ['away_' + _clean_label(feature) for feature in game_data['features']]
+    away_vals = [val[1] for val in game_data['values']]
+    curated.update({label: val for label, val in zip(away_features, away_vals)})
+
+    # Wrangle home points
+    score_labels = ['pts_Q1', 'pts_Q2', 'pts_Q3', 'pts_Q4', 'points']
+    home_score_labels = ['home_' + label for label in score_labels]
+    home_scores = [val for val in game_data['quarter_values'][0][2:6] + [game_data['quarter_values'][0][-1]]]
+    curated.update({label: val for label, val in zip(home_score_labels, home_scores)})
+
+    # Wrangle away points
+    away_score_labels = ['away_' + label for label in score_labels]
+    away_scores = [val for val in game_data['quarter_values'][1][2:6] + [game_data['quarter_values'][1][-1]]]
+    curated.update({label: val for label, val in zip(away_score_labels, away_scores)})
+    return curated
+
+
+def curate_raw_file(path: str, start: int = 0, end: int = None) -> pd.DataFrame:
+    """
+    Curated rows for every game in one team's raw file, or for the games between byte offsets start and end.
+
+    Games are streamed from the file into columns sized to the number of games, rather than collecting a dict per
+    game, so memory is bounded by the curated columns of the games read.
+    """
+    n_games = count_games(path, start, end)
+    columns = {}
+    n_read = 0
+    for idx, (date, game_data) in enumerate(iter_games(path, start, end)):
+        for col, val in curate_game(date, game_data).items():
+            if col not in columns:
+                # Features missing from a game (e.g. not tracked that season) stay nan
+                columns[col] = np.full(n_games, np.nan, dtype=object)
+            columns[col][idx] = val
+        n_read = idx + 1
+    return pd.DataFrame(columns).iloc[:n_read].infer_objects()
+
+
+def curate_games(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Split the composite stats of home / away rows and reshape them to team / opponent rows
+    """
     for home_away in ['home', 'away']:
-        # Clean up passing stats
-        df_curation[home_away + '_passCompletions'] = df_curation[home_away + '_CmpAttYdTDINT'].apply(
-            lambda stat: _dash_curate(stat, 0))
-        df_curation[home_away + '_passAttempts'] = df_curation[home_away + '_CmpAttYdTDINT'].apply(
-            lambda stat: _dash_curate(stat, 1))
-        df_curation[home_away + '_passYards'] = df_curation[home_away + '_CmpAttYdTDINT'].apply(
-            lambda stat: _dash_curate(stat, 2))
-        df_curation[home_away + '_passTDs'] = df_curation[home_away + '_CmpAttYdTDINT'].apply(
-            lambda stat: _dash_curate(stat, 3))
-        df_curation[home_away + '_interceptions'] = df_curation[home_away + '_CmpAttYdTDINT'].apply(
-            lambda stat: _dash_curate(stat, 4))
-        df_curation = df_curation.drop(home_away + '_CmpAttYdTDINT', axis=1)
-
-        # Clean up rushing stats
-        df_curation[home_away + '_rushAttempts'] = df_curation[home_away + '_RushYdsTDs'].apply(
-            lambda stat: _dash_curate(stat, 0))
-        df_curation[home_away + '_rushYards'] = df_curation[home_away + '_RushYdsTDs'].apply(
-            lambda stat: _dash_curate(stat, 1))
-        df_curation[home_away + '_rushTDs'] = df_curation[home_away + '_RushYdsTDs'].apply(
-            lambda stat: _dash_curate(stat, 2))
-        df_curation = df_curation.drop(home_away + '_RushYdsTDs', axis=1)
-
-        # Fourth Down
-        df_curation[home_away + '_FourthDownConv'] = df_curation[home_away + '_FourthDownConv'].fillna('0-0')
-        df_curation[home_away + '_fourthDownConversions'] = df_curation[home_away + '_FourthDownConv'].apply(
-            lambda stat: _dash_curate(stat, 0))
-        df_curation[home_away + '_fourthDownAttempts'] = df_curation[home_away + '_FourthDownConv'].apply(
-            lambda stat: _dash_curate(stat, 1))
-        df_curation = df_curation.drop(home_away + '_FourthDownConv', axis=1)
-
-        # Fumbles Lost
-        df_curation[home_away + '_fumbles'] = df_curation[home_away + '_FumblesLost'].apply(
-            lambda stat: _dash_curate(stat, 0))
-        df_curation[home_away + '_fumblesLost'] = df_curation[home_away + '_FumblesLost'].apply(
-            lambda stat: _dash_curate(stat, 1))
-        df_curation = df_curation.drop(home_away + '_FumblesLost', axis=1)
-
-        # Clean up penalties
-        df_curation[home_away + '_penalties'] = df_curation[home_away + '_PenaltiesYards'].apply(
-            lambda stat: _dash_curate(stat, 0))
-        df_curation[home_away + '_penaltyYards'] = df_curation[home_away + '_PenaltiesYards'].apply(
-            lambda stat: _dash_curate(stat, 1))
-        df_curation = df_curation.drop(home_away + '_PenaltiesYards', axis=1)
-
-        # Clean up sacks
-        df_curation[home_away + '_sacks'] = df_curation[home_away + '_SackedYards'].apply(
-            lambda stat: _dash_curate(stat, 0))
-        df_curation[home_away + '_sackedYards'] = df_curation[home_away + '_SackedYards'].apply(
-            lambda stat: _dash_curate(stat, 1))
-        df_curation = df_curation.drop(home_away + '_SackedYards', axis=1)
-
-        # Third Down
-        df_curation[home_away + '_ThirdDownConv'] = df_curation[home_away + '_ThirdDownConv'].fillna('0-0')
-        df_curation[home_away + '_thirdDownConversions'] = df_curation[home_away + '_ThirdDownConv'].apply(
-            lambda stat: _dash_curate(stat, 0))
-        df_curation[home_away + '_thirdDownAttempts'] = df_curation[home_away + '_ThirdDownConv'].apply(
-            lambda stat: _dash_curate(stat, 1))
-        df_curation = df_curation.drop(home_away + '_ThirdDownConv', axis=1)
-
-        # Possession Time
-        df_curation[home_away + '_TimeofPossession'] = df_curation[home_away + '_TimeofPossession'].fillna('00:00')
-        df_curation[home_away + '_possessionTime'] = df_curation[home_away + '_TimeofPossession'].apply(
-            lambda stat: float(stat.split(':')[0]) + float(stat.split(':')[1]) / 60 if len(stat) > 4 else np.nan)
-        df_curation = df_curation.drop(home_away + '_TimeofPossession', axis=1)
-
-        # Convert back to NA
-        df_curation[home_away + '_possessionTime'] = df_curation.apply(
-            lambda row: row[home_away + '_possessionTime'] if row['year'] > 1983 else np.nan, axis=1
-        )
-        df_curation[home_away + '_fourthDownConversions'] = df_curation.apply(
-            lambda row: row[home_away + '_fourthDownConversions'] if row['year'] > 1991 else np.nan, axis=1
-        )
-        df_curation[home_away + '_fourthDownAttempts'] = df_curation.apply(
-            lambda row: row[home_away + '_fourthDownAttempts'] if row['year'] > 1991 else np.nan, axis=1
-        )
-        df_curation[home_away + '_thirdDownConversions'] = df_curation.apply(
-            lambda row: row[home_away + '_thirdDownConversions'] if row['year'] > 1991 else np.nan, axis=1
-        )
-        df_curation[home_away + '_thirdDownAttempts'] = df_curation.apply(
-            lambda row: row[home_away + '_thirdDownAttempts'] if row['year'] > 1991 else np.nan, axis=1
-        )
-
-    # Wrangle from home / away to team / opponent
-    df_modeling = []
-    all_teams = set(list(df_curation['home_team']) + list(df_curation['away_team']))
-    for team in tqdm(all_teams):
-        # Games where team is home
-        df_home = df_curation[df_curation['home_team'] == team].copy()
-        df_home['team'] = team
-        df_home['is_home'] = 1
-        df_home['opponent'] = df_home['away_team']
-        df_home = df_home.drop(['home_team', 'away_team'], axis=1)
-        df_home.columns = [re.sub('away_', 'opp_', re.sub('home_', '', col)) for col in df_home.columns]
-        df_modeling.append(df_home)
-
-        # Games where team is away
-        df_away = df_curation[df_curation['away_team'] == team].copy()
-        df_away['team'] = team
-        df_away['is_home'] = 0
-        df_away['opponent'] = df_away['home_team']
-        df_away = df_away.drop(['home_team', 'away_team'], axis=1)
-        df_away.columns = [re.sub('home_', 'opp_', re.sub('away_', '', col)) for col in df_away.columns]
-        df_modeling.append(df_away)
-    df_modeling = pd.concat(df_modeling, sort=True).drop_duplicates().reset_index(drop=True)
-
-    # Matchup
-    def _define_matchup(main_team, opponent):
-        return '_vs_'.join(sorted([main_team, opponent]))
-    df_modeling['matchup'] = df_modeling.apply(lambda row: _define_matchup(row['team'], row['opponent']), axis=1)
-
-    logger.info('Save Curated data for {} games.'.format(df_modeling.shape[0]))
-    df_modeling.to_csv(os.path.join(Config.DATA_DIR, 'sports_bettors', 'curated', 'nfl', 'df_curated.csv'), index=False)
+        df = parse_composite_stats(df, home_away)
+    return team_perspective(df)
+
+
+def _keys(df: pd.DataFrame, keys: list = game_keys) -> np.ndarray:
+    # 8 byte hashes of the game keys, a fraction of the memory of the keys themselves for every curated game
+    return np.fromiter((hash(key) for key in zip(*[df[col] for col in keys])), dtype=np.int64, count=df.shape[0])
+
+
+def _append_csv(df: pd.DataFrame, path: str) -> bool:
+    """
+    Append rows to a csv in the order of its columns, False if the rows have columns the csv doesn't
+    """
+    if not os.path.exists(path):
+        df.to_csv(path, index=False)
+        return True
+    columns = list(pd.read_csv(path, nrows=0).columns)
+    if not set(df.columns).issubset(columns):
+        return False
+    df.reindex(columns=columns).to_csv(path, mode='a', header=False, index=False)
+    return True
+
+
+def _append_part(df: pd.DataFrame, path: str):
+    if not _append_csv(df, path):
+        # New stats for this team, rewrite its part with the new columns
+        df_part = pd.concat([pd.read_csv(path), df], sort=False)
+        df_part.to_csv(path + '.tmp', index=False)
+        os.replace(path + '.tmp', path)
+
+
+def _assemble(part_paths: list, path: str, keys: list = game_keys):
+    """
+    Write the rows of every part to path, reading them in chunks and keeping the first row of each game
+    """
+    columns = []
+    for part_path in part_paths:
+        columns += [col for col in pd.read_csv(part_path, nrows=0).columns if col not in columns]
+    seen = np.empty(0, dtype=np.int64)
+    tmp_path = path + '.tmp'
+    pd.DataFrame(columns=columns).to_csv(tmp_path, index=False)
+    for part_path in part_paths:
+        for df_part in pd.read_csv(part_path, chunksize=batch_games):
+            df_part = df_part.drop_duplicates(subset=keys)
+            part_keys = _keys(df_part, keys)
+            new = ~np.isin(part_keys, seen)
+            seen = np.concatenate([seen, part_keys[new]])
+            df_part = df_part[new]
+            df_part.reindex(columns=columns).to_csv(tmp_path, mode='a', header=False, index=False)
+    os.replace(tmp_path, path)
+
+
+def curate_nfl(overwrite: bool = False, raw_dir: str = None, save_dir: str = None):
+    """
+    Curate raw NFL box scores for modeling.
+
+    Raw files are append-only, so the manifest records how many bytes of each have been curated along with their
+    hash. A rerun only curates the games appended since, adding their home / away stats to the team's stats part and
+    df_stats.csv, and their curated rows to the team's part and df_curated.csv. Parts of raw files that were rewritten
+    are curated again, and together with removed files (or with `overwrite`) both are then reassembled from the parts.
+
+    Memory is bounded by `batch_games` games at a time, plus the keys of the curated games to skip duplicates.
+    """
+    raw_dir = os.path.join(Config.DATA_DIR, 'sports_bettors', 'raw', 'nfl') if raw_dir is None else raw_dir
+    save_dir = os.path.join(Config.DATA_DIR, 'sports_bettors', 'curated', 'nfl') if save_dir is None else save_dir
+    parts_dir = os.path.join(save_dir, 'parts')
+    if not os.path.exists(parts_dir):
+        os.makedirs(parts_dir)
+    curated_path = os.path.join(save_dir, 'df_curated.csv')
+    stats_path = os.path.join(save_dir, 'df_stats.csv')
+    manifest = Manifest(os.path.join(save_dir, 'manifest.json'))
+
+    convert_raw_dir(raw_dir)
+    # Not the leftovers of an interrupted rewrite ({team}_raw.jsonl.tmp)
+    raw_files = sorted(fn for fn in os.listdir(raw_dir) if fn.endswith('_raw.jsonl'))
+    # Drop parts of raw files that no longer exist
+    stale = [fn for fn in manifest.keys() if fn not in raw_files]
+    for fn in stale:
+        for part in [manifest.get(fn).get('part'), manifest.get(fn).get('stats_part')]:
+            if part is not None and os.path.exists(os.path.join(parts_dir, part)):
+                os.remove(os.path.join(parts_dir, part))
+        manifest.remove(fn)
+    rebuild = overwrite or len(stale) > 0 or not os.path.exists(curated_path) or not os.path.exists(stats_path)
+
+    # Byte range of each raw file to curate
+    todo = []
+    for fn in raw_files:
+        path = os.path.join(raw_dir, fn)
+        size = os.path.getsize(path)
+        entry = manifest.get(fn)
+        if entry is None:
+            todo.append((fn, 0, size))
+        elif overwrite or 'offset' not in entry or 'stats_part' not in entry or size < entry['offset'] or \
+                not all(os.path.exists(os.path.join(parts_dir, entry[part])) for part in ['part', 'stats_part']) or \
+                Manifest.file_hash(path, entry['offset']) != entry['sha1']:
+            # Not just appended to since it was curated, its rows may have changed
+            todo.append((fn, 0, size))
+            rebuild = True
+        elif size > entry['offset']:
+            todo.append((fn, entry['offset'], size))
+    logger.info('{} of {} raw files have new games, {} removed'.format(len(todo), len(raw_files), len(stale)))
+    if len(todo) == 0 and not rebuild:
+        logger.info('Curated NFL data is up to date.')
+        return
+
+    # A long history is curated a batch at a time
+    todo = [(fn, range_start, range_end) for fn, start, end in todo
+            for range_start, range_end in game_ranges(os.path.join(raw_dir, fn), start, end, batch_games)]
+
+    # Games already curated, new rows of the same game from another team's file are skipped
+    curated = _keys(pd.read_csv(curated_path, usecols=game_keys)) if not rebuild else None
+    curated_stats = _keys(pd.read_csv(stats_path, usecols=stats_keys), stats_keys) if not rebuild else None
+    logger.info('Curating new NFL games')
+    batch, n_games = [], 0
+    for idx, (fn, start, end) in enumerate(tqdm(todo)):
+        entry = manifest.get(fn) or {}
+        if start == 0:
+            for old_part in {os.path.splitext(fn)[0] + '.csv', os.path.splitext(fn)[0] + '_stats.csv',
+                             entry.get('part'), entry.get('stats_part')}:
+                if old_part is not None and os.path.exists(os.path.join(parts_dir, old_part)):
+                    os.remove(os.path.join(parts_dir, old_part))
+        df_raw = curate_raw_file(os.path.join(raw_dir, fn), start, end)
+        n_games += df_raw.shape[0]
+        batch.append((fn, start, end, df_raw.assign(batch_idx=len(batch))))
+        if sum(df.shape[0] for *_, df in batch) < batch_games and idx < len(todo) - 1:
+            continue
+
+        # Parse and reshape the games of several files at once, a few games per file are dwarfed by pandas' overhead
+        df_batch = pd.concat([df for *_, df in batch], sort=False)
+        df_batch = curate_games(df_batch) if df_batch.shape[0] > 0 else pd.DataFrame(columns=game_keys + ['batch_idx'])
+        for batch_idx, (fn, start, end, df_raw) in enumerate(batch):
+            entry = manifest.get(fn) or {}
+            part = os.path.splitext(fn)[0] + '.csv'
+            stats_part = os.path.splitext(fn)[0] + '_stats.csv'
+            _append_part(df_batch[df_batch['batch_idx'] == batch_idx].drop('batch_idx', axis=1),
+                         os.path.join(parts_dir, part))
+            _append_part(df_raw.drop('batch_idx', axis=1) if df_raw.shape[0] > 0 else pd.DataFrame(columns=stats_keys),
+                         os.path.join(parts_dir, stats_part))
+            rows = df_raw.shape[0] + (entry.get('rows', 0) if start > 0 else 0)
+            manifest.update(fn, Manifest.file_hash(os.path.join(raw_dir, fn), end), offset=end, part=part,
+                            stats_part=stats_part, rows=rows)
+        if not rebuild and df_batch.shape[0] > 0:
+            df_stats = pd.concat([df for *_, df in batch], sort=False).drop('batch_idx', axis=1).\
+                drop_duplicates(subset=stats_keys)
+            keys = _keys(df_stats, stats_keys)
+            new = ~np.isin(keys, curated_stats)
+            curated_stats = np.concatenate([curated_stats, keys[new]])
+            df_stats = df_stats[new]
+            rebuild = df_stats.shape[0] > 0 and not _append_csv(df_stats, stats_path)
+        if not rebuild:
+            df_new = df_batch.drop('batch_idx', axis=1).drop_duplicates(subset=game_keys)
+            keys = _keys(df_new)
+            new = ~np.isin(keys, curated)
+            curated = np.concatenate([curated, keys[new]])
+            df_new = df_new[new]
+            # New stats reassemble df_curated.csv with the new columns once every part is current
+            rebuild = df_new.shape[0] > 0 and not _append_csv(df_new, curated_path)
+        # Save as we go so an interrupted run keeps the games it finished
+        manifest.save()
+        batch = []
+
+    manifest.save()
+    if rebuild:
+        _assemble([os.path.join(parts_dir, manifest.get(fn)['stats_part']) for fn in raw_files], stats_path,
+                  stats_keys)
+        _assemble([os.path.join(parts_dir, manifest.get(fn)['part']) for fn in raw_files], curated_path)
+    logger.info('Curated {} new games{}.'.format(n_games, ', reassembled the curated data' if rebuild else ''))
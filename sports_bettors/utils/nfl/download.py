@@ -1,14 +1,14 @@
 import os
-import re
 import json
 
-from urllib.request import urlopen
-from bs4 import BeautifulSoup
 import pandas as pd
 
 from tqdm import tqdm
-from datetime import datetime
 
+from sports_bettors.utils.mirror import nflverse_games, nflverse_games_url
+from sports_bettors.utils.scraper import Scraper
+from sports_bettors.utils.nfl.parse import parse_boxscore
+from sports_bettors.utils.nfl.raw import raw_path, iter_games, append_games, write_games, convert_raw_dir
 from config import Config, logger
 
 
@@ -18,107 +18,116 @@ class DownloadNFLData(object):
                   'kan', 'mia', 'min', 'nor', 'nwe', 'nyg', 'nyj', 'oti', 'phi', 'pit', 'rai', 'ram', 'rav', 'sdg',
                   'sea', 'sfo', 'tam', 'was']
 
-    # Dates to download
-    dates = [datetime.strftime(d, '%Y%m%d') for d in pd.date_range(start='01-01-2010', end='01-01-2020', freq='1D')
-             if d.month in [9, 10, 11, 12, 1, 2] and d.dayofweek in [6, 0, 3, 5]]
+    # Window of games to download
+    min_date = '2010-01-01'
+    max_date = '2020-01-01'
+
+    # Schedule to derive box score urls from, the nflverse games mirror that EDA and modeling also read
+    schedule_url = nflverse_games_url
+    mirror_dir = os.path.join(Config.DATA_DIR, 'sports_bettors', 'cache', 'nfl', 'mirror')
 
     # URL to Format
     base_url = "https://www.pro-football-reference.com/boxscores/{}0{}.htm"
 
-    def __init__(self, save_dir: str = None, overwrite: bool = False):
+    def __init__(self, save_dir: str = None, overwrite: bool = False, mirror_dir: str = None,
+                 max_workers: int = 4, min_interval: float = 3.):
         self.save_dir = os.path.join(Config.DATA_DIR, 'sports_bettors', 'raw', 'nfl') if save_dir is None else save_dir
         self.overwrite = overwrite
+        self.mirror_dir = self.mirror_dir if mirror_dir is None else mirror_dir
         if not os.path.exists(self.save_dir):
             os.makedirs(self.save_dir)
-
-    def download_stats(self):
+        # Raw pages and known-missing urls are cached outside of the raw directory that curation reads
+        self.scraper = Scraper(
+            cache_dir=os.path.join(Config.DATA_DIR, 'sports_bettors', 'cache', 'nfl', 'scraper'),
+            max_workers=max_workers,
+            min_interval=min_interval
+        )
+
+    def schedule(self) -> pd.DataFrame:
         """
-        Download raw data scraped from pro-football-reference
+        Played games in the download window as (team, date) where team is the home team's pro-football-reference code
         """
-        # Skip teams if overwrite selected
-        downloaded_teams = [fn[:3] for fn in os.listdir(os.path.join(self.save_dir))] if not self.overwrite else []
-        teams = [team for team in self.team_codes if team not in downloaded_teams]
-
-        def _uncomment_html(content: str):
-            return re.sub('<!--', '', re.sub('-->', '', content))
+        # Revalidated with upstream, so new seasons and scores show up
+        df = nflverse_games(self.mirror_dir, url=self.schedule_url).load()[['gameday', 'away_score', 'pfr']]
+
+        # Played games with a box score id (e.g. 201009120chi) in the window
+        df = df[
+            (~df['away_score'].isna())
+            &
+            (~df['pfr'].isna())
+            &
+            (df['gameday'] >= pd.Timestamp(self.min_date))
+            &
+            (df['gameday'] < pd.Timestamp(self.max_date))
+        ]
+        df = pd.DataFrame({'team': df['pfr'].str[-3:], 'date': df['pfr'].str[:8]})
+        return df[df['team'].isin(self.team_codes)].sort_values(['team', 'date']).reset_index(drop=True)
+
+    @staticmethod
+    def parse(html: bytes) -> dict:
+        """
+        Parse the quarter scores and team stats out of a box score page
+        """
+        result = parse_boxscore(html)
+        quarter_headers, quarter_values = result['quarter_headers'], result['quarter_values']
+        teams, features, values = result['teams'], result['features'], result['values']
 
-        for team in tqdm(teams):
-            results_team, failed_urls, unparsed = {}, [], []
-            for date in tqdm(self.dates):
-                url = self.base_url.format(date, team)
+        # Log errors
+        if any([len(quarter_headers) < 1, len(quarter_values) < 1, len(teams) < 1, len(features) < 1,
+                len(values) < 1]):
+            logger.info('Quarter Headers: {}'.format(len(quarter_headers)))
+            logger.info('Quarter Values: {}'.format(len(quarter_values)))
+            logger.info('Teams: {}'.format(len(teams)))
+            logger.info('Features: {}'.format(len(features)))
+            logger.info('Values: {}'.format(len(values)))
 
-                # Open url and parse
-                try:
-                    html = urlopen(url, timeout=10).read()
-                    soup = BeautifulSoup(html, features='lxml')
-                except Exception as err:
-                    failed_urls.append(url)
-                    continue
+        return result
 
-                # Parse output
+    def download_stats(self):
+        """
+        Download raw data scraped from pro-football-reference for games in the schedule that aren't saved yet
+        """
+        df_schedule = self.schedule()
+        convert_raw_dir(self.save_dir)
+
+        for team, df_team in tqdm(df_schedule.groupby('team')):
+            # Previously downloaded games for the team, unless overwriting
+            path = raw_path(self.save_dir, team)
+            saved_dates = set()
+            if os.path.exists(path) and not self.overwrite:
+                saved_dates = {date for date, _ in iter_games(path)}
+            urls = {self.base_url.format(date, team): date for date in df_team['date'] if date not in saved_dates}
+            if len(urls) == 0:
+                logger.info('{}: No new games'.format(team))
+                continue
+
+            unparsed = []
+            new_games = {}
+            pages, failed_urls = self.scraper.fetch_many(urls.keys())
+
+            # Parse output
+            for url, html in pages.items():
                 try:
-                    # Get scores by quarter which is the first table in the page
-                    score_tables = soup.findAll('table')[0]
-                    # Get the headers (there is only one head)
-                    quarter_headers = [th.text for th in score_tables.findAll('thead')[0].findAll('th')
-                                       if len(th.text) > 0]
-                    # Get the table body
-                    tbody = score_tables.findAll('tbody')[0]
-                    # Get the data in the table body for every row
-                    quarter_values = [[cell.text for i, cell in enumerate(row.findAll('td'))]
-                                      for row in tbody.findAll('tr')]
-
-                    # Get box score div
-                    all_team = soup.find(id='all_team_stats')
-                    # Uncomment the html so that Beautiful Soup can parse it
-                    soup_box = BeautifulSoup(_uncomment_html(str(all_team)), features='lxml')
-                    # Get the first table
-                    box = soup_box.findAll("table")[0]
-
-                    # Get teams in order of [Away, Home]
-                    teams = [th.text for th in box.findAll('thead')[0].findAll('th') if len(th.text) > 0]
-
-                    # Get box score values
-                    tbody = box.findAll('tbody')[0]
-                    features = [header.text for header in tbody.findAll('th')]
-                    values = [[cell.text for i, cell in enumerate(row.findAll('td'))] for row in tbody.findAll('tr')]
-
-                    # Log errors
-                    if any([len(quarter_headers) < 1, len(quarter_values) < 1, len(teams) < 1, len(features) < 1,
-                            len(values) < 1]):
-                        logger.info('Quarter Headers: {}'.format(len(quarter_headers)))
-                        logger.info('Quarter Values: {}'.format(len(quarter_values)))
-                        logger.info('Teams: {}'.format(len(teams)))
-                        logger.info('Features: {}'.format(len(features)))
-                        logger.info('Values: {}'.format(len(values)))
-
-                    # Gather
-                    result = {
-                        'quarter_headers': quarter_headers,
-                        'quarter_values': quarter_values,
-                        'teams': teams,
-                        'features': features,
-                        'values': values
-                    }
-                    results_team[date] = result
+                    new_games[urls[url]] = self.parse(html)
                 except Exception as err:
                     logger.info(err)
                     logger.info(url)
                     unparsed.append(url)
                     continue
+            # Keep dates in order regardless of the order the pages came back in
+            new_games = {date: new_games[date] for date in sorted(new_games.keys())}
 
             # Log each iteration
-            if len(results_team) > 1:
-                results_dates = [pd.Timestamp(d) for d in results_team.keys()]
-                logger.info('{}: {} First Game'.format(team, min(results_dates)))
-                logger.info('{}: {} Games Returned'.format(team, len(results_dates)))
-                logger.info('{}: {} Unparsed urls'.format(team, len(unparsed)))
-            else:
-                logger.info('{}: Nothing returned'.format(team))
+            logger.info('{}: {} New Games Returned'.format(team, len(new_games)))
+            logger.info('{}: {} Games Saved'.format(team, len(saved_dates) + len(new_games)))
+            logger.info('{}: {} Unparsed urls'.format(team, len(unparsed)))
+            logger.info('{}: {} Failed urls'.format(team, len(failed_urls)))
 
-            # Save
+            # Save, new games are appended one per line
             logger.info('Saving Data for {}'.format(team))
-            with open(os.path.join(self.save_dir, '{}_raw.json'.format(team)), 'w') as fp:
-                json.dump(results_team, fp, indent=4)
+            if self.overwrite:
+                write_games(path, new_games)
+            else:
+                append_games(path, new_games)
             with open(os.path.join(self.save_dir, '{}_failed_urls.json'.format(team)), 'w') as fp:
                 json.dump(failed_urls, fp, indent=4)
@@ -0,0 +1,81 @@
+from io import BytesIO
+from typing import List
+
+from lxml import etree
+from lxml.html import fragment_fromstring
+
+
+def _text(element) -> str:
+    # Text of the element and its descendants, comments excluded (same as BeautifulSoup's .text)
+    return element.xpath('string()')
+
+
+def _first(element, tag: str):
+    return next(element.iter(tag))
+
+
+def _rows(tbody, tag: str = 'td') -> List[List[str]]:
+    return [[_text(cell) for cell in row.iter(tag)] for row in tbody.iter('tr')]
+
+
+def _parse_scores(table) -> dict:
+    """
+    Scores by quarter from the line score table
+    """
+    return {
+        'quarter_headers': [_text(th) for th in _first(table, 'thead').iter('th') if len(_text(th)) > 0],
+        'quarter_values': _rows(_first(table, 'tbody'))
+    }
+
+
+def _parse_team_stats(table) -> dict:
+    """
+    Box score from the team stats table, teams are in order of [Away, Home]
+    """
+    tbody = _first(table, 'tbody')
+    return {
+        'teams': [_text(th) for th in _first(table, 'thead').iter('th') if len(_text(th)) > 0],
+        'features': [_text(th) for th in tbody.iter('th')],
+        'values': _rows(tbody)
+    }
+
+
+def parse_boxscore(html: bytes) -> dict:
+    """
+    Parse a pro-football-reference box score in a single streaming pass.
+
+    Only two tables are needed: the line score, which is the first table in the page, and the team stats, which is
+    shipped inside an html comment in the `all_team_stats` div. The page is parsed until both are found; the comment is
+    parsed on its own rather than uncommenting and re-parsing the div.
+    """
+    scores, team_stats = None, None
+    open_tables, in_team_stats = 0, False
+    for event, element in etree.iterparse(BytesIO(html), events=('start', 'end', 'comment'), html=True):
+        if event == 'comment':
+            if in_team_stats and team_stats is None and element.text is not None and '<table' in element.text:
+                fragment = fragment_fromstring(element.text, create_parent='div')
+                team_stats = _parse_team_stats(_first(fragment, 'table'))
+        elif event == 'start':
+            if element.tag == 'table':
+                open_tables += 1
+            elif element.tag == 'div' and element.get('id') == 'all_team_stats':
+                in_team_stats = True
+        else:
+            if element.tag == 'table':
+                open_tables -= 1
+                if scores is None and open_tables == 0:
+                    scores = _parse_scores(element)
+                elif in_team_stats and team_stats is None:
+                    # Some pages ship the table uncommented
+                    team_stats = _parse_team_stats(element)
+            elif element.tag == 'div' and element.get('id') == 'all_team_stats':
+                in_team_stats = False
+            if open_tables == 0:
+                # Nothing outside of an open table is needed once it has been closed
+                element.clear()
+        if scores is not None and team_stats is not None:
+            break
+
+    if scores is None or team_stats is None:
+        raise ValueError('Box score tables not found')
+    return dict(**scores, **team_stats)
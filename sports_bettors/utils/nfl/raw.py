@@ -0,0 +1,110 @@
+import os
+import json
+from typing import Iterator, List, Optional, Tuple
+
+from sports_bettors.utils.checkpoint import Checkpoint
+from config import logger
+
+
+# Written to a raw directory once its legacy files are converted
+converted_marker = '.converted_jsonl'
+
+
+def raw_path(save_dir: str, team: str) -> str:
+    """
+    Raw box scores for a team, newline-delimited json with one game per line
+    """
+    return os.path.join(save_dir, '{}_raw.jsonl'.format(team))
+
+
+def iter_games(path: str, start: int = 0, end: Optional[int] = None) -> Iterator[Tuple[str, dict]]:
+    """
+    Stream (date, box score) pairs from a raw file without loading the whole file, optionally only the games between
+    byte offsets start and end (e.g. the games appended since the file was last read)
+    """
+    for _, record in Checkpoint(path).read(start, end):
+        record = dict(record)
+        yield record.pop('date'), record
+
+
+def count_games(path: str, start: int = 0, end: Optional[int] = None) -> int:
+    n_games = 0
+    with open(path, 'rb') as fp:
+        fp.seek(start)
+        for line in fp:
+            start += len(line)
+            if end is not None and start > end:
+                break
+            n_games += bool(line.strip())
+    return n_games
+
+
+def game_ranges(path: str, start: int, end: int, n_games: int) -> List[Tuple[int, int]]:
+    """
+    Split the bytes between start and end into ranges of at most n_games games
+    """
+    bounds = [start]
+    with open(path, 'rb') as fp:
+        fp.seek(start)
+        offset, n_read = start, 0
+        for line in fp:
+            offset += len(line)
+            if offset > end:
+                break
+            n_read += bool(line.strip())
+            if n_read == n_games:
+                bounds.append(offset)
+                n_read = 0
+    if bounds[-1] < end:
+        bounds.append(end)
+    return list(zip(bounds[:-1], bounds[1:]))
+
+
+def append_games(path: str, games: dict):
+    """
+    Append box scores, keyed by date, one per line in the order given
+    """
+    checkpoint = Checkpoint(path)
+    for date, game in games.items():
+        checkpoint.append(dict(date=date, **game))
+
+
+def write_games(path: str, games: dict):
+    # Write-then-rename so an interrupted rewrite keeps the previous file
+    tmp_path = path + '.tmp'
+    if os.path.exists(tmp_path):
+        os.remove(tmp_path)
+    append_games(tmp_path, games)
+    os.replace(tmp_path, path)
+
+
+def convert_raw_json(path: str) -> str:
+    """
+    Convert a legacy {team}_raw.json (one json object keyed by date) to newline-delimited json, removing the original
+    """
+    new_path = os.path.splitext(path)[0] + '.jsonl'
+    with open(path) as fp:
+        games = json.load(fp)
+    if os.path.exists(new_path):
+        # Keep games already stored in the new format
+        games.update({date: game for date, game in iter_games(new_path)})
+    write_games(new_path, games)
+    os.remove(path)
+    return new_path
+
+
+def convert_raw_dir(raw_dir: str) -> List[str]:
+    """
+    Convert every legacy raw file in a directory once, returns the converted paths. A marker records that the directory
+    was converted, later calls do nothing
+    """
+    marker_path = os.path.join(raw_dir, converted_marker)
+    if os.path.exists(marker_path):
+        return []
+    converted = []
+    for fn in sorted(os.listdir(raw_dir)):
+        if fn.endswith('_raw.json'):
+            logger.info('Converting {} to newline-delimited json'.format(fn))
+            converted.append(convert_raw_json(os.path.join(raw_dir, fn)))
+    open(marker_path, 'w').close()
+    return converted
@@ -0,0 +1,29 @@
+import re
+
+import pandas as pd
+
+
+def _side(df: pd.DataFrame, side: str, other: str) -> pd.DataFrame:
+    """
+    Games from the perspective of the `side` team, `other` team's fields are prefixed with opp_
+    """
+    df = df.assign(team=df[side + '_team'], is_home=int(side == 'home'), opponent=df[other + '_team']). \
+        drop(['home_team', 'away_team'], axis=1)
+    return df.rename(columns={col: re.sub(other + '_', 'opp_', re.sub(side + '_', '', col)) for col in df.columns})
+
+
+def define_matchup(team: pd.Series, opponent: pd.Series) -> pd.Series:
+    """
+    Order-independent label for the two teams in a game, e.g. CHI_vs_GNB
+    """
+    first = team < opponent
+    return team.where(first, opponent) + '_vs_' + opponent.where(first, team)
+
+
+def team_perspective(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Reshape home / away games to team / opponent, with one row per team in each game
+    """
+    df = pd.concat([_side(df, 'home', 'away'), _side(df, 'away', 'home')], sort=True).reset_index(drop=True)
+    df['matchup'] = define_matchup(df['team'], df['opponent'])
+    return df
@@ -0,0 +1,155 @@
+import os
+import json
+import time
+import hashlib
+import threading
+from urllib.parse import urlparse
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import requests
+from requests.adapters import HTTPAdapter
+from tqdm import tqdm
+
+from config import logger
+
+
+class RateLimiter(object):
+    """
+    Thread-safe limiter that spaces out requests to the same host by at least `min_interval` seconds
+    """
+
+    def __init__(self, min_interval: float = 3.):
+        self.min_interval = min_interval
+        self._lock = threading.Lock()
+        self._next_slot = {}
+
+    def wait(self, host: str):
+        # Reserve the next free slot for this host, then sleep outside of the lock until it arrives
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next_slot.get(host, now))
+            self._next_slot[host] = slot + self.min_interval
+        delay = slot - time.monotonic()
+        if delay > 0:
+            time.sleep(delay)
+
+
+class Scraper(object):
+    """
+    Fetch pages with a bounded pool of workers and a per-host rate limit.
+
+    Raw pages are cached on disk (positive cache) and urls the server reports as missing are remembered (negative
+    cache), so reruns only hit the network for urls that have never been resolved.
+    """
+    # Status codes that mean the page does not exist, as opposed to a transient failure
+    missing_codes = (404, 410)
+
+    def __init__(self, cache_dir: str, max_workers: int = 4, min_interval: float = 3., timeout: float = 10.):
+        self.cache_dir = cache_dir
+        self.html_dir = os.path.join(cache_dir, 'html')
+        if not os.path.exists(self.html_dir):
+            os.makedirs(self.html_dir)
+        self.missing_path = os.path.join(cache_dir, 'missing_urls.json')
+        self.max_workers = max_workers
+        self.timeout = timeout
+        self.rate_limiter = RateLimiter(min_interval)
+
+        # Known-missing urls
+        self.missing = set()
+        if os.path.exists(self.missing_path):
+            with open(self.missing_path) as fp:
+                self.missing = set(json.load(fp))
+        self._lock = threading.Lock()
+
+        # One pooled session shared by the workers
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=max_workers, pool_maxsize=max_workers)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+
+    def _cache_path(self, url: str) -> str:
+        return os.path.join(self.html_dir, hashlib.sha1(url.encode('utf-8')).hexdigest() + '.html')
+
+    def cached(self, url: str) -> Optional[bytes]:
+        """
+        Raw page from the positive cache, if present
+        """
+        path = self._cache_path(url)
+        if not os.path.exists(path):
+            return None
+        with open(path, 'rb') as fp:
+            return fp.read()
+
+    def _save_page(self, url: str, html: bytes):
+        # Write-then-rename so an interrupted run never leaves a truncated page in the cache
+        path = self._cache_path(url)
+        tmp_path = path + '.{}.tmp'.format(threading.get_ident())
+        with open(tmp_path, 'wb') as fp:
+            fp.write(html)
+        os.replace(tmp_path, path)
+
+    def save_missing(self):
+        with self._lock:
+            missing = sorted(self.missing)
+        tmp_path = self.missing_path + '.tmp'
+        with open(tmp_path, 'w') as fp:
+            json.dump(missing, fp, indent=4)
+        os.replace(tmp_path, self.missing_path)
+
+    def _get(self, url: str) -> Tuple[str, Optional[bytes]]:
+        """
+        Fetch a single url, returns a status in ['fetched', 'missing', 'failed'] and the page if fetched
+        """
+        self.rate_limiter.wait(urlparse(url).netloc)
+        try:
+            r = self.session.get(url, timeout=self.timeout)
+        except Exception as err:
+            logger.debug('{}: {}'.format(url, err))
+            return 'failed', None
+
+        if r.status_code in self.missing_codes:
+            with self._lock:
+                self.missing.add(url)
+            return 'missing', None
+        if r.status_code != 200:
+            logger.debug('{}: {}'.format(url, r.status_code))
+            return 'failed', None
+
+        self._save_page(url, r.content)
+        return 'fetched', r.content
+
+    def fetch_many(self, urls: Iterable[str]) -> Tuple[Dict[str, bytes], List[str]]:
+        """
+        Return pages for every url that exists, from cache where possible, and the list of urls that failed
+        """
+        pages, todo = {}, []
+        for url in urls:
+            if url in self.missing:
+                continue
+            html = self.cached(url)
+            if html is not None:
+                pages[url] = html
+            else:
+                todo.append(url)
+        logger.info('{} cached pages, {} known-missing, {} to fetch'.format(
+            len(pages), len(self.missing), len(todo)))
+
+        failed = []
+        if len(todo) == 0:
+            return pages, failed
+        try:
+            with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+                futures = {pool.submit(self._get, url): url for url in todo}
+                for future in tqdm(as_completed(futures), total=len(futures)):
+                    url = futures[future]
+                    status, html = future.result()
+                    if status == 'fetched':
+                        pages[url] = html
+                    elif status == 'failed':
+                        failed.append(url)
+        finally:
+            # Persist the negative cache even if the run is interrupted
+            self.save_missing()
+
+        return pages, failed
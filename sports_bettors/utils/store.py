@@ -0,0 +1,126 @@
+import os
+import json
+import hashlib
+from typing import List, Optional
+
+import pandas as pd
+
+
+class GameStore(object):
+    """
+    Games stored as one csv per league and season, with an index of each partition's date range and columns.
+
+    Queries only read the partitions whose games overlap the requested dates, and only the requested columns of
+    those, so windowed queries don't pay for the full history.
+    """
+    index_file = 'index.json'
+
+    def __init__(self, root_dir: str):
+        self.root_dir = root_dir
+
+    def _league_dir(self, league: str) -> str:
+        return os.path.join(self.root_dir, league)
+
+    def _partition_path(self, league: str, season: int) -> str:
+        return os.path.join(self._league_dir(league), 'season={}.csv'.format(season))
+
+    def index(self, league: str) -> dict:
+        path = os.path.join(self._league_dir(league), self.index_file)
+        if not os.path.exists(path):
+            return {}
+        with open(path) as fp:
+            return json.load(fp)
+
+    def _save_index(self, league: str, index: dict):
+        # Write-then-rename so an interrupted write never leaves a truncated index
+        path = os.path.join(self._league_dir(league), self.index_file)
+        with open(path + '.tmp', 'w') as fp:
+            json.dump(index, fp, indent=4, sort_keys=True)
+        os.replace(path + '.tmp', path)
+
+    def has(self, league: str) -> bool:
+        return len(self.index(league)) > 0
+
+    @staticmethod
+    def season_of(df: pd.DataFrame) -> pd.Series:
+        """
+        Season of each game, games in January / February belong to the previous year's season
+        """
+        if 'season' in df.columns:
+            return df['season'].astype(int)
+        gameday = pd.to_datetime(df['gameday'])
+        return (gameday.dt.year - (gameday.dt.month < 3)).astype(int)
+
+    def write(self, league: str, df: pd.DataFrame) -> List[int]:
+        """
+        Replace the partitions of every season in df, returns the seasons whose games changed
+        """
+        if not os.path.exists(self._league_dir(league)):
+            os.makedirs(self._league_dir(league))
+        index = self.index(league)
+        changed = []
+        for season, df_season in df.groupby(self.season_of(df)):
+            content = df_season.to_csv(index=False).encode()
+            digest = hashlib.sha1(content).hexdigest()
+            if index.get(str(season), {}).get('sha1') == digest:
+                continue
+            path = self._partition_path(league, season)
+            with open(path + '.tmp', 'wb') as fp:
+                fp.write(content)
+            os.replace(path + '.tmp', path)
+            gameday = pd.to_datetime(df_season['gameday'])
+            index[str(season)] = {
+                'sha1': digest,
+                'start': gameday.min().strftime('%Y-%m-%d'),
+                'end': gameday.max().strftime('%Y-%m-%d'),
+                'columns': list(df_season.columns),
+                'n_games': int(df_season.shape[0]),
+            }
+            changed.append(int(season))
+        self._save_index(league, index)
+        return changed
+
+    @staticmethod
+    def _timestamp(date: str, gameday: pd.Series) -> pd.Timestamp:
+        # Comparable with the stored game days, which are timezone-aware for some sources
+        timestamp = pd.Timestamp(date)
+        tz = getattr(gameday.dt, 'tz', None)
+        return timestamp.tz_localize(tz) if tz is not None and timestamp.tz is None else timestamp
+
+    def partitions(self, league: str, start: Optional[str] = None, end: Optional[str] = None) -> List[int]:
+        """
+        Seasons with games between start and end (inclusive)
+        """
+        return sorted(int(season) for season, partition in self.index(league).items()
+                      # Partition dates are days, games on the last one can be later in the day
+                      if (start is None or pd.Timestamp(partition['end']) + pd.Timedelta(days=1) > pd.Timestamp(start))
+                      and (end is None or pd.Timestamp(partition['start']) <= pd.Timestamp(end)))
+
+    def load(self, league: str, start: Optional[str] = None, end: Optional[str] = None,
+             columns: Optional[List[str]] = None, **read_csv_kwargs) -> pd.DataFrame:
+        """
+        Games from start to end (inclusive), with the requested columns of those that exist (all by default)
+        """
+        index = self.index(league)
+        if not index:
+            raise FileNotFoundError('No games stored for {}'.format(league))
+        dfs = []
+        for season in self.partitions(league, start, end):
+            stored = index[str(season)]['columns']
+            # gameday is needed to filter the rows
+            usecols = stored if columns is None else [col for col in stored if col in columns or col == 'gameday']
+            dfs.append(pd.read_csv(self._partition_path(league, season), usecols=usecols, parse_dates=['gameday'],
+                                   **read_csv_kwargs))
+        if not dfs:
+            df = pd.DataFrame(columns=[col for col in index[max(index.keys())]['columns']
+                                       if columns is None or col in columns or col == 'gameday'])
+            df['gameday'] = pd.to_datetime(df['gameday'])
+            return df
+        df = pd.concat(dfs, ignore_index=True)
+        if start is not None:
+            df = df[df['gameday'] >= self._timestamp(start, df['gameday'])]
+        if end is not None:
+            df = df[df['gameday'] <= self._timestamp(end, df['gameday'])]
+        if columns is not None:
+            df = df[[col for col in columns if col in df.columns]]
+        return df.reset_index(drop=True)
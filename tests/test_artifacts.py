@@ -0,0 +1,76 @@
+import os
+import shutil
+import tempfile
+from unittest import TestCase
+
+import pandas as pd
+
+from sports_bettors.analytics.model.artifacts import Artifacts, artifact_key, training_key
+from sports_bettors.analytics.model.model import Model
+
+
+class TestArtifacts(TestCase):
+
+    def setUp(self):
+        # Models make their output directories under the working directory
+        self.cwd = os.getcwd()
+        self.work_dir = tempfile.mkdtemp()
+        os.chdir(self.work_dir)
+        self.model = Model(league='nfl', response='spread')
+        self.df = pd.DataFrame({
+            'gameday': pd.to_datetime(['2023-09-10', '2023-09-17']),
+            'spread_favorite': [3., 6.5],
+            'spread_favorite_actual': [7., -3.]
+        })
+
+    def tearDown(self):
+        os.chdir(self.cwd)
+        shutil.rmtree(self.work_dir)
+
+    def test_artifact_key(self):
+        key = artifact_key(self.model, self.df)
+        self.assertEqual(key, artifact_key(Model(league='nfl', response='spread'), self.df.copy()))
+
+        df = self.df.copy()
+        df.loc[1, 'spread_favorite_actual'] = -4.
+        self.assertNotEqual(key, artifact_key(self.model, df))
+        self.assertNotEqual(key, artifact_key(Model(league='nfl', response='over'), self.df))
+        self.model.param_grid = {**Model.param_grid, 'model__C': [1]}
+        self.assertNotEqual(key, artifact_key(self.model, self.df))
+
+    def test_training_key(self):
+        df = self.df.assign(**{col: 1. for col in self.model.features})
+        key = training_key(self.model, df)
+        # Another day's run on the same training split
+        self.model.TODAY = '2030-01-01'
+        self.assertEqual(key, training_key(self.model, df))
+        self.assertNotEqual(artifact_key(self.model, df), artifact_key(Model(league='nfl', response='spread'), df))
+        # Columns the model isn't fit on don't matter
+        self.assertEqual(key, training_key(self.model, df.assign(spread_favorite_actual_ats=1)))
+        self.assertNotEqual(key, training_key(self.model, df.assign(total_line=2.)))
+
+    def test_model_hit(self):
+        artifacts = Artifacts(self.model)
+        self.assertFalse(artifacts.model_hit('a' * 16))
+        self.model.hyper_params = {'model__C': 1}
+        self.model.save_results()
+        artifacts.record('0' * 16, 'a' * 16)
+        self.assertTrue(Artifacts(self.model).model_hit('a' * 16))
+        self.assertFalse(Artifacts(self.model).model_hit('b' * 16))
+
+        model = Model(league='nfl', response='spread')
+        Artifacts(model).restore()
+        self.assertEqual(model.hyper_params, {'model__C': 1})
+
+    def test_hit(self):
+        artifacts = Artifacts(self.model)
+        key = artifact_key(self.model, self.df)
+        self.assertFalse(artifacts.hit(key))
+        artifacts.record(key, 'a' * 16)
+        # Recorded, but nothing has been saved
+        self.assertFalse(artifacts.hit(key))
+
+        self.model.save_results()
+        open(os.path.join(self.model.save_dir, 'results.json'), 'w').close()
+        self.assertTrue(Artifacts(self.model).hit(key))
+        self.assertFalse(Artifacts(self.model).hit('0' * 16))
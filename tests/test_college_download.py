@@ -0,0 +1,88 @@
+import json
+import shutil
+import tempfile
+import threading
+from unittest import TestCase
+from urllib.parse import urlparse, parse_qs
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+import pandas as pd
+
+from sports_bettors.utils.college_football.download import DownloadCollegeFootballData
+
+
+def _team_stats(game_id: int, home_away: str) -> dict:
+    return {
+        'homeAway': home_away,
+        'stats': [
+            {'category': 'rushingYards', 'stat': str(100 + game_id)},
+            {'category': 'completionAttempts', 'stat': '10-20'},
+            {'category': 'notAFeature', 'stat': '1'},
+        ]
+    }
+
+
+class StatsHandler(BaseHTTPRequestHandler):
+    """
+    Fake games/teams endpoint, game ids in `failing` return a server error
+    """
+    failing = set()
+    requests_seen = []
+
+    def do_GET(self):
+        game_id = int(parse_qs(urlparse(self.path).query)['gameId'][0])
+        StatsHandler.requests_seen.append(game_id)
+        if game_id in self.failing:
+            body, code = b'', 500
+        else:
+            body, code = json.dumps([{'teams': [_team_stats(game_id, 'home'), _team_stats(game_id, 'away')]}]), 200
+            body = body.encode('utf-8')
+        self.send_response(code)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+class TestDownloadStats(TestCase):
+
+    def setUp(self):
+        StatsHandler.failing = {3}
+        StatsHandler.requests_seen = []
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), StatsHandler)
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        self.save_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        self.server.shutdown()
+        self.server.server_close()
+        shutil.rmtree(self.save_dir)
+
+    def _downloader(self) -> DownloadCollegeFootballData:
+        downloader = DownloadCollegeFootballData(save_dir=self.save_dir, max_workers=4, min_interval=0.)
+        downloader.base_url = 'http://127.0.0.1:{}/'.format(self.server.server_address[1])
+        return downloader
+
+    def test_resume_and_retry(self):
+        df_games = pd.DataFrame({'game_id': [1, 2, 3]})
+        df_stats, df_fails = self._downloader().download_stats(df_games)
+        self.assertEqual(sorted(df_stats['game_id']), [1, 2])
+        self.assertEqual(list(df_fails['game_id']), [3])
+        self.assertEqual(df_stats.set_index('game_id').loc[2, 'home_rushingYards'], '102')
+        self.assertNotIn('home_notAFeature', df_stats.columns)
+
+        # Resuming with a new game only requests that game
+        StatsHandler.requests_seen = []
+        df_stats, _ = self._downloader().download_stats(pd.DataFrame({'game_id': [1, 2, 3, 4]}))
+        self.assertEqual(StatsHandler.requests_seen, [4])
+        self.assertEqual(sorted(df_stats['game_id']), [1, 2, 4])
+
+        # Retrying only requests the failure
+        StatsHandler.requests_seen = []
+        StatsHandler.failing = set()
+        df_stats, df_fails = self._downloader().retry_stats()
+        self.assertEqual(StatsHandler.requests_seen, [3])
+        self.assertEqual(sorted(df_stats['game_id']), [1, 2, 3, 4])
+        self.assertEqual(df_fails.shape[0], 0)
@@ -0,0 +1,98 @@
+import os
+import shutil
+import tempfile
+from unittest import TestCase
+
+from sports_bettors.utils.dag import Graph
+
+
+def _value(value: int) -> int:
+    return value
+
+
+def _add(*values: int, fail_if: str = None) -> int:
+    if fail_if is not None and os.path.exists(fail_if):
+        raise ValueError('Failing on purpose')
+    return sum(values)
+
+
+def _record(*values: int, path: str) -> int:
+    with open(path, 'a') as fp:
+        fp.write('{}\n'.format(sum(values)))
+    return sum(values)
+
+
+class TestGraph(TestCase):
+
+    def setUp(self):
+        self.state_dir = tempfile.mkdtemp()
+        self.fail_path = os.path.join(self.state_dir, 'fail')
+        self.record_path = os.path.join(self.state_dir, 'record.txt')
+
+    def tearDown(self):
+        shutil.rmtree(self.state_dir)
+
+    def _graph(self, run_id: str = 'today') -> Graph:
+        graph = Graph(os.path.join(self.state_dir, 'state'), run_id=run_id)
+        graph.add('a', _value, value=1)
+        graph.add('b', _value, value=2)
+        graph.add('first', _record, deps=['a'], path=self.record_path)
+        graph.add('sum', _add, deps=['first', 'b'], fail_if=self.fail_path)
+        graph.add('total', _record, deps=['sum', 'a'], path=os.path.join(self.state_dir, 'total.txt'))
+        return graph
+
+    def _runs(self, path: str) -> int:
+        with open(path) as fp:
+            return len(fp.readlines())
+
+    def test_run(self):
+        for n_workers in [1, 2]:
+            status = self._graph().run(n_workers=n_workers)
+            self.assertEqual(status, {name: 'done' for name in ['a', 'b', 'first', 'sum', 'total']})
+        # State is cleared after a complete run
+        self.assertEqual(os.listdir(os.path.join(self.state_dir, 'state')), [])
+
+    def test_outputs(self):
+        # Nodes get their dependencies' outputs in order: total = (a + b) + a
+        self._graph().run(n_workers=2)
+        with open(os.path.join(self.state_dir, 'total.txt')) as fp:
+            self.assertEqual(fp.read(), '4\n')
+
+    def test_resume(self):
+        open(self.fail_path, 'w').close()
+        with self.assertRaises(RuntimeError) as error:
+            self._graph().run(n_workers=2)
+        self.assertIn('Failed: sum, not run: total', str(error.exception))
+        self.assertFalse(os.path.exists(os.path.join(self.state_dir, 'total.txt')))
+
+        # Resumes from the failed node, without re-running what completed
+        os.remove(self.fail_path)
+        status = self._graph().run()
+        self.assertEqual(status['first'], 'resumed')
+        self.assertEqual(status['sum'], 'done')
+        self.assertEqual(self._runs(self.record_path), 1)
+        self.assertEqual(self._runs(os.path.join(self.state_dir, 'total.txt')), 1)
+
+    def test_new_run(self):
+        open(self.fail_path, 'w').close()
+        with self.assertRaises(RuntimeError):
+            self._graph(run_id='yesterday').run()
+        os.remove(self.fail_path)
+        status = self._graph(run_id='today').run()
+        self.assertEqual(status['first'], 'done')
+        self.assertEqual(self._runs(self.record_path), 2)
+
+    def test_unknown_dependency(self):
+        with self.assertRaises(ValueError):
+            Graph(self.state_dir, run_id='today').add('a', _value, deps=['b'], value=1)
+
+    def test_refresh_graph(self):
+        from sports_bettors.refresh import refresh_graph, leagues, responses
+
+        graph = refresh_graph()
+        for league in leagues:
+            # Every model of a league trains and validates on the one wrangled frame
+            for response in responses:
+                name = '{}_{}'.format(league, response)
+                self.assertEqual(graph.nodes['train_' + name].deps, ['wrangle_' + league])
+                self.assertEqual(graph.nodes['validate_' + name].deps, ['wrangle_' + league, 'train_' + name])
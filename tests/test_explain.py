@@ -0,0 +1,65 @@
+import os
+import shutil
+import importlib.util
+import tempfile
+from unittest import TestCase, mock, skipUnless
+
+import numpy as np
+import pandas as pd
+from sklearn.pipeline import Pipeline
+from sklearn.preprocessing import StandardScaler
+from sklearn.svm import SVR
+
+from sports_bettors.analytics.model.explain import Explainer
+
+
+class FittedModel(object):
+    """
+    Just the attributes of a trained Model that the explainer uses
+    """
+    n_jobs = 2
+
+    def __init__(self, model_dir: str):
+        rng = np.random.default_rng(0)
+        self.features = ['a', 'b', 'c']
+        self.X = pd.DataFrame(rng.normal(0, 1, (200, 3)), columns=self.features)
+        y = 2 * self.X['a'] - self.X['b'] + rng.normal(0, 0.1, 200)
+        self.scaler = StandardScaler().fit(self.X)
+        self.model = Pipeline([('model', SVR())]).fit(self.X, y)
+        self.model_dir = model_dir
+
+
+@skipUnless(importlib.util.find_spec('shap'), 'shap is optional')
+class TestExplainer(TestCase):
+
+    def setUp(self):
+        self.model_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.model_dir)
+
+    def test_kernel_explainer_is_cached(self):
+        model = FittedModel(self.model_dir)
+        explainer = Explainer(model, model.X)
+        shap_values = explainer.shap_values(model.X.head(30))
+        self.assertEqual(shap_values.shape, (30, 3))
+        np.testing.assert_allclose(explainer.expected_value + shap_values.sum(axis=1),
+                                   model.model.predict(model.X.head(30)), atol=1e-4)
+        self.assertEqual(len(os.listdir(os.path.join(self.model_dir, 'shap'))), 1)
+        # Same model version and background reuse the built explainer
+        with mock.patch('shap.kmeans', side_effect=AssertionError('rebuilt')):
+            self.assertEqual(Explainer(model, model.X).expected_value, explainer.expected_value)
+        # Another background builds another one
+        Explainer(model, model.X.head(100))
+        self.assertEqual(len(os.listdir(os.path.join(self.model_dir, 'shap'))), 2)
+
+    def test_one_chunk_per_job(self):
+        model = FittedModel(self.model_dir)
+        explainer = Explainer(model, model.X, n_jobs=2)
+        # In process, so the patched function is what runs on each chunk
+        sequential = mock.Mock(return_value=lambda tasks: [func(*args, **kwargs) for func, args, kwargs in tasks])
+        with mock.patch('sports_bettors.analytics.model.explain.Parallel', sequential), \
+                mock.patch('sports_bettors.analytics.model.explain._kernel_shap_values',
+                           side_effect=lambda _, chunk, __: np.zeros(chunk.shape)) as explain:
+            self.assertEqual(explainer.shap_values(model.X.head(30)).shape, (30, 3))
+        self.assertEqual([call.args[1].shape[0] for call in explain.call_args_list], [15, 15])
@@ -0,0 +1,28 @@
+import os
+import sys
+import subprocess
+from unittest import TestCase
+
+root_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+class TestImports(TestCase):
+    """
+    Console scripts only load heavy optional dependencies on the code paths that use them
+    """
+
+    @staticmethod
+    def imported(module: str, libraries: list) -> list:
+        # A fresh interpreter, this one has already imported everything the other tests use
+        code = 'import sys, {}; print(",".join(lib for lib in {!r} if lib in sys.modules))'.format(module, libraries)
+        proc = subprocess.run([sys.executable, '-c', code], cwd=root_dir, capture_output=True, text=True, check=True)
+        return [lib for lib in proc.stdout.strip().split(',') if lib]
+
+    def test_predict_next_week(self):
+        self.assertEqual(self.imported('sports_bettors.predict', ['shap', 'matplotlib', 'cfbd']), [])
+
+    def test_predict(self):
+        self.assertEqual(self.imported('sports_bettors.api', ['pystan']), [])
+
+    def test_report(self):
+        self.assertEqual(self.imported('sports_bettors.report', ['shap', 'sklearn', 'cfbd']), [])
@@ -0,0 +1,103 @@
+import os
+import json
+import time
+import pstats
+import shutil
+import tempfile
+from unittest import TestCase
+
+import numpy as np
+import pandas as pd
+
+from sports_bettors.utils import instrument
+from sports_bettors.utils.dag import Graph
+
+
+class Stages(object):
+    league = 'nfl'
+
+    @instrument.timed
+    def load(self) -> pd.DataFrame:
+        return self.allocate(pd.DataFrame({'x': range(10)}))
+
+    @instrument.timed
+    def allocate(self, df: pd.DataFrame) -> pd.DataFrame:
+        # 8 MB held until the stage returns
+        block = np.ones(1_000_000)
+        return df[df['x'] < block[:5].sum()]
+
+
+def _sleep(seconds: float) -> float:
+    with instrument.stage('sleep'):
+        time.sleep(seconds)
+    return seconds
+
+
+class TestInstrument(TestCase):
+
+    def setUp(self):
+        self.report_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.report_dir)
+
+    def load_report(self) -> dict:
+        path, = [fn for fn in os.listdir(self.report_dir) if fn.endswith('.json')]
+        with open(os.path.join(self.report_dir, path)) as fp:
+            return json.load(fp)
+
+    def test_not_recording(self):
+        self.assertEqual(Stages().load().shape[0], 5)
+        self.assertIsNone(instrument.active())
+
+    def test_stages(self):
+        with instrument.run_report('test', report_dir=self.report_dir):
+            Stages().load()
+        report = self.load_report()
+        self.assertEqual([record['stage'] for record in report['stages']], ['load', 'load/allocate'])
+        self.assertIsNone(report['stages'][0]['peak_mb'])
+        self.assertGreater(report['stages'][0]['max_rss_mb'], 0)
+
+    def test_trace_memory(self):
+        with instrument.run_report('test', trace_memory=True, report_dir=self.report_dir):
+            Stages().load()
+        report = self.load_report()
+        self.assertEqual(report['status'], 'completed')
+        outer, inner = report['stages']
+        self.assertEqual((outer['stage'], inner['stage']), ('load', 'load/allocate'))
+        self.assertEqual((inner['rows_in'], inner['rows_out'], outer['rows_in']), (10, 5, None))
+        self.assertEqual(inner['league'], 'nfl')
+        # Nested stages count towards the peak of the stages around them
+        self.assertGreaterEqual(inner['peak_mb'], 8)
+        self.assertGreaterEqual(outer['peak_mb'], inner['peak_mb'])
+        self.assertGreaterEqual(report['peak_mb'], outer['peak_mb'])
+
+    def test_failed(self):
+        with self.assertRaises(ValueError):
+            with instrument.run_report('test', report_dir=self.report_dir):
+                with instrument.stage('fails'):
+                    raise ValueError('bad data')
+        report = self.load_report()
+        self.assertEqual(report['status'], 'failed')
+        self.assertEqual(report['stages'][0]['stage'], 'fails')
+        self.assertIsNone(instrument.active())
+
+    def test_profile(self):
+        with instrument.run_report('test', profile=True, report_dir=self.report_dir):
+            _sleep(0.01)
+            _sleep(0.2)
+        report = self.load_report()
+        self.assertEqual(report['profile']['stage'], 'sleep')
+        self.assertGreaterEqual(report['profile']['wall_s'], 0.2)
+        stats = pstats.Stats(report['profile']['path'])
+        self.assertTrue(any('time.sleep' in func[2] for func in stats.stats))
+
+    def test_graph(self):
+        # Stages run in worker processes are merged into the report
+        graph = Graph(os.path.join(self.report_dir, 'state'), run_id='test')
+        graph.add('a', _sleep, seconds=0.01)
+        graph.add('b', _sleep, seconds=0.01)
+        with instrument.run_report('test', report_dir=self.report_dir):
+            graph.run(n_workers=2)
+        stages = sorted(record['stage'] for record in self.load_report()['stages'])
+        self.assertEqual(stages, ['a', 'a/sleep', 'b', 'b/sleep'])
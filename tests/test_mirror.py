@@ -0,0 +1,127 @@
+import io
+import hashlib
+import shutil
+import tempfile
+import threading
+from unittest import TestCase
+from unittest.mock import patch
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+import pandas as pd
+
+from sports_bettors.utils.mirror import Mirror
+from sports_bettors.utils.nfl.download import DownloadNFLData
+from config import Config
+
+
+class GamesHandler(BaseHTTPRequestHandler):
+    """
+    Serves /games.csv with an ETag, answering matching conditional requests with 304
+    """
+    content = b''
+    status_codes = []
+
+    def do_GET(self):
+        etag = '"{}"'.format(hashlib.sha1(self.content).hexdigest())
+        if self.headers.get('If-None-Match') == etag:
+            GamesHandler.status_codes.append(304)
+            self.send_response(304)
+            self.send_header('ETag', etag)
+            self.end_headers()
+            return
+        GamesHandler.status_codes.append(200)
+        self.send_response(200)
+        self.send_header('ETag', etag)
+        self.send_header('Content-Length', str(len(self.content)))
+        self.end_headers()
+        self.wfile.write(self.content)
+
+    def log_message(self, *args):
+        pass
+
+
+class TestMirror(TestCase):
+    games = [
+        'game_id,season,gameday,away_team,away_score,home_team,home_score,spread_line,stadium',
+        '2023_01_DET_KC,2023,2023-09-07,DET,21,KC,20,4.5,"Arrowhead Stadium, KC"',
+        '2023_01_CAR_ATL,2023,2023-09-10,CAR,10,ATL,24,3.5,Mercedes-Benz Stadium',
+        '2023_02_MIN_PHI,2023,2023-09-14,MIN,,PHI,,6.0,Lincoln Financial Field',
+    ]
+
+    def setUp(self):
+        GamesHandler.content = self._content(self.games)
+        GamesHandler.status_codes = []
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), GamesHandler)
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self.thread.start()
+        self.url = 'http://127.0.0.1:{}/games.csv'.format(self.server.server_address[1])
+        self.mirror_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        self.server.shutdown()
+        self.server.server_close()
+        shutil.rmtree(self.mirror_dir)
+
+    @staticmethod
+    def _content(lines) -> bytes:
+        return ('\n'.join(lines) + '\n').encode()
+
+    read_csv_kwargs = {'parse_dates': ['gameday'], 'dtype': {'away_score': 'float64', 'home_score': 'float64'}}
+
+    def _mirror(self, url: str = None) -> Mirror:
+        return Mirror(url or self.url, self.mirror_dir, timeout=2., **self.read_csv_kwargs)
+
+    def _expected(self) -> pd.DataFrame:
+        return pd.read_csv(io.BytesIO(GamesHandler.content), **self.read_csv_kwargs)
+
+    def test_unchanged(self):
+        mirror = self._mirror()
+        pd.testing.assert_frame_equal(mirror.load(), self._expected())
+        self.assertEqual((mirror.status, mirror.n_parsed), ('updated', 3))
+
+        mirror = self._mirror()
+        pd.testing.assert_frame_equal(mirror.load(), self._expected())
+        self.assertEqual((mirror.status, mirror.n_parsed), ('unchanged', 0))
+        self.assertEqual(GamesHandler.status_codes, [200, 304])
+
+    def test_new_rows(self):
+        self._mirror().load()
+        # Scores of a played game filled in, and a new game scheduled
+        GamesHandler.content = self._content(self.games[:3] + [
+            '2023_02_MIN_PHI,2023,2023-09-14,MIN,28,PHI,34,6.0,Lincoln Financial Field',
+            '2023_02_GB_ATL,2023,2023-09-17,GB,,ATL,,-1.0,Mercedes-Benz Stadium',
+        ])
+        mirror = self._mirror()
+        df = mirror.load()
+        self.assertEqual((mirror.status, mirror.n_parsed), ('updated', 2))
+        pd.testing.assert_frame_equal(df, self._expected())
+
+        # Rows removed upstream are dropped
+        GamesHandler.content = self._content(self.games[:2])
+        mirror = self._mirror()
+        pd.testing.assert_frame_equal(mirror.load(), self._expected())
+        self.assertEqual(mirror.n_parsed, 0)
+
+    def test_offline(self):
+        with self.assertRaises(Exception):
+            self._mirror(url='http://127.0.0.1:1/games.csv').load()
+        self._mirror().load()
+        self.server.shutdown()
+        mirror = self._mirror()
+        mirror.url = 'http://127.0.0.1:1/games.csv'
+        pd.testing.assert_frame_equal(mirror.load(), self._expected())
+        self.assertEqual(mirror.status, 'offline')
+
+    def test_nfl_schedule(self):
+        # The box score downloader reads its schedule through the mirror too
+        GamesHandler.content = self._content([
+            'game_id,season,week,gameday,away_team,away_score,home_team,home_score,pfr',
+            '2010_01_DET_CHI,2010,1,2010-09-12,DET,14,CHI,19,201009120chi',
+        ])
+        with patch.object(Config, 'DATA_DIR', self.mirror_dir):
+            downloader = DownloadNFLData(save_dir=self.mirror_dir, mirror_dir=self.mirror_dir)
+        downloader.schedule_url = self.url
+        self.assertEqual(downloader.schedule().to_dict('records'), [{'team': 'chi', 'date': '20100912'}])
+        GamesHandler.content += b'2010_02_CHI_DAL,2010,2,2010-09-19,CHI,27,DAL,20,201009190dal\n'
+        self.assertEqual(list(downloader.schedule()['team']), ['chi', 'dal'])
+        self.assertEqual(GamesHandler.status_codes, [200, 200])
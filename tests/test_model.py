@@ -0,0 +1,20 @@
+from unittest import TestCase
+
+import pandas as pd
+
+from sports_bettors.analytics.model.model import Model
+
+
+class TestModel(TestCase):
+
+    def test_balance_weights(self):
+        labels = pd.Series([True, False, False, False, True, False], index=[3, 5, 7, 9, 11, 13])
+        weights = Model.balance_weights(labels)
+        self.assertEqual(list(weights.index), list(labels.index))
+        self.assertEqual(list(weights), [2., 1., 1., 1., 2., 1.])
+        # Every class carries the weight of the largest class, as if it had been upsampled
+        self.assertEqual(weights[labels].sum(), weights[~labels].sum())
+
+    def test_balance_weights_balanced(self):
+        weights = Model.balance_weights(pd.Series([True, False] * 5))
+        self.assertTrue((weights == 1.).all())
@@ -0,0 +1,173 @@
+import os
+import json
+import shutil
+import tempfile
+from unittest import TestCase
+from unittest.mock import patch
+
+import numpy as np
+import pandas as pd
+
+from sports_bettors.utils.nfl.curate import split_dash_stat, parse_composite_stats, curate_raw_file, curate_nfl
+from sports_bettors.utils.nfl.parse import parse_boxscore
+from sports_bettors.utils.nfl.raw import raw_path, append_games, write_games
+
+FIXTURE_DIR = os.path.join(os.path.dirname(os.path.realpath(__file__)), 'fixtures', 'nfl')
+
+
+class TestCurate(TestCase):
+
+    def test_split_dash_stat(self):
+        parts = split_dash_stat(pd.Series(['22-35-250-2-1', '3-10--5-0-0', '1', '20-100', 'a-1-2-3-4']), 5)
+        self.assertEqual(list(parts.iloc[0]), [22, 35, 250, 2, 1])
+        # A double dash (negative yards) is read as a single separator
+        self.assertEqual(list(parts.iloc[1]), [3, 10, 5, 0, 0])
+        self.assertTrue(parts.iloc[2].isna().all())
+        self.assertTrue(np.isnan(parts.iloc[3, 2]))
+        self.assertTrue(np.isnan(parts.iloc[4, 0]))
+        self.assertEqual(parts.iloc[4, 1], 1)
+
+    def test_integer_columns(self):
+        parts = split_dash_stat(pd.Series(['6-45', '8-62']), 2)
+        self.assertTrue(all(dtype == np.int64 for dtype in parts.dtypes))
+
+    def test_parse_composite_stats(self):
+        df = pd.DataFrame({
+            'year': [1990, 2010],
+            'home_CmpAttYdTDINT': ['15-32-205-1-1', '34-49-372-2-1'],
+            'home_RushYdsTDs': ['26-20-1', '31-101-0'],
+            'home_FourthDownConv': [np.nan, '1-2'],
+            'home_FumblesLost': ['1-1', '3-3'],
+            'home_PenaltiesYards': ['6-45', '8-62'],
+            'home_SackedYards': ['2-11', '4-32'],
+            'home_ThirdDownConv': ['3-14', '7-16'],
+            'home_TimeofPossession': ['22:12', np.nan],
+        })
+        df = parse_composite_stats(df, 'home')
+        self.assertNotIn('home_CmpAttYdTDINT', df.columns)
+        self.assertEqual(list(df['home_passYards']), [205, 372])
+        self.assertEqual(list(df['home_rushTDs']), [1, 0])
+        self.assertAlmostEqual(df['home_possessionTime'].iloc[0], 22.2)
+        # Missing possession time is filled as 00:00
+        self.assertEqual(df['home_possessionTime'].iloc[1], 0.)
+        # Down conversions weren't tracked before 1992
+        self.assertTrue(np.isnan(df['home_thirdDownAttempts'].iloc[0]))
+        self.assertEqual(df['home_fourthDownAttempts'].iloc[1], 2)
+
+
+class TestIncrementalCurate(TestCase):
+
+    def setUp(self):
+        self.raw_dir = tempfile.mkdtemp()
+        self.save_dir = tempfile.mkdtemp()
+        with open(os.path.join(FIXTURE_DIR, '201009120chi.htm'), 'rb') as fp:
+            self.game = parse_boxscore(fp.read())
+        self._write('chi', ['2010-09-12'])
+        self._write('det', ['2010-09-12'])
+
+    def tearDown(self):
+        shutil.rmtree(self.raw_dir)
+        shutil.rmtree(self.save_dir)
+
+    def _write(self, team: str, dates: list):
+        write_games(raw_path(self.raw_dir, team), {date: self.game for date in dates})
+
+    def _manifest(self) -> dict:
+        with open(os.path.join(self.save_dir, 'manifest.json')) as fp:
+            return json.load(fp)
+
+    def _curated(self) -> pd.DataFrame:
+        return pd.read_csv(os.path.join(self.save_dir, 'df_curated.csv'))
+
+    def _stats(self) -> pd.DataFrame:
+        return pd.read_csv(os.path.join(self.save_dir, 'df_stats.csv'))
+
+    def test_only_appended_games_are_curated(self):
+        curate_nfl(raw_dir=self.raw_dir, save_dir=self.save_dir)
+        # Both teams' files hold the same game
+        df = self._curated()
+        self.assertEqual(df.shape[0], 2)
+        self.assertEqual(set(df['team']), {'DET', 'CHI'})
+        det_part = os.path.join(self.save_dir, 'parts', 'det_raw.csv')
+        det_mtime = os.path.getmtime(det_part)
+        with open(os.path.join(self.save_dir, 'df_curated.csv'), 'rb') as fp:
+            curated = fp.read()
+        # Home / away stats once per game
+        self.assertEqual(self._stats().shape[0], 1)
+        with open(os.path.join(self.save_dir, 'df_stats.csv'), 'rb') as fp:
+            stats = fp.read()
+
+        # A new game for one team only curates the line appended to that team's file
+        append_games(raw_path(self.raw_dir, 'chi'), {'2010-09-19': dict(self.game, teams=['GNB', 'CHI'])})
+        with patch('sports_bettors.utils.nfl.curate.curate_raw_file', wraps=curate_raw_file) as curate:
+            curate_nfl(raw_dir=self.raw_dir, save_dir=self.save_dir)
+        (path, start, end), = [call.args for call in curate.call_args_list]
+        self.assertEqual((os.path.basename(path), start),
+                         ('chi_raw.jsonl', self._manifest()['det_raw.jsonl']['offset']))
+        self.assertEqual(self._manifest()['chi_raw.jsonl']['rows'], 2)
+        self.assertEqual(os.path.getmtime(det_part), det_mtime)
+        # Its rows are appended to the curated data
+        with open(os.path.join(self.save_dir, 'df_curated.csv'), 'rb') as fp:
+            self.assertTrue(fp.read().startswith(curated))
+        df = self._curated()
+        self.assertEqual(df.shape[0], 4)
+        self.assertEqual(sorted(df[df['day'] == 19]['team']), ['CHI', 'GNB'])
+        with open(os.path.join(self.save_dir, 'df_stats.csv'), 'rb') as fp:
+            self.assertTrue(fp.read().startswith(stats))
+        self.assertEqual(list(self._stats()['away_team']), ['DET', 'GNB'])
+
+        # Nothing new
+        with patch('sports_bettors.utils.nfl.curate.curate_raw_file', wraps=curate_raw_file) as curate:
+            curate_nfl(raw_dir=self.raw_dir, save_dir=self.save_dir)
+        self.assertEqual(curate.call_count, 0)
+
+        # Removed raw files drop out of the curated set
+        os.remove(raw_path(self.raw_dir, 'chi'))
+        curate_nfl(raw_dir=self.raw_dir, save_dir=self.save_dir)
+        self.assertEqual(list(self._manifest().keys()), ['det_raw.jsonl'])
+        self.assertFalse(os.path.exists(os.path.join(self.save_dir, 'parts', 'chi_raw.csv')))
+        self.assertFalse(os.path.exists(os.path.join(self.save_dir, 'parts', 'chi_raw_stats.csv')))
+        self.assertEqual(self._curated().shape[0], 2)
+        self.assertEqual(self._stats().shape[0], 1)
+
+    def test_rewritten_files_are_curated_again(self):
+        curate_nfl(raw_dir=self.raw_dir, save_dir=self.save_dir)
+        # The downloader rewrites a file with overwrite, its earlier games may have changed
+        self._write('det', ['2010-09-26'])
+        curate_nfl(raw_dir=self.raw_dir, save_dir=self.save_dir)
+        self.assertEqual(self._manifest()['det_raw.jsonl']['rows'], 1)
+        df = self._curated()
+        self.assertEqual(sorted(zip(df['team'], df['day'])), [('CHI', 12), ('CHI', 26), ('DET', 12), ('DET', 26)])
+
+    def test_interrupted_rewrites_are_skipped(self):
+        with open(raw_path(self.raw_dir, 'gnb') + '.tmp', 'w') as fp:
+            fp.write(json.dumps(dict(date='2010-09-19', **self.game)) + '\n')
+        curate_nfl(raw_dir=self.raw_dir, save_dir=self.save_dir)
+        self.assertEqual(sorted(self._manifest().keys()), ['chi_raw.jsonl', 'det_raw.jsonl'])
+        self.assertEqual(self._curated().shape[0], 2)
+
+    def test_legacy_raw_files_are_converted(self):
+        with open(os.path.join(self.raw_dir, 'gnb_raw.json'), 'w') as fp:
+            json.dump({'2010-09-19': self.game, '2010-09-12': self.game}, fp, indent=4)
+        curate_nfl(raw_dir=self.raw_dir, save_dir=self.save_dir)
+        self.assertFalse(os.path.exists(os.path.join(self.raw_dir, 'gnb_raw.json')))
+        self.assertEqual(self._manifest()['gnb_raw.jsonl']['rows'], 2)
+        # Legacy order is kept, one game per line
+        with open(raw_path(self.raw_dir, 'gnb')) as fp:
+            self.assertEqual([json.loads(line)['date'] for line in fp], ['2010-09-19', '2010-09-12'])
+        # Converted once, not on every curate
+        with patch('sports_bettors.utils.nfl.raw.convert_raw_json') as convert:
+            curate_nfl(raw_dir=self.raw_dir, save_dir=self.save_dir)
+        self.assertEqual(convert.call_count, 0)
+
+    def test_raw_files_are_read_only(self):
+        curate_nfl(raw_dir=self.raw_dir, save_dir=self.save_dir)
+        # A game still being written, curating must not terminate or otherwise touch it
+        with open(raw_path(self.raw_dir, 'det'), 'a') as fp:
+            fp.write(json.dumps(dict(date='2010-09-26', **self.game))[:100])
+        with open(raw_path(self.raw_dir, 'det'), 'rb') as fp:
+            raw = fp.read()
+        curate_nfl(raw_dir=self.raw_dir, save_dir=self.save_dir)
+        with open(raw_path(self.raw_dir, 'det'), 'rb') as fp:
+            self.assertEqual(fp.read(), raw)
+        self.assertEqual(self._manifest()['det_raw.jsonl']['rows'], 1)
@@ -0,0 +1,33 @@
+import os
+from unittest import TestCase
+
+from sports_bettors.utils.nfl.parse import parse_boxscore
+
+FIXTURE_DIR = os.path.join(os.path.dirname(os.path.realpath(__file__)), 'fixtures', 'nfl')
+
+
+class TestParse(TestCase):
+
+    def test_parse_boxscore(self):
+        with open(os.path.join(FIXTURE_DIR, '201009120chi.htm'), 'rb') as fp:
+            result = parse_boxscore(fp.read())
+        self.assertEqual(result['quarter_headers'], ['1', '2', '3', '4', 'Final'])
+        self.assertEqual(result['quarter_values'][1], ['', 'Chicago Bears', '0', '10', '3', '6', '19'])
+        self.assertEqual(result['teams'], ['DET', 'CHI'])
+        self.assertEqual(result['features'][:3], ['First Downs', 'Rush-Yds-TDs', 'Cmp-Att-Yd-TD-INT'])
+        self.assertEqual(result['features'][-1], 'Time of Possession')
+        self.assertEqual(result['values'][2], ['15-32-205-1-1', '34-49-372-2-1'])
+        self.assertEqual(len(result['features']), len(result['values']))
+
+    def test_uncommented_team_stats(self):
+        with open(os.path.join(FIXTURE_DIR, '201009120chi.htm'), 'rb') as fp:
+            html = fp.read()
+        # Strip the comment markers from the team stats block only
+        start = html.index(b'<div id="all_team_stats"')
+        end = html.index(b'<div id="all_player_offense"')
+        block = html[start:end].replace(b'<!--', b'').replace(b'-->', b'')
+        self.assertEqual(parse_boxscore(html[:start] + block + html[end:]), parse_boxscore(html))
+
+    def test_missing_tables(self):
+        with self.assertRaises(ValueError):
+            parse_boxscore(b'<html><body><p>Page Not Found</p></body></html>')
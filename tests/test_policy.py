@@ -0,0 +1,66 @@
+import os
+import shutil
+import tempfile
+from unittest import TestCase
+
+import numpy as np
+import pandas as pd
+from scipy.stats import binomtest
+
+from sports_bettors.analytics.model.policy import Policy
+
+
+class TestPolicy(TestCase):
+
+    def setUp(self):
+        # Models make their output directories under the working directory
+        self.cwd = os.getcwd()
+        self.work_dir = tempfile.mkdtemp()
+        os.chdir(self.work_dir)
+        self.policy = Policy(league='nfl', response='spread')
+        for name, (left, right) in {'max_return': (-2., 3.), 'top_decile': (None, 4.), 'min_risk': (None, None),
+                                    'all_in': (0, 0)}.items():
+            self.policy.policies[name]['left']['threshold'] = left
+            self.policy.policies[name]['right']['threshold'] = right
+
+    def tearDown(self):
+        os.chdir(self.cwd)
+        shutil.rmtree(self.work_dir)
+
+    def test_apply_policy_many(self):
+        preds = pd.Series([-5., -1., 0., 3., 3.5, np.nan], index=[10, 11, 12, 13, 14, 15])
+        bets = self.policy.apply_policy_many(preds, ['max_return', 'top_decile', 'min_risk', 'all_in'])
+        self.assertEqual(list(bets.index), list(preds.index))
+        for policy in bets.columns:
+            self.assertEqual(list(bets[policy]), [self.policy.apply_policy(p, policy) for p in preds])
+        self.assertEqual(list(bets['max_return']), ['Underdog', 'No Bet', 'No Bet', 'No Bet', 'Favorite', 'No Bet'])
+
+    def test_assess_policy_many(self):
+        df = pd.DataFrame({'preds_c': [-5., -1., 3.5, 4.5], 'classifier_response': [0, 1, 0, 1]})
+        bets = self.policy.apply_policy_many(df['preds_c'], ['max_return', 'top_decile'])
+        results = self.policy.assess_policy_many(bets, df['classifier_response'])
+        for policy in results.columns:
+            expected = self.policy.assess_policy(df.assign(Bet=bets[policy]), policy)
+            np.testing.assert_array_equal(results[policy].values, expected.values.astype(float))
+        np.testing.assert_array_equal(results['max_return'].values, [1., np.nan, 0., 1.])
+
+    def test_summarize_windows(self):
+        rng = np.random.default_rng(0)
+        gameday = pd.Series(pd.Timestamp(self.policy.TODAY) - pd.to_timedelta(rng.integers(1, 365, 300), unit='D'))
+        df = pd.DataFrame({'preds_c': rng.normal(0, 5, 300), 'classifier_response': rng.integers(0, 2, 300)})
+        df_bets = self.policy.apply_policy_many(df['preds_c'], ['max_return', 'all_in'])
+        df_results = self.policy.assess_policy_many(df_bets, df['classifier_response'])
+        df_windows = self.policy.summarize_windows(df_results, gameday)
+
+        self.assertEqual(list(df_windows['window']), ['past_year', 'season', 'past_week'] * 2)
+        for row in df_windows.to_dict(orient='records'):
+            days = dict(self.policy.policy_windows)[row['window']]
+            in_window = gameday > pd.Timestamp(self.policy.TODAY) - pd.Timedelta(days=days) if days else gameday.notna()
+            bet_result = df_results.loc[in_window, row['policy']]
+            self.assertEqual(row['num_games'], in_window.sum())
+            self.assertEqual(row['num_wins'], bet_result.sum())
+            self.assertEqual(row['num_losses'], (1 - bet_result).sum())
+            self.assertEqual(row['num_bets'], bet_result.notna().sum())
+            if row['num_wins'] > 0:
+                self.assertAlmostEqual(row['p_value'], binomtest(int(row['num_wins']), int(row['num_bets']), p=0.5,
+                                                                 alternative='greater').pvalue)
@@ -0,0 +1,28 @@
+from unittest import TestCase
+
+import pandas as pd
+
+from sports_bettors.utils.reshape import team_perspective
+
+
+class TestReshape(TestCase):
+
+    def test_team_perspective(self):
+        df = pd.DataFrame({
+            'game_id': [1, 2],
+            'home_team': ['GNB', 'CHI'],
+            'away_team': ['CHI', 'DET'],
+            'home_points': [21, 10],
+            'away_points': [14, 17],
+        })
+        df = team_perspective(df).set_index(['game_id', 'team'])
+        self.assertEqual(df.shape[0], 4)
+        self.assertEqual(df.loc[(1, 'CHI'), 'points'], 14)
+        self.assertEqual(df.loc[(1, 'CHI'), 'opp_points'], 21)
+        self.assertEqual(df.loc[(1, 'CHI'), 'opponent'], 'GNB')
+        self.assertEqual(df.loc[(1, 'GNB'), 'is_home'], 1)
+        self.assertEqual(df.loc[(2, 'CHI'), 'is_home'], 1)
+        # Both sides of a game share a matchup
+        self.assertEqual(df.loc[(1, 'GNB'), 'matchup'], 'CHI_vs_GNB')
+        self.assertEqual(df.loc[(1, 'CHI'), 'matchup'], 'CHI_vs_GNB')
+        self.assertEqual(df.loc[(2, 'DET'), 'matchup'], 'CHI_vs_DET')
@@ -0,0 +1,32 @@
+import os
+import shutil
+import tempfile
+from unittest import TestCase
+
+import numpy as np
+import pandas as pd
+
+from sports_bettors.analytics.model.results import Results
+
+
+class TestResults(TestCase):
+
+    def setUp(self):
+        self.results_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.results_dir)
+
+    def test_save_load(self):
+        results = Results()
+        results.summary.update({'league': 'nfl', 'auc': {'test': np.float64(0.6)}, 'n': {'test': np.int64(10)}})
+        results.add_table('roc', pd.DataFrame({'sample': ['test', 'test'], 'fpr': [0., 1.], 'tpr': [0., 1.]}))
+        results.save(self.results_dir)
+        self.assertTrue(os.path.exists(os.path.join(self.results_dir, 'roc.csv')))
+
+        loaded = Results.load(self.results_dir)
+        self.assertEqual(loaded.summary, {'league': 'nfl', 'auc': {'test': 0.6}, 'n': {'test': 10}})
+        self.assertEqual(loaded.table_names, ['roc'])
+        pd.testing.assert_frame_equal(loaded.table('roc'), results.table('roc'))
+        with self.assertRaises(KeyError):
+            loaded.table('betting_guide')
@@ -0,0 +1,67 @@
+from unittest import TestCase
+
+import numpy as np
+import pandas as pd
+
+from sports_bettors.analytics import schema
+from sports_bettors.analytics.model.data import Data
+
+
+class TestSchema(TestCase):
+
+    def setUp(self):
+        self.df = pd.DataFrame({
+            'game_id': ['2023_01_A_B', '2023_01_C_D', '2023_02_B_C'],
+            'season': [2023, 2023, 2023],
+            'gameday': pd.to_datetime(['2023-09-10', '2023-09-10', '2023-09-17']),
+            'away_team': ['A', 'C', 'B'],
+            'home_team': ['B', 'D', 'C'],
+            'away_score': [20., 17., np.nan],
+            'home_score': [24., 10., np.nan],
+            'spread_line': [-3., 2.5, 1.],
+            'total_line': [44.5, 38., 41.],
+            'away_moneyline': [-150., 120., -133.333],
+            'home_moneyline': [130., -140., 110.],
+        })
+
+    def test_enforce(self):
+        df = schema.enforce(self.df)
+        self.assertIsInstance(df['away_team'].dtype, pd.CategoricalDtype)
+        self.assertEqual(df['season'].dtype, 'int16')
+        self.assertEqual(df['away_score'].dtype, 'float32')
+        self.assertEqual(df['spread_line'].dtype, 'float32')
+        # Not exact in float32
+        self.assertEqual(df['away_moneyline'].dtype, 'float64')
+        # Not in the schema
+        self.assertEqual(df['game_id'].dtype, self.df['game_id'].dtype)
+        # Season / week part of game_id
+        self.assertIsInstance(df['game_id_prefix'].dtype, pd.CategoricalDtype)
+        self.assertEqual(list(df['game_id_prefix']), ['2023_01', '2023_01', '2023_02'])
+        df = df.drop(columns='game_id_prefix')
+        pd.testing.assert_frame_equal(df, self.df, check_dtype=False, check_categorical=False)
+        self.assertLess(df.memory_usage(deep=True).sum(), self.df.memory_usage(deep=True).sum())
+
+    def test_enforce_idempotent(self):
+        df = schema.enforce(self.df)
+        pd.testing.assert_frame_equal(schema.enforce(df), df)
+
+    def test_game_id_prefix(self):
+        prefix = schema.game_id_prefix(pd.Series(['2023_07_BUF_NE', '2021_Iowa_OhioState', None]))
+        self.assertEqual(list(prefix.iloc[:2]), ['2023_07', '2021'])
+        self.assertTrue(pd.isna(prefix.iloc[2]))
+
+    def test_add_metrics(self):
+        df = Data._add_metrics(schema.enforce(self.df))
+        self.assertEqual(list(df['spread_favorite_actual'].iloc[:2]), [-4., -7.])
+        self.assertTrue(np.isnan(df['spread_favorite_actual'].iloc[2]))
+        # Derived from float64 copies of the compact columns
+        self.assertEqual(df['spread_diff'].dtype, 'float64')
+        self.assertEqual(df['away_score'].dtype, 'float64')
+        metrics = ['spread_actual', 'spread_diff', 'spread_favorite_actual', 'spread_favorite_diff', 'total_diff']
+        pd.testing.assert_frame_equal(df[metrics], Data._add_metrics(self.df.copy())[metrics], check_exact=True)
+
+    def test_label_teams(self):
+        df = Data.label_teams(self.df.set_index(pd.Index([4, 2, 0])))
+        self.assertEqual(list(df['favorite_team']), ['A', 'D', 'C'])
+        self.assertEqual(list(df['underdog_score'].iloc[:2]), [24., 17.])
+        self.assertEqual(list(df.index), [0, 1, 2])
@@ -0,0 +1,85 @@
+import time
+import shutil
+import tempfile
+import threading
+from unittest import TestCase
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+from sports_bettors.utils.scraper import Scraper
+
+
+class FixtureHandler(BaseHTTPRequestHandler):
+    """
+    Serves a fixed set of pages; /flaky fails until the server is told to fix it
+    """
+    pages = {'/a.htm': b'<html>a</html>', '/b.htm': b'<html>b</html>'}
+    requests_seen = []
+    flaky_ok = False
+
+    def do_GET(self):
+        FixtureHandler.requests_seen.append(self.path)
+        if self.path in self.pages:
+            self._reply(200, self.pages[self.path])
+        elif self.path == '/flaky.htm' and FixtureHandler.flaky_ok:
+            self._reply(200, b'<html>flaky</html>')
+        elif self.path == '/flaky.htm':
+            self._reply(503, b'')
+        else:
+            self._reply(404, b'')
+
+    def _reply(self, code: int, body: bytes):
+        self.send_response(code)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+class TestScraper(TestCase):
+
+    def setUp(self):
+        FixtureHandler.requests_seen = []
+        FixtureHandler.flaky_ok = False
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), FixtureHandler)
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self.thread.start()
+        self.base = 'http://127.0.0.1:{}'.format(self.server.server_address[1])
+        self.cache_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        self.server.shutdown()
+        self.server.server_close()
+        shutil.rmtree(self.cache_dir)
+
+    def _urls(self):
+        return [self.base + path for path in ['/a.htm', '/b.htm', '/missing.htm', '/flaky.htm']]
+
+    def test_fetch_and_cache(self):
+        scraper = Scraper(self.cache_dir, max_workers=3, min_interval=0.)
+        pages, failed = scraper.fetch_many(self._urls())
+        self.assertEqual(pages, {self.base + '/a.htm': b'<html>a</html>', self.base + '/b.htm': b'<html>b</html>'})
+        self.assertEqual(failed, [self.base + '/flaky.htm'])
+        self.assertEqual(len(FixtureHandler.requests_seen), 4)
+
+        # A rerun, from a fresh object, only re-requests the transient failure
+        FixtureHandler.requests_seen = []
+        FixtureHandler.flaky_ok = True
+        scraper = Scraper(self.cache_dir, max_workers=3, min_interval=0.)
+        pages, failed = scraper.fetch_many(self._urls())
+        self.assertEqual(FixtureHandler.requests_seen, ['/flaky.htm'])
+        self.assertEqual(len(pages), 3)
+        self.assertEqual(failed, [])
+
+        # Nothing left to fetch
+        FixtureHandler.requests_seen = []
+        Scraper(self.cache_dir, min_interval=0.).fetch_many(self._urls())
+        self.assertEqual(FixtureHandler.requests_seen, [])
+
+    def test_rate_limit(self):
+        scraper = Scraper(self.cache_dir, max_workers=4, min_interval=0.1)
+        start = time.monotonic()
+        scraper.fetch_many([self.base + '/missing_{}.htm'.format(i) for i in range(4)])
+        # Four requests to one host must span at least three intervals
+        self.assertGreaterEqual(time.monotonic() - start, 0.3)
@@ -0,0 +1,68 @@
+from unittest import TestCase
+
+import numpy as np
+from sklearn.pipeline import Pipeline
+from sklearn.svm import SVR
+from sklearn.model_selection import GroupKFold, GridSearchCV
+from sklearn.metrics import make_scorer, mean_squared_error
+import sklearn
+
+from sports_bettors.analytics.model.search import KernelCache, KernelGridSearch
+
+
+class TestKernelGridSearch(TestCase):
+
+    def setUp(self):
+        rng = np.random.default_rng(0)
+        self.X = rng.normal(0, 1, (150, 4))
+        self.y = self.X[:, 0] - 0.5 * self.X[:, 1] + rng.normal(0, 1, 150)
+        self.group = rng.integers(2018, 2022, 150)
+        self.parameters = {
+            'model__kernel': ['rbf', 'poly', 'sigmoid'],
+            'model__gamma': ['scale', 'auto'],
+            'model__epsilon': [0.1, 0.2],
+            'model__C': [0.5, 2]
+        }
+
+    def _cv(self):
+        return list(GroupKFold(n_splits=4).split(self.X, self.y, self.group))
+
+    def _assert_matches(self, search: KernelGridSearch, grid: GridSearchCV):
+        self.assertEqual(search.cv_results_['params'], list(grid.cv_results_['params']))
+        self.assertEqual(search.best_params_, grid.best_params_)
+        for score in ['mean_test_score', 'mean_train_score', 'split0_test_score']:
+            np.testing.assert_allclose(search.cv_results_[score], grid.cv_results_[score], atol=1e-4)
+
+    def test_matches_grid_search(self):
+        grid = GridSearchCV(Pipeline([('model', SVR())]), cv=self._cv(), param_grid=self.parameters,
+                            scoring='neg_mean_squared_error', return_train_score=True)
+        grid.fit(self.X, self.y)
+        self._assert_matches(KernelGridSearch(self.parameters, cv=self._cv()).fit(self.X, self.y), grid)
+
+    def test_matches_weighted_grid_search(self):
+        # Weights routed to both the fit and the scorer, the objective the weighted training optimizes
+        sample_weight = np.where(self.y > 0.5, 3., 1.)
+        with sklearn.config_context(enable_metadata_routing=True):
+            scoring = make_scorer(mean_squared_error, greater_is_better=False).set_score_request(sample_weight=True)
+            grid = GridSearchCV(Pipeline([('model', SVR().set_fit_request(sample_weight=True))]), cv=self._cv(),
+                                param_grid=self.parameters, scoring=scoring, return_train_score=True)
+            grid.fit(self.X, self.y, sample_weight=sample_weight)
+        search = KernelGridSearch(self.parameters, cv=self._cv()).fit(self.X, self.y, sample_weight=sample_weight)
+        self._assert_matches(search, grid)
+
+    def test_kernels_reused(self):
+        search = KernelGridSearch(self.parameters, cv=self._cv()).fit(self.X, self.y)
+        # One kernel per fold for each kernel / gamma, shared by the 4 C / epsilon candidates
+        self.assertEqual(search.n_kernels_, 3 * 2 * 4)
+
+    def test_cache_bounded(self):
+        cache = KernelCache(max_bytes=3 * 80)
+        for key in range(5):
+            cache.get(key, lambda: (np.zeros(10),))
+        self.assertEqual(cache.n_bytes, 3 * 80)
+        self.assertEqual(cache.misses, 5)
+        cache.get(4, lambda: (np.ones(10),))
+        self.assertEqual(cache.hits, 1)
+        # Oldest entries were evicted
+        cache.get(0, lambda: (np.ones(10),))
+        self.assertEqual(cache.misses, 6)
@@ -0,0 +1,75 @@
+import os
+import shutil
+import tempfile
+from unittest import TestCase, mock
+
+import pandas as pd
+
+from sports_bettors.utils.store import GameStore
+
+
+class TestGameStore(TestCase):
+
+    def setUp(self):
+        self.root_dir = tempfile.mkdtemp()
+        self.store = GameStore(self.root_dir)
+        # Three seasons, the last game of each in January
+        self.df = pd.DataFrame({
+            'game_id': ['2021_01', '2021_18', '2022_01', '2022_18', '2023_01', '2023_18'],
+            'season': [2021, 2021, 2022, 2022, 2023, 2023],
+            'gameday': pd.to_datetime(['2021-09-12', '2022-01-09', '2022-09-11', '2023-01-08', '2023-09-10',
+                                       '2024-01-07']),
+            'away_team': ['A', 'B', 'A', 'B', 'A', 'B'],
+            'home_team': ['B', 'A', 'B', 'A', 'B', 'A'],
+            'away_score': [20., 17., 21., 14., 10., 3.],
+            'spread_line': [-3., 2.5, 1., -1., 7., -7.],
+        })
+        self.store.write('nfl', self.df)
+
+    def tearDown(self):
+        shutil.rmtree(self.root_dir)
+
+    def test_round_trip(self):
+        pd.testing.assert_frame_equal(self.store.load('nfl'), self.df)
+
+    def test_season_of(self):
+        df = self.df.drop(columns=['season'])
+        self.assertEqual(list(GameStore.season_of(df)), list(self.df['season']))
+
+    def test_partitions(self):
+        self.assertEqual(self.store.partitions('nfl'), [2021, 2022, 2023])
+        self.assertEqual(self.store.partitions('nfl', start='2022-06-01'), [2022, 2023])
+        self.assertEqual(self.store.partitions('nfl', end='2022-06-01'), [2021])
+        # Last day of a season, inclusive
+        self.assertEqual(self.store.partitions('nfl', start='2023-01-08'), [2022, 2023])
+
+    def test_window(self):
+        with mock.patch('pandas.read_csv', side_effect=pd.read_csv) as read_csv:
+            df = self.store.load('nfl', start='2022-09-11', end='2023-09-10')
+        # Only the overlapping seasons are read
+        self.assertEqual(read_csv.call_count, 2)
+        self.assertEqual(list(df['game_id']), ['2022_01', '2022_18', '2023_01'])
+
+    def test_columns(self):
+        df = self.store.load('nfl', start='2023-01-01', columns=['away_score', 'game_id', 'missing'])
+        self.assertEqual(list(df.columns), ['away_score', 'game_id'])
+        self.assertEqual(list(df['game_id']), ['2022_18', '2023_01', '2023_18'])
+
+    def test_empty_window(self):
+        df = self.store.load('nfl', start='2030-01-01', columns=['game_id', 'gameday'])
+        self.assertEqual(df.shape[0], 0)
+        self.assertEqual(list(df.columns), ['game_id', 'gameday'])
+
+    def test_upsert(self):
+        mtime = os.path.getmtime(os.path.join(self.root_dir, 'nfl', 'season=2021.csv'))
+        df = self.df.copy()
+        df.loc[5, 'away_score'] = 6.
+        self.assertEqual(self.store.write('nfl', df.tail(2)), [2023])
+        # Unchanged seasons are left alone
+        self.assertEqual(self.store.write('nfl', df), [])
+        self.assertEqual(mtime, os.path.getmtime(os.path.join(self.root_dir, 'nfl', 'season=2021.csv')))
+        pd.testing.assert_frame_equal(self.store.load('nfl'), df)
+
+    def test_missing(self):
+        with self.assertRaises(FileNotFoundError):
+            self.store.load('college_football')
@@ -0,0 +1,36 @@
+from unittest import TestCase
+
+import numpy as np
+import pandas as pd
+
+from sports_bettors.analytics.model.validate import Validate
+
+
+class TestBettingGuide(TestCase):
+
+    def test_matches_filters(self):
+        rng = np.random.default_rng(0)
+        preds_c = pd.Series(np.round(rng.normal(0, 6, 200) * 2) / 2)
+        won = pd.Series(rng.integers(0, 2, 200))
+        thresholds = np.linspace(-10, 10, 41)
+        df = Validate.betting_guide(preds_c, won, thresholds, 0.5, ('Favorite', 'Underdog'))
+
+        self.assertEqual(df.shape[0], 82)
+        self.assertEqual(list(df['team'].iloc[:2]), ['Favorite', 'Underdog'])
+        for threshold in [-6., -2.5, 0., 3., 6.]:
+            favorite = df[(df['threshold'] == threshold) & (df['team'] == 'Favorite')].iloc[0]
+            underdog = df[(df['threshold'] == threshold) & (df['team'] == 'Underdog')].iloc[0]
+            interval = preds_c.between(threshold - 0.5, threshold + 0.5)
+            self.assertEqual(favorite['n_games'], (preds_c > threshold).sum())
+            self.assertEqual(underdog['n_games'], (preds_c < threshold).sum())
+            self.assertEqual(favorite['n_games_interval'], interval.sum())
+            self.assertAlmostEqual(favorite['fraction_games'], (preds_c > threshold).mean())
+            self.assertAlmostEqual(favorite['win_rate'], won[preds_c > threshold].mean())
+            self.assertAlmostEqual(underdog['win_rate'], (1 - won[preds_c < threshold]).mean())
+            self.assertAlmostEqual(underdog['win_rate_interval'], (1 - won[interval]).mean())
+
+    def test_no_games_past_threshold(self):
+        df = Validate.betting_guide(pd.Series([0., 1.]), pd.Series([1, 0]), np.array([5.]), 0.5, ('Over', 'Under'))
+        self.assertEqual(df['n_games'].tolist(), [0, 2])
+        self.assertTrue(np.isnan(df['win_rate'].iloc[0]))
+        self.assertEqual(df['win_rate'].iloc[1], 0.5)